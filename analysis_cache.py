@@ -0,0 +1,170 @@
+# in-built modules
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+def directory_fingerprint(dirpath):
+    """Cheap fingerprint of a directory's contents: its mtime plus its entry count.
+
+    Adding or removing frames changes both, so cached results computed from
+    an older state of the directory are never served.
+    """
+    stat = os.stat(dirpath)
+    with os.scandir(dirpath) as entries:
+        count = sum(1 for _ in entries)
+    return f"{stat.st_mtime_ns}-{count}"
+
+
+def evict_oldest(cache_dir, pattern, target_bytes):
+    """Remove the least recently modified files matching 'pattern' until the rest fit in 'target_bytes'.
+
+    :return: total size in bytes of the files left.
+    """
+    files = []
+    for path in Path(cache_dir).glob(pattern):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= target_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+    return total
+
+
+class AnalysisCache:
+    """Two-level LRU cache of frame analysis results.
+
+    Results are kept in memory and mirrored as small JSON files on disk, so
+    they survive restarts and are shared between worker processes. Keys are
+    built from the frames directory, the analyzer parameters and a directory
+    fingerprint.
+
+    Args:
+        cache_dir: Directory for the on-disk entries. None keeps results in memory only.
+        max_entries: Results kept in memory.
+        max_disk_bytes: Size limit of 'cache_dir'; least recently used files are removed first.
+    """
+
+    def __init__(self, cache_dir=None, max_entries=128, max_disk_bytes=64 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Keys being computed, each with an Event set once the result is in '_entries'.
+        self._pending = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(frames_dir, params):
+        """Cache key for 'frames_dir' analysed with 'params'."""
+        payload = json.dumps({
+            'dir': str(Path(frames_dir).resolve()),
+            'params': params,
+            'fingerprint': directory_fingerprint(frames_dir),
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def get_or_compute(self, frames_dir, params, compute):
+        """Return the cached result for 'frames_dir' and 'params', computing it on a miss.
+
+        Concurrent misses on the same key compute it once: the first caller
+        computes while the others wait for it and then read its result. If the
+        computation raises, one of the waiting callers computes it again.
+
+        :param frames_dir: Directory the result is computed from.
+        :param params: JSON-serialisable analyzer parameters.
+        :param compute: Callable returning a JSON-serialisable result.
+        """
+        key = self.make_key(frames_dir, params)
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key]
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    break
+            pending.wait()
+
+        try:
+            result = self._read_disk(key)
+            if result is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._remember(key, result)
+                return result
+
+            result = compute()
+            with self._lock:
+                self.misses += 1
+                self._remember(key, result)
+            self._write_disk(key, result)
+            return result
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+
+    def stats(self):
+        """Hit/miss counters and current sizes."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+            }
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def _read_disk(self, key):
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path) as file:
+                result = json.load(file)
+        except (OSError, ValueError):
+            return None
+        # Touch the entry so disk eviction is least-recently-used.
+        os.utime(path)
+        return result
+
+    def _write_disk(self, key, result):
+        if self.cache_dir is None:
+            return
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as file:
+            json.dump(result, file)
+        os.replace(tmp_path, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        evict_oldest(self.cache_dir, '*.json', self.max_disk_bytes)
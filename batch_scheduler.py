@@ -0,0 +1,270 @@
+# in-built modules
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# dependencies packages
+import fire
+
+# Internal module
+import settings
+from frame_extractor_multiprocess import extract_chunk, init_worker, plan_chunks
+from frame_extractor_multithread import FrameExtractor
+
+logger = logging.getLogger(__name__)
+
+LONGEST_FIRST = 'longest'
+BY_NAME = 'name'
+ORDERS = (LONGEST_FIRST, BY_NAME)
+
+# Shortest chunk (seconds) the scheduler picks on its own.
+MIN_CHUNK_SECONDS = 60
+# Seconds between two progress lines.
+PROGRESS_LOG_SECONDS = 10
+# Threads probing files before the batch starts.
+PROBE_THREADS = 8
+
+
+def format_seconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def list_candidates(vid_dir):
+    """Files of 'vid_dir' that may be videos, in name order.
+
+    Directories, hidden files and in-progress uploads ('.part') are left out;
+    everything else is probed by the scheduler.
+    """
+    return sorted(path for path in Path(vid_dir).iterdir()
+                  if path.is_file() and not path.name.startswith('.') and path.suffix != '.part')
+
+
+class BatchProgress:
+    """Seconds of video extracted across a batch, with an ETA from the throughput so far.
+
+    Args:
+        total_seconds: Seconds of video in the whole batch.
+        jobs: Number of jobs in the batch.
+        log_every: Seconds between two progress lines.
+    """
+
+    def __init__(self, total_seconds, jobs, log_every=PROGRESS_LOG_SECONDS):
+        self.total_seconds = total_seconds
+        self.jobs = jobs
+        self.finished = 0
+        self.log_every = log_every
+        self.start = time.perf_counter()
+        self._done = {}
+        self._last_log = self.start
+        self._lock = threading.Lock()
+
+    def done_seconds(self):
+        return sum(self._done.values())
+
+    def eta(self):
+        """Seconds left at the throughput so far, or None before any progress."""
+        done = self.done_seconds()
+        if not done:
+            return None
+        elapsed = time.perf_counter() - self.start
+        return elapsed * max(0.0, self.total_seconds - done) / done
+
+    def update(self, job_id, seconds):
+        with self._lock:
+            self._done[job_id] = seconds
+            now = time.perf_counter()
+            if now - self._last_log < self.log_every:
+                return
+            self._last_log = now
+        self.log()
+
+    def finish(self, job_id, seconds):
+        with self._lock:
+            self._done[job_id] = seconds
+            self.finished += 1
+        self.log()
+
+    def tracker(self, job_id, seconds):
+        """Progress callback for FrameExtractor.extract_frames, for a job covering 'seconds' of video."""
+        def progress(written, expected):
+            self.update(job_id, seconds * min(1.0, written / expected) if expected else 0.0)
+        return progress
+
+    def log(self):
+        eta = self.eta()
+        share = self.done_seconds() / self.total_seconds if self.total_seconds else 1.0
+        logger.info(f"[PROGRESS] - {self.finished}/{self.jobs} jobs, {share:.0%} of "
+                    f"{self.total_seconds:.0f}s of video, ETA {format_seconds(eta) if eta is not None else 'unknown'}")
+
+
+class BatchScheduler:
+    """Extract a batch of videos, longest work first.
+
+    Every file is probed with the extractor's decode backend before anything
+    starts, and files that can't be decoded are skipped. Videos longer than
+    'chunk_seconds' are split into time-range chunks (see plan_chunks) and
+    the jobs start longest first, so a long video doesn't start last and set
+    the wall time of the whole batch.
+
+    Args:
+        frame_extractor: A configured FrameExtractor.
+        workers: Jobs extracted at once.
+        processes: Run jobs on a process pool instead of threads.
+        order: 'longest' (longest job first) or 'name' (file name order).
+        chunk_seconds: Split videos longer than this. None uses the batch duration
+            divided by 'workers', but at least 'min_chunk_seconds'; 0 never splits.
+        cv2_threads: Value passed to cv2.setNumThreads in worker processes.
+        min_chunk_seconds: Shortest chunk picked when 'chunk_seconds' is None.
+    """
+
+    def __init__(self, frame_extractor, workers=None, processes=False, order=LONGEST_FIRST, chunk_seconds=None,
+                 cv2_threads=1, min_chunk_seconds=MIN_CHUNK_SECONDS):
+        if order not in ORDERS:
+            raise ValueError(f"Unknown job order '{order}', expected one of {ORDERS}")
+        self.frame_extractor = frame_extractor
+        self.workers = workers or os.cpu_count() or 1
+        self.processes = processes
+        self.order = order
+        self.chunk_seconds = chunk_seconds
+        self.cv2_threads = cv2_threads
+        self.min_chunk_seconds = min_chunk_seconds
+
+    def probe(self, vids):
+        """Read the frame count and duration of every file.
+
+        :return: ({path: probe}, {path: reason}) for the readable and the skipped files.
+        """
+        vids = list(vids)
+        with ThreadPoolExecutor(max_workers=max(1, min(PROBE_THREADS, len(vids)))) as executor:
+            probes = list(executor.map(self.frame_extractor.probe, vids))
+        videos, skipped = {}, {}
+        for vid, probe in zip(vids, probes):
+            if probe is None:
+                skipped[vid] = 'not a readable video'
+            else:
+                videos[vid] = probe
+        return videos, skipped
+
+    def plan(self, videos):
+        """Split probed videos into jobs and order them.
+
+        :param videos: {path: probe} as returned by 'probe'.
+        :return: list of job dicts with the video, start_seconds, end_seconds,
+            start_count and the seconds of video the job covers.
+        """
+        chunk_seconds = self.chunk_seconds
+        if chunk_seconds is None:
+            total = sum(probe['duration'] for probe in videos.values())
+            chunk_seconds = max(total / self.workers, self.min_chunk_seconds)
+        interval = self.frame_extractor.required_frame_rate
+        start = int(self.frame_extractor.start_from_seconds)
+
+        jobs = []
+        for vid, probe in videos.items():
+            for start_seconds, end_seconds, start_count in plan_chunks(vid, interval, start, chunk_seconds,
+                                                                       probe['duration']):
+                end = probe['duration'] if end_seconds is None else end_seconds
+                jobs.append({'video': vid, 'start_seconds': start_seconds, 'end_seconds': end_seconds,
+                             'start_count': start_count, 'seconds': max(0.0, end - start_seconds)})
+        if self.order == LONGEST_FIRST:
+            jobs.sort(key=lambda job: job['seconds'], reverse=True)
+        return jobs
+
+    def _submit(self, executor, job_id, job, progress):
+        if self.processes:
+            return executor.submit(extract_chunk, self.frame_extractor, job['video'], job['start_seconds'],
+                                   job['end_seconds'], job['start_count'])
+        return executor.submit(self.frame_extractor.extract_frames, job['video'], start_seconds=job['start_seconds'],
+                               end_seconds=job['end_seconds'], start_count=job['start_count'],
+                               progress=progress.tracker(job_id, job['seconds']))
+
+    def run(self, vids):
+        """Probe, plan and extract a batch.
+
+        :param vids: Paths of the files to extract.
+        :return: dict with 'videos', one summary per extracted video, and
+            'skipped', {path: reason} for the files that were left out.
+        """
+        videos, skipped = self.probe(vids)
+        for vid, reason in skipped.items():
+            logger.warning(f"[SKIPPED] - {vid}: {reason}")
+        jobs = self.plan(videos)
+        progress = BatchProgress(sum(job['seconds'] for job in jobs), len(jobs))
+        logger.info(f"[VIDEOS] - {len(videos)} to extract, {len(skipped)} skipped")
+        logger.info(f"[JOBS] - {len(jobs)} on {self.workers} {'processes' if self.processes else 'threads'}, "
+                    f"{format_seconds(progress.total_seconds)} of video, {self.order} first")
+
+        results = {str(vid): {'video': str(vid), 'duration': probe['duration'], 'strategy': None, 'frames': 0,
+                              'chunks': 0} for vid, probe in videos.items()}
+        if self.processes:
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                           initargs=(self.cv2_threads, logging.getLogger().level))
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.workers)
+        with executor:
+            # Both pools start jobs in submission order.
+            futures = {self._submit(executor, job_id, job, progress): (job_id, job) for job_id, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                job_id, job = futures[future]
+                merged = results[str(job['video'])]
+                try:
+                    chunk = future.result()
+                except Exception as ex:
+                    logger.exception(f"[ERROR] - {job['video']} from {job['start_seconds']}s")
+                    merged['error'] = str(ex)
+                else:
+                    merged['strategy'] = merged['strategy'] or chunk['strategy']
+                    merged['frames'] += chunk['frames']
+                merged['chunks'] += 1
+                progress.finish(job_id, job['seconds'])
+        return {'videos': list(results.values()), 'skipped': {str(vid): reason for vid, reason in skipped.items()}}
+
+
+def extract_directory(vid_dir=settings.VIDEO_DIRPATH, out_dir=settings.OUTDIR, img_frmt=settings.REQUIRED_IMAGE_FORMAT,
+                      required_frame_rate=settings.REQUIRED_FRAME_RATE, start_from_seconds=settings.START_FROM_SECOND,
+                      img_width=settings.REQUIRED_IMAGE_WIDTH, workers=None, processes=False, order=LONGEST_FIRST,
+                      chunk_seconds=None, sizes=settings.OUTPUT_SIZES, verbose=True):
+    """Extract frames from every video in a directory.
+
+    Defaults come from settings.py; every one can be overridden on the command line:
+
+        python batch_scheduler.py --vid_dir=videos --out_dir=frames_out --required_frame_rate=2 --processes
+
+    :param vid_dir: Directory with the videos.
+    :param out_dir: Directory the frames are written to.
+    :param img_frmt: Image format of the frames.
+    :param required_frame_rate: Seconds between two extracted frames.
+    :param start_from_seconds: Timestamp of the first extracted frame.
+    :param img_width: Width of the resized frames.
+    :param workers: Jobs extracted at once. Defaults to settings.WORKERS (or one per CPU core)
+        with processes and settings.CONCURRENT_VIDEOS with threads.
+    :param processes: Use worker processes instead of threads.
+    :param order: 'longest' or 'name'.
+    :param chunk_seconds: Split videos longer than this. None picks a length from the batch; 0 never splits.
+    :param sizes: Output sizes written from one decode, e.g. --sizes='[224,720,None]'. See frame_pyramid.py.
+    :param verbose: Log the parameters and timings of every job.
+    """
+    logging.basicConfig(level=settings.LOG_LEVEL, format='%(message)s')
+    vid_dir = Path(vid_dir)
+    if not vid_dir.exists():
+        logger.error(f"The specified path ({vid_dir}) does not exist!")
+        return
+    if workers is None:
+        workers = settings.WORKERS if processes else settings.CONCURRENT_VIDEOS
+
+    time_start = time.time()
+    frame_extractor = FrameExtractor(
+        Path(out_dir), img_frmt, required_frame_rate, start_from_seconds, img_width, verbose, sizes=sizes)
+    scheduler = BatchScheduler(frame_extractor, workers=workers, processes=processes, order=order,
+                               chunk_seconds=chunk_seconds, cv2_threads=settings.CV2_THREADS_PER_WORKER)
+    scheduler.run(list_candidates(vid_dir))
+    logger.info(f"It took {time.time() - time_start:.2f} seconds for conversion.")
+
+
+if __name__ == '__main__':
+    fire.Fire(extract_directory)
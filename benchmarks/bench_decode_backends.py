@@ -0,0 +1,81 @@
+"""Compare decode backends on the same clip: sampled frames/sec and CPU seconds.
+
+Only decoding and sampling are timed (no resize, encode or disk writes).
+Without --video a synthetic 1080p clip is generated first.
+
+    python benchmarks/bench_decode_backends.py --interval=1
+    python benchmarks/bench_decode_backends.py --video=videos/skyscraper.mp4 --interval=0.5
+"""
+# in-built modules
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import fire
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Internal module
+from decode_backends import get_backend
+
+CONFIGS = [
+    ('opencv', {}, 'seek'),
+    ('opencv', {}, 'sequential'),
+    ('pyav', {}, 'seek'),
+    ('pyav', {}, 'sequential'),
+    ('pyav', {'scale_width': 720}, 'sequential'),
+    ('pyav', {'keyframes_only': True}, 'auto'),
+]
+
+
+def write_synthetic_video(path, seconds=60, fps=30, width=1920, height=1080, fourcc='mp4v'):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (31, 31), 0)
+    for i in range(seconds * fps):
+        frame = background.copy()
+        x = (i * 7) % (width - 200)
+        cv2.rectangle(frame, (x, height // 3), (x + 200, height // 3 + 200), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def run_config(video, backend_name, options, strategy, interval):
+    try:
+        backend = get_backend(backend_name, **options)
+        reader = backend.open(video)
+    except ImportError as ex:
+        return {'backend': backend_name, 'options': options, 'error': str(ex)}
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    sampler = reader.sampler(interval=interval, strategy=strategy)
+    frames = sum(1 for _ in sampler)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    reader.close()
+    return {
+        'backend': backend_name,
+        'options': options,
+        'strategy': sampler.choose_strategy(),
+        'frames': frames,
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds': round(cpu, 3),
+        'frames_per_sec': round(frames / wall, 1) if wall else None,
+    }
+
+
+def main(video=None, interval=1.0, seconds=60):
+    with tempfile.TemporaryDirectory() as tmp:
+        if video is None:
+            video = Path(tmp) / 'synthetic.mp4'
+            write_synthetic_video(video, seconds=seconds)
+        results = [run_config(video, name, options, strategy, interval) for name, options, strategy in CONFIGS]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
@@ -0,0 +1,95 @@
+"""Compare the single-pass FrameAnalyzer against the previous two-pass version.
+
+Writes 'frames' synthetic 720px JPEGs (a static background with a moving
+block every few frames) and times both implementations on them, plus the
+single pass with exact=True (full-resolution contour check).
+
+    python benchmarks/bench_frame_analyzer.py --frames=10000
+"""
+# in-built modules
+import gc
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import fire
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Internal module
+from frame_analyzer import FrameAnalyzer
+
+
+def legacy_detect_changes(frames_dir, threshold=25, min_area=300, batch_size=20):
+    """FrameAnalyzer.detect_changes before the single-pass rewrite."""
+    frames = sorted([f for f in frames_dir.glob('*.jpg')])
+    action_frames = []
+    for i in range(0, len(frames) - 1, batch_size):
+        batch_frames = frames[i:min(i + batch_size, len(frames) - 1)]
+        prev_frame = None
+        for frame_path in batch_frames:
+            frame = cv2.imread(str(frame_path))
+            if frame is None:
+                continue
+            if prev_frame is not None:
+                diff = cv2.absdiff(cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY),
+                                   cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+                _, thresh = cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY)
+                contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+                if any(cv2.contourArea(contour) > min_area for contour in contours):
+                    action_frames.append(frame_path)
+            prev_frame = frame.copy()
+        del prev_frame
+        gc.collect()
+    for i in range(len(frames) - 1):
+        gray1 = cv2.cvtColor(cv2.imread(str(frames[i])), cv2.COLOR_BGR2GRAY)
+        gray2 = cv2.cvtColor(cv2.imread(str(frames[i + 1])), cv2.COLOR_BGR2GRAY)
+        _, thresh = cv2.threshold(cv2.absdiff(gray1, gray2), threshold, 255, cv2.THRESH_BINARY)
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if any(cv2.contourArea(contour) > min_area for contour in contours):
+            action_frames.append(frames[i + 1])
+    return action_frames
+
+
+def write_synthetic_frames(frames_dir, frames, width=720, height=405, seed=0):
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (21, 21), 0)
+    x = y = 0
+    for i in range(frames):
+        if i % 5 == 0:
+            x, y = int(rng.integers(0, width - 80)), int(rng.integers(0, height - 80))
+        frame = background.copy()
+        cv2.rectangle(frame, (x, y), (x + 60, y + 60), (255, 255, 255), -1)
+        cv2.imwrite(str(frames_dir / f"{i:06d}.jpg"), frame)
+
+
+def main(frames=10000, threshold=25, min_area=300, batch_size=20, skip_legacy=False):
+    with tempfile.TemporaryDirectory() as tmp:
+        frames_dir = Path(tmp)
+        write_synthetic_frames(frames_dir, frames)
+
+        start = time.perf_counter()
+        detected = FrameAnalyzer(frames_dir, threshold, min_area, batch_size).detect_changes()
+        single_pass = time.perf_counter() - start
+        print(f"[SINGLE PASS] - {single_pass:.2f}s, {len(detected)} action frames")
+
+        start = time.perf_counter()
+        detected = FrameAnalyzer(frames_dir, threshold, min_area, batch_size, exact=True).detect_changes()
+        exact = time.perf_counter() - start
+        print(f"[SINGLE PASS EXACT] - {exact:.2f}s, {len(detected)} action frames")
+
+        if not skip_legacy:
+            start = time.perf_counter()
+            detected = legacy_detect_changes(frames_dir, threshold, min_area, batch_size)
+            legacy = time.perf_counter() - start
+            print(f"[LEGACY] - {legacy:.2f}s, {len(detected)} action frames (with duplicates)")
+            print(f"[SPEEDUP] - {legacy / single_pass:.1f}x, {legacy / exact:.1f}x exact")
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
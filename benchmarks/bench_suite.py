@@ -0,0 +1,313 @@
+"""Reproducible throughput benchmarks for extraction and analysis.
+
+Synthetic videos are generated with cv2.VideoWriter at several resolutions,
+lengths and codecs; FrameExtractor is then run across sampling intervals
+and worker counts, and FrameAnalyzer.detect_changes across frame counts.
+Every case runs in a fresh Python process, so its CPU time and memory
+(worker processes included) are its own: 'peak_rss_bytes' is the largest
+sampled sum of the RSS of the case and its workers, 'peak_process_rss_bytes'
+the peak of the largest single process. Results are written as JSON:
+
+    python benchmarks/bench_suite.py run --output=bench.json
+    python benchmarks/bench_suite.py run --quick --output=bench.json
+    python benchmarks/bench_suite.py compare baseline.json bench.json
+
+Generated videos are kept in --workdir between runs when it is given, so
+repeated runs time the same inputs.
+"""
+# in-built modules
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import fire
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+# Internal module
+from bench_decode_backends import write_synthetic_video
+from bench_frame_analyzer import write_synthetic_frames
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# (name, width, height, seconds, fourcc, container)
+VIDEOS = [
+    ('480p_30s_mp4v', 854, 480, 30, 'mp4v', 'mp4'),
+    ('720p_30s_mp4v', 1280, 720, 30, 'mp4v', 'mp4'),
+    ('1080p_30s_mp4v', 1920, 1080, 30, 'mp4v', 'mp4'),
+    ('720p_120s_mp4v', 1280, 720, 120, 'mp4v', 'mp4'),
+    ('720p_30s_mjpg', 1280, 720, 30, 'MJPG', 'avi'),
+]
+INTERVALS = [0.2, 1.0]
+WORKERS = [1, 4]
+ANALYZER_FRAMES = [1000, 5000]
+
+QUICK_VIDEOS = [('360p_10s_mp4v', 640, 360, 10, 'mp4v', 'mp4')]
+QUICK_INTERVALS = [1.0]
+QUICK_WORKERS = [1, 2]
+QUICK_ANALYZER_FRAMES = [500]
+
+# Fractional change in frames/sec that 'compare' reports as a regression.
+REGRESSION_THRESHOLD = 0.1
+
+# Seconds between two samples of the RSS of a case and its workers.
+RSS_SAMPLE_INTERVAL = 0.05
+
+
+def peak_process_rss_bytes():
+    """Peak resident set size of the largest single process: this one or one of its finished children.
+
+    RUSAGE_CHILDREN reports the largest child, not the sum of the workers; see RSSSampler for that.
+    """
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def process_tree_rss_bytes(pid):
+    """Current RSS of 'pid' plus all of its descendants, read from /proc.
+
+    :return: bytes, or None where /proc isn't available.
+    """
+    children, rss = {}, {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as file:
+                # The command name may contain spaces; the fields after it don't.
+                fields = file.read().rsplit(')', 1)[1].split()
+        except (OSError, IndexError):
+            continue  # Exited while listing.
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss[int(entry)] = int(fields[21])
+    if pid not in rss:
+        return None
+    total, pending = 0, [pid]
+    while pending:
+        process = pending.pop()
+        total += rss[process]
+        pending.extend(children.get(process, ()))
+    return total * os.sysconf('SC_PAGE_SIZE')
+
+
+class RSSSampler:
+    """Sample the summed RSS of this process and its workers in a background thread.
+
+    ru_maxrss only knows the largest process, so the memory of a multi-worker
+    case is sampled instead. Peaks shorter than RSS_SAMPLE_INTERVAL may be missed.
+    'peak' is None where /proc isn't available.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self):
+        while True:
+            rss = process_tree_rss_bytes(os.getpid())
+            if rss is None:
+                return
+            self.peak = max(self.peak or 0, rss)
+            if self._stop.wait(self.interval):
+                return
+
+
+def cpu_seconds():
+    """User + system CPU time of this process and of its finished children."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def ensure_video(workdir, spec):
+    name, width, height, seconds, fourcc, container = spec
+    path = Path(workdir) / f"{name}.{container}"
+    if not path.exists():
+        write_synthetic_video(path, seconds=seconds, fps=30, width=width, height=height, fourcc=fourcc)
+    return path
+
+
+def extract_case(video, interval, workers, out_dir):
+    # Imported here so settings.py resolves paths from the repository root.
+    from batch_scheduler import BatchScheduler
+    from frame_extractor_multithread import FrameExtractor
+
+    frame_extractor = FrameExtractor(Path(out_dir), required_frame_rate=interval, verbose=False,
+                                     resume=False)
+    if workers == 1:
+        return frame_extractor.extract_frames(Path(video))['frames']
+    scheduler = BatchScheduler(frame_extractor, workers=workers, processes=True, min_chunk_seconds=1)
+    return sum(result['frames'] for result in scheduler.run([Path(video)])['videos'])
+
+
+def analyze_case(frames_dir):
+    from frame_analyzer import FrameAnalyzer
+
+    FrameAnalyzer(Path(frames_dir), threshold=25, min_area=300, batch_size=20).detect_changes()
+    return len(list(Path(frames_dir).glob('*.jpg')))
+
+
+def case(spec, result_path):
+    """Run one benchmark case in this process and write its measurements to 'result_path'.
+
+    Called by 'run' in a subprocess; the extractor prints progress on stdout,
+    so results go to a file instead.
+    """
+    spec = json.loads(spec) if isinstance(spec, str) else spec
+    with tempfile.TemporaryDirectory() as out_dir, RSSSampler() as rss:
+        wall_start, cpu_start = time.perf_counter(), cpu_seconds()
+        if spec['kind'] == 'extract':
+            frames = extract_case(spec['video'], spec['interval'], spec['workers'], out_dir)
+        else:
+            frames = analyze_case(spec['frames_dir'])
+        wall, cpu = time.perf_counter() - wall_start, cpu_seconds() - cpu_start
+    result = {
+        'frames': frames,
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds': round(cpu, 3),
+        'frames_per_sec': round(frames / wall, 1) if wall else None,
+        'peak_rss_bytes': rss.peak,
+        'peak_process_rss_bytes': peak_process_rss_bytes(),
+    }
+    with open(result_path, 'w') as file:
+        json.dump(result, file)
+
+
+def run_case(spec):
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as file:
+        result_path = file.name
+    try:
+        process = subprocess.run(
+            [sys.executable, __file__, 'case', json.dumps(spec), result_path],
+            cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if process.returncode != 0:
+            lines = process.stderr.strip().splitlines()
+            return {**spec, 'error': lines[-1] if lines else f"exit code {process.returncode}"}
+        with open(result_path) as file:
+            return {**spec, **json.load(file)}
+    finally:
+        os.remove(result_path)
+
+
+def case_key(result):
+    """Identity of a case across runs, used by 'compare'."""
+    if result['kind'] == 'extract':
+        return f"extract {result['name']} interval={result['interval']} workers={result['workers']}"
+    return f"analyze frames={result['frame_count']}"
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run(output=None, workdir=None, quick=False):
+    """Run the whole matrix and print (or write to 'output') the JSON report.
+
+    :param output: File to write the report to. Printed when None.
+    :param workdir: Directory for the generated inputs, reused between runs. A temp dir when None.
+    :param quick: Run a small matrix that finishes in well under a minute.
+    """
+    videos, intervals, workers_list, analyzer_frames = (
+        (QUICK_VIDEOS, QUICK_INTERVALS, QUICK_WORKERS, QUICK_ANALYZER_FRAMES) if quick
+        else (VIDEOS, INTERVALS, WORKERS, ANALYZER_FRAMES))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(workdir or tmp).resolve()
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = []
+        for spec in videos:
+            video = ensure_video(workdir, spec)
+            if not cv2.VideoCapture(str(video)).isOpened():
+                results.append({'kind': 'extract', 'name': spec[0],
+                                'error': f"{spec[4]} is not supported by this OpenCV build"})
+                continue
+            for interval in intervals:
+                for workers in workers_list:
+                    result = run_case({'kind': 'extract', 'name': spec[0], 'video': str(video),
+                                       'interval': interval, 'workers': workers})
+                    print(f"[{case_key(result)}] - {result.get('frames_per_sec', result.get('error'))} frames/sec",
+                          file=sys.stderr)
+                    results.append(result)
+
+        for frame_count in analyzer_frames:
+            frames_dir = workdir / f"analyzer_{frame_count}"
+            if not frames_dir.exists():
+                frames_dir.mkdir()
+                write_synthetic_frames(frames_dir, frame_count)
+            result = run_case({'kind': 'analyze', 'frame_count': frame_count, 'frames_dir': str(frames_dir)})
+            print(f"[{case_key(result)}] - {result.get('frames_per_sec', result.get('error'))} frames/sec",
+                  file=sys.stderr)
+            results.append(result)
+
+    report = json.dumps({'meta': metadata(), 'results': results}, indent=2)
+    if output is None:
+        print(report)
+    else:
+        Path(output).write_text(report)
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Print the frames/sec change of every case between two reports.
+
+    :return: number of cases slower than 'threshold' (as a fraction).
+    """
+    with open(baseline) as file:
+        before = {case_key(result): result for result in json.load(file)['results'] if 'error' not in result}
+    with open(current) as file:
+        after = {case_key(result): result for result in json.load(file)['results'] if 'error' not in result}
+
+    regressions = 0
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key]['frames_per_sec'], after[key]['frames_per_sec']
+        change = (new - old) / old if old else 0.0
+        flag = ''
+        if change < -threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{key}: {old} -> {new} frames/sec ({change:+.1%}){flag}")
+    return regressions
+
+
+if __name__ == '__main__':
+    fire.Fire({'run': run, 'case': case, 'compare': compare})
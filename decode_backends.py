@@ -0,0 +1,221 @@
+# in-built modules
+from pathlib import Path
+
+# dependencies packages
+import cv2
+
+# Internal module
+from frame_buffers import decode_into
+from frame_sampler import AUTO, STRATEGIES, TIMESTAMP_TOLERANCE_MS, FrameSampler, GridSampler
+
+# PyAV-only strategy: decode keyframes only and pick the first one at or after each target.
+KEYFRAMES = 'keyframes'
+# Packets demuxed (not decoded) when probing keyframe spacing with PyAV.
+KEYFRAME_PROBE_PACKETS = 600
+
+
+class OpenCVBackend:
+    """Decode with cv2.VideoCapture."""
+
+    name = 'opencv'
+    # VideoCapture.read/retrieve fill a given array, so FrameBufferPool arrays are reused.
+    decodes_into_buffers = True
+
+    def open(self, vid):
+        return OpenCVReader(vid)
+
+
+class OpenCVReader:
+    def __init__(self, vid):
+        self.vid_cap = cv2.VideoCapture(str(Path(vid)))
+        self.frame_count = int(self.vid_cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self.vid_cap.get(cv2.CAP_PROP_FPS)
+
+    def sampler(self, interval, start_from_seconds=0, end_at_seconds=None, strategy=AUTO,
+                keyframe_interval=None, max_samples=None, timers=None, buffers=None):
+        """Return a FrameSampler yielding (timestamp_ms, image) tuples."""
+        return FrameSampler(
+            self.vid_cap,
+            interval=interval,
+            start_from_seconds=start_from_seconds,
+            end_at_seconds=end_at_seconds,
+            strategy=strategy,
+            keyframe_interval=keyframe_interval,
+            max_samples=max_samples,
+            timers=timers,
+            buffers=buffers,
+        )
+
+    def close(self):
+        self.vid_cap.release()
+
+
+class PyAVBackend:
+    """Decode with FFmpeg through PyAV.
+
+    Exposes decoder features OpenCV doesn't:
+
+    Args:
+        threads: Decoder threads. 0 lets FFmpeg choose.
+        keyframes_only: Decode keyframes only (skip_frame=NONKEY). Samples
+            snap to the first keyframe at or after each target timestamp.
+        scale_width: Convert decoded frames straight to this width with
+            swscale instead of returning full-resolution arrays.
+    """
+
+    name = 'pyav'
+    # to_ndarray always allocates; FrameBufferPool only bounds the bytes in flight.
+    decodes_into_buffers = False
+
+    def __init__(self, threads=0, keyframes_only=False, scale_width=None):
+        self.threads = threads
+        self.keyframes_only = keyframes_only
+        self.scale_width = scale_width
+
+    def open(self, vid):
+        return PyAVReader(vid, self)
+
+
+class PyAVReader:
+    def __init__(self, vid, backend):
+        try:
+            import av
+        except ImportError as ex:
+            raise ImportError("The 'pyav' decode backend needs PyAV: pip install av") from ex
+
+        self.backend = backend
+        self.container = av.open(str(Path(vid)))
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = 'AUTO'
+        self.stream.codec_context.thread_count = backend.threads
+        if backend.keyframes_only:
+            self.stream.codec_context.skip_frame = 'NONKEY'
+        # Timestamps are reported relative to the stream start, like OpenCV's CAP_PROP_POS_MSEC.
+        self.start_offset = float(self.stream.start_time * self.stream.time_base) if self.stream.start_time else 0
+        rate = self.stream.average_rate or self.stream.guessed_rate
+        self.fps = float(rate) if rate else 0
+        self.frame_count = self.stream.frames
+        if not self.frame_count and self.fps:
+            # Matroska/WebM streams report neither a frame count nor a duration, only the container does.
+            if self.stream.duration:
+                duration = float(self.stream.duration * self.stream.time_base)
+            else:
+                duration = self.container.duration / av.time_base if self.container.duration else 0
+            self.frame_count = int(duration * self.fps)
+
+    def sampler(self, interval, start_from_seconds=0, end_at_seconds=None, strategy=AUTO,
+                keyframe_interval=None, max_samples=None, timers=None, buffers=None):
+        """Return a PyAVSampler yielding (timestamp_ms, image) tuples."""
+        return PyAVSampler(self, interval, start_from_seconds, end_at_seconds, strategy,
+                           keyframe_interval, max_samples, timers, buffers)
+
+    def seek(self, seconds):
+        """Seek to the keyframe at or before 'seconds'."""
+        pts = int((seconds + self.start_offset) / self.stream.time_base)
+        self.container.seek(pts, stream=self.stream, backward=True)
+
+    def output_size(self, width, height):
+        """(width, height) of the arrays returned for frames of the given size."""
+        scale_width = self.backend.scale_width
+        if scale_width and scale_width != width:
+            return scale_width, max(2, round(height * scale_width / width / 2) * 2)
+        return width, height
+
+    @property
+    def frame_shape(self):
+        width, height = self.output_size(self.stream.codec_context.width, self.stream.codec_context.height)
+        return height, width, 3
+
+    def to_image(self, frame):
+        width, height = self.output_size(frame.width, frame.height)
+        if width != frame.width:
+            return frame.to_ndarray(format='bgr24', width=width, height=height)
+        return frame.to_ndarray(format='bgr24')
+
+    def close(self):
+        self.container.close()
+
+
+class PyAVSampler(GridSampler):
+    """GridSampler over a PyAVReader, with a 'keyframes' strategy on top of the shared ones.
+
+    Seeks land on the keyframe before the target and decode forward to it.
+    """
+
+    strategies = STRATEGIES + (KEYFRAMES,)
+
+    def __init__(self, reader, interval, start_from_seconds=0, end_at_seconds=None, strategy=AUTO,
+                 keyframe_interval=None, max_samples=None, timers=None, buffers=None):
+        super().__init__(interval, start_from_seconds, end_at_seconds, strategy, keyframe_interval, max_samples,
+                         timers, buffers)
+        self.reader = reader
+        self.fps = reader.fps
+        self.frame_shape = reader.frame_shape if buffers is not None else None
+
+    def probe_keyframe_interval(self):
+        """Estimate keyframe spacing in seconds from packet flags, without decoding."""
+        keyframe_times = []
+        for index, packet in enumerate(self.reader.container.demux(self.reader.stream)):
+            if index >= KEYFRAME_PROBE_PACKETS:
+                break
+            if packet.is_keyframe and packet.pts is not None:
+                keyframe_times.append(float(packet.pts * packet.time_base))
+        self.reader.seek(self.start_from_seconds)
+        if len(keyframe_times) < 2:
+            return None
+        keyframe_times.sort()
+        return (keyframe_times[-1] - keyframe_times[0]) / (len(keyframe_times) - 1)
+
+    def choose_strategy(self):
+        # skip_frame=NONKEY only hands keyframes to the decoder, which are then sampled sequentially.
+        if self.reader.backend.keyframes_only:
+            self._resolved = KEYFRAMES
+        return super().choose_strategy()
+
+    def _frames(self):
+        frames = self.reader.container.decode(self.reader.stream)
+        while True:
+            with self._timed('decode'):
+                frame = next(frames, None)
+            if frame is None:
+                return
+            if frame.time is not None:
+                yield (frame.time - self.reader.start_offset) * 1000, frame
+
+    def _seek_frame(self, target_ms):
+        with self._timed('seek'):
+            self.reader.seek(target_ms / 1000)
+        for timestamp_ms, frame in self._frames():
+            if timestamp_ms + TIMESTAMP_TOLERANCE_MS >= target_ms:
+                return timestamp_ms, frame
+        return None
+
+    def _seek_start(self):
+        self.reader.seek(self.start_from_seconds)
+
+    def _retrieve(self, frame):
+        def decode(dst):
+            with self._timed('decode'):
+                return True, self.reader.to_image(frame)
+
+        if self.buffers is None:
+            return decode(None)
+        # Waits for room in the memory budget before converting the frame.
+        success, image = decode_into(self.buffers, self.frame_shape, decode)
+        self.frame_shape = image.shape
+        return success, image
+
+
+BACKENDS = {
+    OpenCVBackend.name: OpenCVBackend,
+    PyAVBackend.name: PyAVBackend,
+}
+
+
+def get_backend(name, **options):
+    """Instantiate a decode backend by name ('opencv' or 'pyav')."""
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown decode backend '{name}', expected one of {sorted(BACKENDS)}")
+    return backend_cls(**options)
@@ -0,0 +1,173 @@
+# in-built modules
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+MANIFEST_FILENAME = 'manifest.jsonl'
+# Bytes hashed from the head and the tail of a source video for its fingerprint.
+FINGERPRINT_BYTES = 1024 * 1024
+
+_lock = threading.Lock()
+
+
+def source_fingerprint(vid):
+    """Identify a source video without hashing all of it.
+
+    Size and mtime catch almost every change; the hash of the first and last
+    megabyte catches files that were replaced in place with the same size.
+    """
+    stat = os.stat(vid)
+    digest = hashlib.sha1()
+    with open(vid, 'rb') as file:
+        digest.update(file.read(FINGERPRINT_BYTES))
+        if stat.st_size > FINGERPRINT_BYTES:
+            file.seek(max(FINGERPRINT_BYTES, stat.st_size - FINGERPRINT_BYTES))
+            digest.update(file.read(FINGERPRINT_BYTES))
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': digest.hexdigest()}
+
+
+class ManifestState:
+    """What a previous run of one video with the same parameters already did."""
+
+    def __init__(self):
+        # {frame number: record} of the written frames and the dropped duplicates.
+        self.frames = {}
+        self.done = set()
+
+    def _in_range(self, first_count, end_count):
+        return [record for n, record in self.frames.items()
+                if n >= first_count and (end_count is None or n < end_count)]
+
+    def last(self, first_count, end_count=None, kept=False):
+        """Latest record numbered in [first_count, end_count), or None.
+
+        Frames are recorded in the order they were sampled and recording stops
+        at the first failure, so everything before the latest record is done.
+
+        :param kept: Only consider written frames, not dropped duplicates.
+        """
+        records = [record for record in self._in_range(first_count, end_count)
+                   if not kept or record['t'] == 'frame']
+        return max(records, key=lambda record: record['n'], default=None)
+
+    def action_files(self, first_count, end_count=None):
+        """Names of the frames in [first_count, end_count) the inline analysis marked as action frames."""
+        return sorted(record['file'] for record in self._in_range(first_count, end_count) if record.get('a'))
+
+
+class ExtractionManifest:
+    """Append-only JSON lines record of what was extracted into an output directory.
+
+    Every line is one record:
+
+    - ``{"t": "run", "key": ..., "video": ..., "source": {...}, "params": {...}, "start": 1}``
+    - ``{"t": "frame", "key": ..., "n": 12, "file": "00_00_05_00012_name.jpg", "ms": 5000.0, "h": "...", "a": 1}``
+      ('h' is the frame's dHash when deduplicating, 'a' marks an action frame)
+    - ``{"t": "dup", "key": ..., "n": 13, "ms": 5500.0, "h": "..."}`` for a frame dropped as a duplicate
+    - ``{"t": "done", "key": ..., "start": 1, "frames": 120}``
+
+    'key' ties records to one source file extracted with one set of
+    parameters, so changing either starts over instead of resuming. Records
+    are appended with a single write each, so threads and worker processes
+    can share one manifest.
+    """
+
+    def __init__(self, out_dir):
+        self.path = Path(out_dir) / MANIFEST_FILENAME
+
+    @staticmethod
+    def run_key(vid, params):
+        payload = json.dumps({'video': Path(vid).name, 'source': source_fingerprint(vid), 'params': params},
+                             sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    def exists(self):
+        return self.path.exists()
+
+    def _append(self, record):
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def records(self):
+        if not self.path.exists():
+            return
+        with open(self.path) as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A crash can leave a truncated last line.
+                    continue
+
+    def _terminate_last_line(self):
+        # After a crash the last record may be cut off; start a fresh line so
+        # the next record isn't glued onto it.
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        with open(self.path, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) == b'\n':
+                return
+        with _lock, open(self.path, 'ab') as file:
+            file.write(b'\n')
+
+    def begin(self, key, vid, params, start_count):
+        self._terminate_last_line()
+        self._append({'t': 'run', 'key': key, 'video': Path(vid).name, 'source': source_fingerprint(vid),
+                      'params': params, 'start': start_count})
+
+    def record_frame(self, key, count, filename, timestamp_ms, frame_hash=None, action=False):
+        record = {'t': 'frame', 'key': key, 'n': count, 'file': filename, 'ms': round(timestamp_ms, 3)}
+        if frame_hash is not None:
+            record['h'] = frame_hash
+        if action:
+            record['a'] = 1
+        self._append(record)
+
+    def record_duplicate(self, key, count, timestamp_ms, frame_hash):
+        self._append({'t': 'dup', 'key': key, 'n': count, 'ms': round(timestamp_ms, 3), 'h': frame_hash})
+
+    def record_done(self, key, start_count, frames):
+        self._append({'t': 'done', 'key': key, 'start': start_count, 'frames': frames})
+
+    def load(self, key):
+        """Collect the written (or dropped as duplicate) frames and finished ranges recorded under 'key'."""
+        state = ManifestState()
+        for record in self.records():
+            if record.get('key') != key:
+                continue
+            if record['t'] in ('frame', 'dup'):
+                state.frames[record['n']] = record
+            elif record['t'] == 'done':
+                state.done.add(record['start'])
+        return state
+
+    def mark_duplicates(self, filenames):
+        """Record frames deleted after extraction as dropped duplicates, so that
+        resumed runs and index backfills leave them out."""
+        filenames = set(filenames)
+        for record in self.frame_records():
+            if record['file'] in filenames:
+                self.record_duplicate(record['key'], record['n'], record['ms'], record.get('h'))
+
+    def frame_records(self):
+        """Records of the written frames, without those marked as duplicates afterwards."""
+        frames = {}
+        for record in self.records():
+            if record.get('t') == 'frame':
+                frames[(record['key'], record['n'])] = record
+            elif record.get('t') == 'dup':
+                frames.pop((record.get('key'), record.get('n')), None)
+        return list(frames.values())
+
+    def frame_files(self):
+        """Sorted names of all frames recorded in the manifest."""
+        return sorted({record['file'] for record in self.frame_records()})
@@ -1,81 +1,204 @@
 
 import cv2
+import json
 import numpy as np
-import gc
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Directory inside an extraction that holds the inline analysis sidecars.
+ANALYSIS_DIRNAME = 'analysis'
+
+# imread flags that decode straight to a downsampled grayscale plane.
+REDUCED_GRAYSCALE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
 class FrameAnalyzer:
-    def __init__(self, frames_dir: Path, threshold=30, min_area=500, batch_size=10):
+    """Find frames that differ noticeably from the frame before them.
+
+    Frames are compared as grayscale planes decoded at 1/downscale resolution,
+    and a frame is an action frame when one connected region of changed
+    pixels is larger than min_area / downscale**2 plane pixels. That is
+    faster than the original full-resolution contour check, but frames whose
+    largest region is close to 'min_area' can come out differently; 'exact'
+    reproduces the original check.
+
+    Args:
+        frames_dir: Directory with the extracted frames.
+        threshold: Per-pixel intensity difference that counts as a change.
+        min_area: Minimum changed region, in pixels of a frame 'width' wide.
+        batch_size: Frames decoded ahead, in parallel, while the diff runs.
+        downscale: Compare frames decoded at 1/downscale resolution (1, 2, 4 or 8).
+        width: Width of the frames the results refer to; frames of another width
+            are resized to it before comparing. None uses the frames' own width.
+        exact: Compare full-resolution planes and measure the external contours
+            of the changed regions like the original analyzer. 'downscale' is ignored.
+    """
+
+    def __init__(self, frames_dir: Path, threshold=30, min_area=500, batch_size=10, downscale=2, width=None,
+                 exact=False):
+        if downscale not in REDUCED_GRAYSCALE_FLAGS:
+            raise ValueError(f"downscale must be one of {sorted(REDUCED_GRAYSCALE_FLAGS)}")
         self.frames_dir = frames_dir
         self.threshold = threshold
         self.min_area = min_area
         self.batch_size = batch_size
-    
+        self.downscale = 1 if exact else downscale
+        self.width = width
+        self.exact = exact
+
+    def params(self):
+        """Parameters that change the result, e.g. for cache keys."""
+        return {'threshold': self.threshold, 'min_area': self.min_area, 'downscale': self.downscale,
+                'width': self.width, 'exact': self.exact}
+
+    def load_plane(self, frame_path):
+        """Decode a frame straight into a downsampled grayscale plane."""
+        if self.exact:
+            plane = cv2.imread(str(frame_path))
+            plane = None if plane is None else cv2.cvtColor(plane, cv2.COLOR_BGR2GRAY)
+        else:
+            plane = cv2.imread(str(frame_path), REDUCED_GRAYSCALE_FLAGS[self.downscale])
+        if plane is None or self.width is None:
+            return plane
+        # Frames of another width, e.g. 'orig_size_frames', are compared at the same scale as 'width'.
+        height, width = plane.shape[:2]
+        plane_width = max(1, self.width // self.downscale)
+        if width == plane_width:
+            return plane
+        plane_height = max(1, round(height * plane_width / width))
+        return cv2.resize(plane, (plane_width, plane_height), interpolation=cv2.INTER_AREA)
+
+    def is_changed(self, prev_plane, plane):
+        """Return True if 'plane' has a changed region larger than 'min_area'."""
+        diff = cv2.absdiff(prev_plane, plane)
+        _, thresh = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+
+        if self.exact:
+            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            return any(cv2.contourArea(contour) > self.min_area for contour in contours)
+
+        # Areas shrink with the square of the downscale factor.
+        min_area = self.min_area / (self.downscale ** 2)
+        # No single region can be larger than all changed pixels together.
+        if cv2.countNonZero(thresh) <= min_area:
+            return False
+        _, _, stats, _ = cv2.connectedComponentsWithStats(thresh, connectivity=8)
+        return bool(np.any(stats[1:, cv2.CC_STAT_AREA] > min_area))
+
+    def iter_planes(self, frames):
+        """Yield (frame_path, plane) in order, decoding 'batch_size' frames ahead."""
+        batch_size = max(1, self.batch_size)
+        with ThreadPoolExecutor(max_workers=batch_size) as executor:
+            for i in range(0, len(frames), batch_size):
+                batch = frames[i:i + batch_size]
+                yield from zip(batch, executor.map(self.load_plane, batch))
+
     def detect_changes(self):
-        frames = sorted([f for f in self.frames_dir.glob('*.jpg')])
+        """Compare every frame with the previous one in a single pass.
+
+        Each frame is decoded once and only the previous plane is kept.
+
+        :return: sorted list of paths of the frames that changed.
+        """
+        frames = sorted(self.frames_dir.glob('*.jpg'))
         action_frames = []
-        
+
         if len(frames) < 2:
             return action_frames
-            
-        # Process frames in batches
-        for i in range(0, len(frames)-1, self.batch_size):
-            batch_end = min(i + self.batch_size, len(frames)-1)
-            batch_frames = frames[i:batch_end]
-            
-            prev_frame = None
-            for frame_path in batch_frames:
-                frame = cv2.imread(str(frame_path))
-                if frame is None:
-                    continue
-                    
-                if prev_frame is not None:
-                    # Convert to grayscale
-                    gray1 = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
-                    gray2 = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    
-                    # Calculate absolute difference
-                    diff = cv2.absdiff(gray1, gray2)
-                    
-                    # Threshold the difference
-                    _, thresh = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
-                    
-                    # Find contours
-                    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                    
-                    # Check if any contour exceeds minimum area
-                    for contour in contours:
-                        if cv2.contourArea(contour) > self.min_area:
-                            action_frames.append(frame_path)
-                            break
-                
-                prev_frame = frame.copy()
-                
-            # Force garbage collection after each batch
-            del prev_frame
-            gc.collect()
-            
-        for i in range(len(frames)-1):
-            frame1 = cv2.imread(str(frames[i]))
-            frame2 = cv2.imread(str(frames[i+1]))
-            
-            # Convert to grayscale
-            gray1 = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
-            gray2 = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
-            
-            # Calculate absolute difference
-            diff = cv2.absdiff(gray1, gray2)
-            
-            # Threshold the difference
-            _, thresh = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
-            
-            # Find contours
-            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Check if any contour exceeds minimum area
-            for contour in contours:
-                if cv2.contourArea(contour) > self.min_area:
-                    action_frames.append(frames[i+1])
-                    break
-                    
+
+        prev_plane = None
+        for frame_path, plane in self.iter_planes(frames):
+            if plane is None:
+                continue
+            if prev_plane is not None and prev_plane.shape == plane.shape and self.is_changed(prev_plane, plane):
+                action_frames.append(frame_path)
+            prev_plane = plane
+
         return action_frames
+
+
+class StreamingFrameAnalyzer(FrameAnalyzer):
+    """Run the FrameAnalyzer diff on decoded frames while they are extracted.
+
+    Frames must be passed to 'observe' in order. Each frame is reduced to the
+    grayscale plane FrameAnalyzer would have decoded from the saved frame, so
+    'threshold' and 'min_area' mean the same thing in both.
+
+    Args:
+        threshold: Per-pixel intensity difference that counts as a change.
+        min_area: Minimum changed region, in pixels of a frame 'width' wide.
+        downscale: Compare frames at 1/downscale of 'width'.
+        width: Width of the frames the results refer to. None uses the decoded width.
+        exact: Use FrameAnalyzer's full-resolution contour check.
+    """
+
+    def __init__(self, threshold=30, min_area=500, downscale=2, width=None, exact=False):
+        super().__init__(None, threshold=threshold, min_area=min_area, batch_size=1, downscale=downscale,
+                         width=width, exact=exact)
+        self.action_frames = []
+        self._prev_plane = None
+
+    def copy(self):
+        """Return a new analyzer with the same parameters and no state."""
+        return StreamingFrameAnalyzer(self.threshold, self.min_area, self.downscale, self.width, self.exact)
+
+    def plane_from_image(self, image):
+        """Reduce a BGR frame to the grayscale plane used for comparison."""
+        height, width = image.shape[:2]
+        plane_width = max(1, (self.width or width) // self.downscale)
+        plane_height = max(1, round(height * plane_width / width))
+        small = cv2.resize(image, (plane_width, plane_height), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def seed(self, image):
+        """Take 'image' as the previous frame without comparing it, e.g. the last frame before a resume."""
+        self._prev_plane = self.plane_from_image(image)
+
+    def observe(self, frame_name, image):
+        """Compare a frame with the previous one and record it if it changed.
+
+        :param frame_name: File name the frame is saved under.
+        :param image: Decoded BGR frame.
+        :return: True if the frame is an action frame.
+        """
+        plane = self.plane_from_image(image)
+        changed = self._prev_plane is not None and self.is_changed(self._prev_plane, plane)
+        if changed:
+            self.action_frames.append(frame_name)
+        self._prev_plane = plane
+        return changed
+
+    def save(self, out_dir, name):
+        """Write the detected action frames to '<out_dir>/analysis/<name>.json'."""
+        analysis_dir = Path(out_dir) / ANALYSIS_DIRNAME
+        analysis_dir.mkdir(parents=True, exist_ok=True)
+        sidecar = analysis_dir / f"{name}.json"
+        with open(sidecar, 'w') as file:
+            json.dump({**self.params(), 'action_frames': self.action_frames}, file)
+        return sidecar
+
+
+def load_action_frames(extraction_dir, params):
+    """Read the inline analysis sidecars of an extraction.
+
+    :param params: FrameAnalyzer.params() the sidecars must have been computed with.
+    :return: sorted frame names, or None if there are no sidecars computed
+        with these parameters.
+    """
+    sidecars = sorted((Path(extraction_dir) / ANALYSIS_DIRNAME).glob('*.json'))
+    if not sidecars:
+        return None
+    wanted = params
+    action_frames = []
+    for sidecar in sidecars:
+        with open(sidecar) as file:
+            result = json.load(file)
+        if any(result.get(key) != value for key, value in wanted.items()):
+            return None
+        action_frames.extend(result['action_frames'])
+    return sorted(action_frames)
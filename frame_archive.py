@@ -0,0 +1,306 @@
+# in-built modules
+import io
+import json
+import mmap
+import os
+import tarfile
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import numpy as np
+
+# Internal module
+from frame_pyramid import DEFAULT_QUALITY, ENCODE_PARAMS, encode_image
+
+ARCHIVE_DIRNAME = 'shards'
+
+# Per-frame record stored next to the pixels of an .npy shard.
+INDEX_DTYPE = np.dtype([('frame_num', '<i8'), ('timestamp_ms', '<f8')])
+
+
+def resize_to_width(image, width):
+    height, image_width = image.shape[:2]
+    if not width or width == image_width:
+        return image
+    return cv2.resize(image, (width, max(1, round(height * width / image_width))), interpolation=cv2.INTER_AREA)
+
+
+class TarShardWriter:
+    """Write frames into WebDataset-style tar shards.
+
+    Every frame is stored as two members sharing a key, '<key>.<img_frmt>'
+    and '<key>.json' (frame number, timestamp and file name), and a new shard
+    is started every 'shard_frames' frames. Shards are written as
+    '<name>-NNNNNN.tar.part' and renamed once complete, so readers never see
+    a half-written shard.
+
+    Args:
+        shard_frames: Frames per shard.
+        img_frmt: 'jpg', 'webp' or 'png'.
+        width: Resize frames to this width. None keeps the decoded size.
+        quality: JPEG/WebP quality (0-100), or PNG compression level (0-9).
+            None uses frame_pyramid.DEFAULT_QUALITY.
+    """
+
+    name = 'tar'
+
+    def __init__(self, shard_frames=1000, img_frmt='jpg', width=None, quality=None):
+        if img_frmt not in ENCODE_PARAMS:
+            raise ValueError(f"Unknown archive image format '{img_frmt}', expected one of {sorted(ENCODE_PARAMS)}")
+        self.shard_frames = shard_frames
+        self.img_frmt = img_frmt
+        self.width = width
+        self.quality = DEFAULT_QUALITY[img_frmt] if quality is None else quality
+        self.out_dir = None
+        self.run_name = None
+        self.frames = 0
+        self.shards = []
+        self._tar = None
+        self._part_path = None
+
+    def params(self):
+        return {'archive': self.name, 'shard_frames': self.shard_frames, 'img_frmt': self.img_frmt,
+                'width': self.width, 'quality': self.quality}
+
+    def copy(self, out_dir, name):
+        """Return a writer with the same parameters for one run, writing '<out_dir>/shards/<name>-NNNNNN.tar'."""
+        writer = TarShardWriter(self.shard_frames, self.img_frmt, self.width, self.quality)
+        writer.out_dir = Path(out_dir) / ARCHIVE_DIRNAME
+        writer.run_name = name
+        writer.out_dir.mkdir(parents=True, exist_ok=True)
+        return writer
+
+    def prepare(self, position, frame_num, timestamp_ms, filename, image):
+        """Encode a frame; runs on the encoder threads."""
+        buffer = encode_image(resize_to_width(image, self.width), self.img_frmt, self.quality)
+        meta = {'frame_num': frame_num, 'timestamp_ms': timestamp_ms, 'file': filename}
+        return buffer.tobytes(), json.dumps(meta).encode()
+
+    def write(self, filename, item):
+        """Append a prepared frame to the current shard; runs on the writer thread."""
+        if self._tar is None:
+            shard_path = self.out_dir / f"{self.run_name}-{len(self.shards):06d}.tar"
+            self._part_path = shard_path.with_name(shard_path.name + '.part')
+            self._tar = tarfile.open(self._part_path, 'w', format=tarfile.USTAR_FORMAT)
+            self.shards.append(shard_path)
+        # WebDataset splits keys from extensions at the first dot.
+        key = Path(filename).stem.replace('.', '_')
+        for extension, data in zip((self.img_frmt, 'json'), item):
+            info = tarfile.TarInfo(f"{key}.{extension}")
+            info.size = len(data)
+            self._tar.addfile(info, io.BytesIO(data))
+        self.frames += 1
+        if self.frames % self.shard_frames == 0:
+            self._finish_shard()
+
+    def _finish_shard(self):
+        self._tar.close()
+        os.replace(self._part_path, self.shards[-1])
+        self._tar = None
+
+    def close(self):
+        if self._tar is not None:
+            self._finish_shard()
+        return self.shards
+
+
+class NpyShardWriter:
+    """Write frames into memory-mappable .npy shards of fixed-size frames.
+
+    Each shard is a uint8 array of shape (frames, height, width, 3) in BGR
+    order, '<name>-NNNNNN.npy', plus '<name>-NNNNNN.index.npy' holding the
+    frame numbers and timestamps. A frame's slot is fixed by its position in
+    the run, so frames may arrive in any order; shards are preallocated as
+    memory maps and renamed from '.part' once full.
+
+    Args:
+        shard_frames: Frames per shard.
+        width: Width every frame is resized to.
+        height: Height every frame is resized to. None keeps the aspect ratio of the video.
+    """
+
+    name = 'npy'
+
+    def __init__(self, shard_frames=1000, width=224, height=None):
+        self.shard_frames = shard_frames
+        self.width = width
+        self.height = height
+        self.out_dir = None
+        self.run_name = None
+        self.shards = []
+        self._open = {}
+
+    def params(self):
+        return {'archive': self.name, 'shard_frames': self.shard_frames, 'width': self.width, 'height': self.height}
+
+    def copy(self, out_dir, name):
+        """Return a writer with the same parameters for one run, writing '<out_dir>/shards/<name>-NNNNNN.npy'."""
+        writer = NpyShardWriter(self.shard_frames, self.width, self.height)
+        writer.out_dir = Path(out_dir) / ARCHIVE_DIRNAME
+        writer.run_name = name
+        writer.out_dir.mkdir(parents=True, exist_ok=True)
+        return writer
+
+    def prepare(self, position, frame_num, timestamp_ms, filename, image):
+        """Resize a frame to the shard's frame size; runs on the encoder threads."""
+        height = self.height or max(1, round(image.shape[0] * self.width / image.shape[1]))
+        frame = cv2.resize(image, (self.width, height), interpolation=cv2.INTER_AREA)
+        return position, frame, frame_num, timestamp_ms
+
+    def _paths(self, shard):
+        frames_path = self.out_dir / f"{self.run_name}-{shard:06d}.npy"
+        return frames_path, frames_path.with_name(f"{self.run_name}-{shard:06d}.index.npy")
+
+    def write(self, filename, item):
+        """Copy a prepared frame into its shard; runs on the writer thread."""
+        position, frame, frame_num, timestamp_ms = item
+        shard, slot = divmod(position, self.shard_frames)
+        state = self._open.get(shard)
+        if state is None:
+            frames_path, index_path = self._paths(shard)
+            frames = np.lib.format.open_memmap(
+                f"{frames_path}.part", mode='w+', dtype=np.uint8, shape=(self.shard_frames, *frame.shape))
+            index = np.zeros(self.shard_frames, dtype=INDEX_DTYPE)
+            state = self._open[shard] = {'frames': frames, 'index': index, 'filled': 0, 'last': -1}
+        state['frames'][slot] = frame
+        state['index'][slot] = (frame_num, timestamp_ms)
+        state['filled'] += 1
+        state['last'] = max(state['last'], slot)
+        if state['filled'] == self.shard_frames:
+            self._finish_shard(shard)
+
+    def _finish_shard(self, shard):
+        state = self._open.pop(shard)
+        frames_path, index_path = self._paths(shard)
+        frames, length = state['frames'], state['last'] + 1
+        if length < self.shard_frames:
+            # The last shard of a run is rarely full; copy its frames into a file of the right length.
+            trimmed = np.lib.format.open_memmap(f"{frames_path}.trim", mode='w+', dtype=np.uint8,
+                                                shape=(length, *frames.shape[1:]))
+            trimmed[:] = frames[:length]
+            trimmed.flush()
+            del trimmed
+            os.replace(f"{frames_path}.trim", f"{frames_path}.part")
+        else:
+            frames.flush()
+        del frames, state['frames']
+        np.save(index_path, state['index'][:length])
+        os.replace(f"{frames_path}.part", frames_path)
+        self.shards.append(frames_path)
+
+    def close(self):
+        for shard in sorted(self._open):
+            self._finish_shard(shard)
+        return sorted(self.shards)
+
+
+ARCHIVES = {
+    TarShardWriter.name: TarShardWriter,
+    NpyShardWriter.name: NpyShardWriter,
+}
+
+
+def get_archive(name, **options):
+    """Instantiate a frame archive writer by name ('tar' or 'npy'); None means per-file images."""
+    if name is None:
+        return None
+    try:
+        archive_cls = ARCHIVES[name]
+    except KeyError:
+        raise ValueError(f"Unknown frame archive '{name}', expected one of {sorted(ARCHIVES)}")
+    return archive_cls(**options)
+
+
+class NpyShardReader:
+    """Memory-map an .npy shard and read its frames in batches.
+
+    Args:
+        path: Path of the '<name>-NNNNNN.npy' shard.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.frames = np.load(self.path, mmap_mode='r')
+        self.index = np.load(self.path.with_name(f"{self.path.stem}.index.npy"))
+
+    def __len__(self):
+        return len(self.frames)
+
+    def batches(self, batch_size=64):
+        """Yield (frames, index) slices of up to 'batch_size' frames.
+
+        'frames' is a read-only view of the memory map; pages are read as the
+        batch is used.
+        """
+        for start in range(0, len(self), batch_size):
+            yield self.frames[start:start + batch_size], self.index[start:start + batch_size]
+
+
+class TarShardReader:
+    """Memory-map a tar shard and read its encoded frames in batches.
+
+    Member offsets are taken from the tar headers once; frames are returned
+    as memoryviews into the mapping, so no per-file reads or copies happen
+    before decoding.
+
+    Args:
+        path: Path of the '<name>-NNNNNN.tar' shard.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        samples = {}
+        with tarfile.open(self.path) as tar:
+            for member in tar:
+                key, _, extension = member.name.partition('.')
+                samples.setdefault(key, {})[extension] = (member.offset_data, member.size)
+        self.samples = [(key, members) for key, members in samples.items()]
+        with open(self.path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def _member(self, offset_size):
+        offset, size = offset_size
+        return self._view[offset:offset + size]
+
+    def batches(self, batch_size=64):
+        """Yield (encoded frames, metadata dicts) lists of up to 'batch_size' frames.
+
+        Decode an encoded frame with cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_COLOR).
+        """
+        for start in range(0, len(self), batch_size):
+            frames, metadata = [], []
+            for key, members in self.samples[start:start + batch_size]:
+                image = next(value for extension, value in members.items() if extension != 'json')
+                frames.append(self._member(image))
+                metadata.append(json.loads(bytes(self._member(members['json']))))
+            yield frames, metadata
+
+    def close(self):
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Frames from 'batches' are still referenced; the mapping is closed once they are freed.
+            pass
+
+
+def open_shard(path):
+    """Return the reader for a '.npy' or '.tar' shard."""
+    path = Path(path)
+    if path.suffix == '.npy':
+        return NpyShardReader(path)
+    if path.suffix == '.tar':
+        return TarShardReader(path)
+    raise ValueError(f"Unknown shard type: {path}")
+
+
+def list_shards(extraction_dir):
+    """Sorted paths of the finished shards of an extraction."""
+    shards_dir = Path(extraction_dir) / ARCHIVE_DIRNAME
+    return sorted(path for path in shards_dir.glob('*')
+                  if path.suffix == '.tar' or (path.suffix == '.npy' and not path.name.endswith('.index.npy')))
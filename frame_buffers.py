@@ -0,0 +1,205 @@
+# in-built modules
+import itertools
+import sys
+import threading
+
+# dependencies packages
+import cv2
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def frame_nbytes(shape, dtype=np.uint8):
+    return int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, or None where it isn't available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def decode_into(buffers, shape, decode):
+    """Decode one frame under a FrameBuffers reservation.
+
+    :param buffers: FrameBuffers of the run.
+    :param shape: Expected shape of the frame; the reservation is corrected if the decoded one differs.
+    :param decode: Called as decode(dst) with an array to decode into (or None); returns (success, image).
+    :return: (success, image). A failed decode gives its reservation back.
+    """
+    buffer = buffers.acquire(shape)
+    try:
+        success, image = decode(buffer)
+    except BaseException:
+        buffers.release(None, frame_nbytes(shape))
+        raise
+    if not success:
+        buffers.release(None, frame_nbytes(shape))
+    elif image.shape != tuple(shape):
+        buffers.adjust(shape, image)
+    return success, image
+
+
+class FrameBufferPool:
+    """Bound the bytes of decoded frames in flight and recycle their arrays.
+
+    The decoder reserves a frame's bytes with 'acquire' before decoding it and
+    waits while the reservation would exceed 'budget_bytes'; the frame's
+    consumer hands the array back with 'release' once it has been resized and
+    encoded. Released arrays are kept for the next 'acquire' of the same shape,
+    so backends that decode into a given array (OpenCV's read/retrieve) stop
+    allocating a full-resolution frame per sample. Free arrays count against
+    the budget too.
+
+    One pool can be shared by all the extractions of a process, so concurrent
+    videos split one budget instead of each holding their own queue of frames.
+    A frame is always admitted when nothing is in flight, even if it alone is
+    larger than the budget.
+
+    Args:
+        budget_bytes: Upper bound on decoded frame bytes held at once.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.in_flight_bytes = 0
+        self.free_bytes = 0
+        self.peak_bytes = 0
+        self._free = {}
+        self._jobs = {}
+        self._job_ids = itertools.count()
+        self._cond = threading.Condition()
+
+    def __getstate__(self):
+        # Worker processes get an empty pool with the same budget each.
+        return {'budget_bytes': self.budget_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state['budget_bytes'])
+
+    def _update_peak(self, job):
+        self.peak_bytes = max(self.peak_bytes, self.in_flight_bytes + self.free_bytes)
+        stats = self._jobs[job]
+        stats['peak_bytes'] = max(stats['peak_bytes'], stats['in_flight_bytes'])
+
+    def job(self):
+        """Return the FrameBuffers handle a single extraction run uses."""
+        with self._cond:
+            job = next(self._job_ids)
+            self._jobs[job] = {'in_flight_bytes': 0, 'peak_bytes': 0, 'frames': 0, 'reused': 0}
+        return FrameBuffers(self, job)
+
+    def acquire(self, job, shape, dtype=np.uint8):
+        """Reserve the bytes of one frame, waiting for room in the budget.
+
+        :return: a free array of 'shape' to decode into, or None to let the decoder allocate.
+        """
+        key = (tuple(shape), np.dtype(dtype))
+        nbytes = frame_nbytes(shape, dtype)
+        with self._cond:
+            while self.in_flight_bytes and self.in_flight_bytes + nbytes > self.budget_bytes:
+                self._cond.wait()
+            buffers = self._free.get(key)
+            buffer = buffers.pop() if buffers else None
+            if buffer is not None:
+                self.free_bytes -= nbytes
+            else:
+                # Drop free arrays of other shapes when they are what keeps the new frame over budget.
+                for other in list(self._free):
+                    if self.in_flight_bytes + self.free_bytes + nbytes <= self.budget_bytes:
+                        break
+                    self.free_bytes -= sum(free.nbytes for free in self._free.pop(other))
+            stats = self._jobs[job]
+            self.in_flight_bytes += nbytes
+            stats['in_flight_bytes'] += nbytes
+            stats['frames'] += 1
+            stats['reused'] += buffer is not None
+            self._update_peak(job)
+            return buffer
+
+    def adjust(self, job, reserved_shape, image):
+        """Correct a reservation when the decoded frame's shape differs from the reserved one."""
+        delta = image.nbytes - frame_nbytes(reserved_shape, image.dtype)
+        if delta:
+            with self._cond:
+                self.in_flight_bytes += delta
+                self._jobs[job]['in_flight_bytes'] += delta
+                self._update_peak(job)
+                self._cond.notify_all()
+
+    def release(self, job, image, nbytes=None, reuse=True):
+        """Return a frame's reservation and keep its array for reuse.
+
+        :param image: The decoded frame, or None when decoding failed.
+        :param nbytes: Bytes reserved for the frame. Defaults to image.nbytes.
+        :param reuse: Keep the array for the next 'acquire'.
+        """
+        nbytes = image.nbytes if nbytes is None else nbytes
+        with self._cond:
+            self.in_flight_bytes -= nbytes
+            self._jobs[job]['in_flight_bytes'] -= nbytes
+            if (reuse and image is not None and image.flags.owndata and image.flags.writeable
+                    and self.in_flight_bytes + self.free_bytes + image.nbytes <= self.budget_bytes):
+                self._free.setdefault((image.shape, image.dtype), []).append(image)
+                self.free_bytes += image.nbytes
+            self._cond.notify_all()
+
+    def finish(self, job):
+        """Forget a run and return its stats: frames, reused buffers and peak in-flight bytes."""
+        with self._cond:
+            stats = self._jobs.pop(job)
+        del stats['in_flight_bytes']
+        return stats
+
+
+class FrameBuffers:
+    """One extraction run's handle on a shared FrameBufferPool."""
+
+    def __init__(self, pool, job):
+        self.pool = pool
+        self.job = job
+
+    def acquire(self, shape, dtype=np.uint8):
+        return self.pool.acquire(self.job, shape, dtype)
+
+    def adjust(self, reserved_shape, image):
+        self.pool.adjust(self.job, reserved_shape, image)
+
+    def release(self, image, nbytes=None, reuse=True):
+        self.pool.release(self.job, image, nbytes, reuse)
+
+    def finish(self):
+        return self.pool.finish(self.job)
+
+
+class ResizeBuffers:
+    """Per-thread output arrays for cv2.resize, reused for every frame of the same size.
+
+    A resized frame is encoded on the thread that resized it and isn't needed
+    afterwards, so one array per thread and size is enough.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+
+    def resize(self, image, size, interpolation=cv2.INTER_AREA):
+        """cv2.resize into this thread's array for 'size' (width, height)."""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        shape = (size[1], size[0], *image.shape[2:])
+        dst = buffers.get((shape, image.dtype))
+        if dst is None:
+            dst = buffers[(shape, image.dtype)] = np.empty(shape, dtype=image.dtype)
+            with self._lock:
+                self.nbytes += dst.nbytes
+        return cv2.resize(image, size, dst=dst, interpolation=interpolation)
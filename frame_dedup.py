@@ -0,0 +1,169 @@
+# in-built modules
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import fire
+import numpy as np
+
+# Internal module
+import settings
+from extraction_manifest import ExtractionManifest
+from frame_index import FrameIndex
+
+logger = logging.getLogger(__name__)
+
+# Bits set in every byte value, for Hamming distances of packed hashes.
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def dhash(image, hash_size=8):
+    """Difference hash of a frame: one bit per horizontally adjacent pixel pair
+    of a (hash_size + 1) x hash_size grayscale thumbnail.
+
+    :param image: BGR or grayscale frame.
+    :return: hash as a hex string of hash_size * hash_size bits.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return np.packbits(small[:, 1:] > small[:, :-1]).tobytes().hex()
+
+
+def hamming_distance(hash_a, hash_b):
+    """Number of differing bits between two hex hashes."""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+
+class FrameDeduplicator:
+    """Drop frames that look the same as the last kept frame.
+
+    Frames must be passed to 'check' in order. A frame is a duplicate when the
+    Hamming distance between its dHash and the last kept frame's is at most
+    'max_distance'; comparing with the last kept frame rather than the
+    previous one stops slow drift from being dropped frame after frame.
+
+    Args:
+        max_distance: Largest Hamming distance (out of hash_size ** 2 bits) that counts as a duplicate.
+        hash_size: Hash grid size; 8 gives 64-bit hashes.
+    """
+
+    def __init__(self, max_distance=4, hash_size=8):
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.kept = 0
+        self.dropped = 0
+        self._last_hash = None
+
+    def copy(self):
+        """Return a new deduplicator with the same parameters and no state."""
+        return FrameDeduplicator(self.max_distance, self.hash_size)
+
+    def seed(self, frame_hash):
+        """Compare the next frames with 'frame_hash', e.g. the last kept frame before a resume."""
+        self._last_hash = frame_hash
+
+    def check(self, image):
+        """Hash a frame and compare it with the last kept one.
+
+        :return: (is_duplicate, hash).
+        """
+        frame_hash = dhash(image, self.hash_size)
+        if self._last_hash is not None and hamming_distance(frame_hash, self._last_hash) <= self.max_distance:
+            self.dropped += 1
+            return True, frame_hash
+        self._last_hash = frame_hash
+        self.kept += 1
+        return False, frame_hash
+
+    def params(self):
+        return {'max_distance': self.max_distance, 'hash_size': self.hash_size}
+
+
+def hash_files(paths, hash_size=8, workers=8):
+    """dHash many image files at once.
+
+    Files are decoded at 1/8 scale on 'workers' threads, and the thumbnails
+    are compared and packed for all files in a few NumPy operations.
+
+    :return: (N, hash_size * hash_size / 8) uint8 array of packed hashes, and
+        a boolean array marking files that couldn't be decoded.
+    """
+    def load(path):
+        plane = cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if plane is None:
+            return None
+        return cv2.resize(plane, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        thumbnails = list(executor.map(load, paths))
+    failed = np.array([thumbnail is None for thumbnail in thumbnails], dtype=bool)
+    blank = np.zeros((hash_size, hash_size + 1), dtype=np.uint8)
+    stack = np.stack([blank if thumbnail is None else thumbnail for thumbnail in thumbnails]) \
+        if thumbnails else np.empty((0, hash_size, hash_size + 1), dtype=np.uint8)
+    bits = (stack[:, :, 1:] > stack[:, :, :-1]).reshape(len(stack), -1)
+    return np.packbits(bits, axis=1), failed
+
+
+def find_duplicates(hashes, max_distance=4, skip=None):
+    """Indexes of the hashes within 'max_distance' bits of the last kept hash before them.
+
+    :param hashes: (N, bytes) packed hashes in frame order, as returned by hash_files.
+    :param skip: Optional boolean array of entries to ignore.
+    """
+    duplicates = []
+    last = None
+    for index, frame_hash in enumerate(hashes):
+        if skip is not None and skip[index]:
+            continue
+        if last is not None and int(POPCOUNT[np.bitwise_xor(frame_hash, last)].sum()) <= max_distance:
+            duplicates.append(index)
+        else:
+            last = frame_hash
+    return duplicates
+
+
+def dedup_extraction(extraction_dir, max_distance=4, hash_size=8, remove=False, img_frmt='jpg', index_path=None):
+    """Find (and optionally delete) near-duplicate frames of an existing extraction.
+
+    Frames are hashed from 're_size_frames' (or 'orig_size_frames' when there
+    are no resized frames) in name order; duplicates are removed from both
+    directories, and recorded as dropped duplicates in the extraction's
+    manifest so a resumed extraction or an index backfill doesn't bring
+    them back.
+
+    :param extraction_dir: Output directory of one extraction.
+    :param max_distance: Largest Hamming distance that counts as a duplicate.
+    :param hash_size: Hash grid size.
+    :param remove: Delete the duplicate frames instead of only listing them.
+    :param img_frmt: Extension of the frame files.
+    :param index_path: Frame index database to delete the removed frames from, if any.
+    :return: sorted file names of the duplicate frames.
+    """
+    extraction_dir = Path(extraction_dir)
+    frame_dirs = [extraction_dir / 're_size_frames', extraction_dir / 'orig_size_frames']
+    frame_dirs = [frame_dir for frame_dir in frame_dirs if frame_dir.exists()]
+    if not frame_dirs:
+        return []
+    paths = sorted(frame_dirs[0].glob(f"*.{img_frmt}"))
+    hashes, failed = hash_files(paths, hash_size)
+    duplicates = [paths[index].name for index in find_duplicates(hashes, max_distance, skip=failed)]
+    logger.info(f"[FRAMES] - {len(paths)}")
+    logger.info(f"[DUPLICATES] - {len(duplicates)}")
+    if remove:
+        for name in duplicates:
+            for frame_dir in frame_dirs:
+                (frame_dir / name).unlink(missing_ok=True)
+        manifest = ExtractionManifest(extraction_dir)
+        if manifest.exists():
+            manifest.mark_duplicates(duplicates)
+        if index_path is not None:
+            FrameIndex(index_path).remove_frames(extraction_dir.name, duplicates)
+    return duplicates
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=settings.LOG_LEVEL, format='%(message)s')
+    fire.Fire(dedup_extraction)
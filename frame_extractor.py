@@ -1,12 +1,19 @@
 # in-built modules
+import logging
 from pathlib import Path
 
 # dependencies packages
 import cv2
 
+# Internal module
+from frame_sampler import FrameSampler
+
+logger = logging.getLogger(__name__)
+
 
 class FrameExtractor:
-    def __init__(self, vid, out_dir, img_frmt, required_frame_rate, start_from_seconds, img_width, verbose):
+    def __init__(self, vid, out_dir, img_frmt, required_frame_rate, start_from_seconds, img_width, verbose,
+                 sampling_strategy='auto', keyframe_interval=None):
         self.vid = vid
         self.out_dir = out_dir
         self.img_frmt = img_frmt
@@ -14,6 +21,8 @@ class FrameExtractor:
         self.start_from_seconds = start_from_seconds or 0
         self.img_width = img_width
         self.verbose = verbose
+        self.sampling_strategy = sampling_strategy
+        self.keyframe_interval = keyframe_interval
 
     def create_dir_if_not_exists(self, dirname: str):
         """Create a directory with the specified name inside the 'out_dir' 
@@ -30,7 +39,10 @@ class FrameExtractor:
         return target_dir
 
     def extract_frames(self):
-        """Extract frames from a video."""
+        """Extract frames from a video.
+
+        :return: the sampling strategy that was used ('seek' or 'sequential').
+        """
         count = 1
 
         vid_cap = cv2.VideoCapture(str(Path(self.vid)))
@@ -41,48 +53,50 @@ class FrameExtractor:
             # Calculate how many frames we should extract based on settings
             target_frames = int(seconds / (1/self.required_frame_rate))
         except ZeroDivisionError as ex:
-            print("Unable to detect seconds")
+            logger.warning("Unable to detect seconds")
             seconds = 1
             target_frames = 1
 
-        if self.verbose:
-            print("======================================")
-            print(f"[OUT FILE DIRECTORY] - {self.out_dir}")
-            print(f"[TOTAL SOURCE FRAMES] - {frames}")
-            print(f"[SOURCE FPS] - {fps}")
-            print(f"[VIDEO LENGTH] - {seconds} seconds")
-            print(f"[TARGET EXTRACTION RATE] - {self.required_frame_rate} frames/sec")
-            print(f"[EXPECTED OUTPUT FRAMES] - {target_frames}")
         # start from 1 if 'start_from_seconds' is not passed.
-        sec = int(self.start_from_seconds)
-        vid_cap.set(cv2.CAP_PROP_POS_MSEC, sec * 1000)
+        sampler = FrameSampler(
+            vid_cap,
+            interval=self.required_frame_rate,
+            start_from_seconds=int(self.start_from_seconds),
+            strategy=self.sampling_strategy,
+            keyframe_interval=self.keyframe_interval,
+        )
+        strategy = sampler.choose_strategy()
+
+        if self.verbose:
+            logger.info("======================================")
+            logger.info(f"[OUT FILE DIRECTORY] - {self.out_dir}")
+            logger.info(f"[TOTAL SOURCE FRAMES] - {frames}")
+            logger.info(f"[SOURCE FPS] - {fps}")
+            logger.info(f"[VIDEO LENGTH] - {seconds} seconds")
+            logger.info(f"[TARGET EXTRACTION RATE] - {self.required_frame_rate} frames/sec")
+            logger.info(f"[EXPECTED OUTPUT FRAMES] - {target_frames}")
+            logger.info(f"[SAMPLING STRATEGY] - {strategy}")
         vidname = self.vid.stem
 
         orig_file_dir = self.create_dir_if_not_exists('orig_size_frames')
         resize_file_dir = self.create_dir_if_not_exists('re_size_frames')
-        while (vid_cap.isOpened()):
-            success, image = vid_cap.read()
-            if success:
-                try:
-                    orig_file_location = f"{orig_file_dir}/{vidname}_{count}.{self.img_frmt}"
-                    resize_file_location = f"{resize_file_dir}/{vidname}_{count}.{self.img_frmt}"
-
-                    # Write orig size image
-                    cv2.imwrite(orig_file_location, image)
-
-                    # Resize and write the image
-                    img = cv2.resize(image, self.img_width)
-                    cv2.imwrite(resize_file_location, img)
-
-                    print(f"Done: {count}")
-                except Exception as ex:
-                    print("[ERROR CODE 1001]")
-                    print(ex)
-            else:
-                print(
-                    f"Done extracting frames: {count - 1} orig & {count - 1} resized frames extracted.")
-                break
+        for _, image in sampler:
+            try:
+                orig_file_location = f"{orig_file_dir}/{vidname}_{count}.{self.img_frmt}"
+                resize_file_location = f"{resize_file_dir}/{vidname}_{count}.{self.img_frmt}"
+
+                # Write orig size image
+                cv2.imwrite(orig_file_location, image)
 
+                # Resize and write the image
+                img = cv2.resize(image, self.img_width)
+                cv2.imwrite(resize_file_location, img)
+
+                logger.debug("Done: %s", count)
+            except Exception:
+                logger.exception("[ERROR CODE 1001]")
             count += 1
-            sec += self.required_frame_rate
-            vid_cap.set(cv2.CAP_PROP_POS_MSEC, sec * 1000)
+
+        vid_cap.release()
+        logger.info(f"Done extracting frames: {count - 1} orig & {count - 1} resized frames extracted.")
+        return strategy
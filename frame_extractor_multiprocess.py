@@ -0,0 +1,77 @@
+# in-built modules
+import functools
+import logging
+import math
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import fire
+
+logger = logging.getLogger(__name__)
+
+
+def init_worker(cv2_threads, log_level=None):
+    """Process pool initializer: cap OpenCV's own thread pool in each worker
+    so N workers don't each spawn one OpenCV thread per core."""
+    if cv2_threads is not None:
+        cv2.setNumThreads(cv2_threads)
+    if log_level is not None:
+        # Spawned workers don't inherit the parent's logging setup.
+        logging.basicConfig(level=log_level, format='%(message)s')
+
+
+def extract_chunk(frame_extractor, vid, start_seconds, end_seconds, start_count):
+    """Run one time-range chunk in a worker process with its own VideoCapture."""
+    return frame_extractor.extract_frames(
+        vid, start_seconds=start_seconds, end_seconds=end_seconds, start_count=start_count)
+
+
+def video_duration(vid):
+    """Return the duration of a video in seconds, or None if it can't be read."""
+    vid_cap = cv2.VideoCapture(str(Path(vid)))
+    frames = int(vid_cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = vid_cap.get(cv2.CAP_PROP_FPS)
+    vid_cap.release()
+    if frames <= 0 or not fps:
+        return None
+    return frames / fps
+
+
+def plan_chunks(vid, interval, start_from_seconds, chunk_seconds, duration=None):
+    """Split a video into time ranges aligned on sample boundaries.
+
+    Args:
+        vid: Path of the video file.
+        interval: Seconds between two sampled frames.
+        start_from_seconds: Timestamp of the first sample.
+        chunk_seconds: Target length of a chunk. None keeps the video whole.
+        duration: Duration of the video in seconds, when it was already probed.
+
+    Returns:
+        List of (start_seconds, end_seconds, start_count) tuples. The last chunk's
+        end is None so it runs to the end of the video. 'start_count' is the
+        sample slot of 'start_seconds' plus one: extracted frames are numbered
+        by slot (see FrameSampler.samples), not by a running count, so the
+        numbers hold even when a slot yields no frame of its own.
+    """
+    if duration is None:
+        duration = video_duration(vid)
+    if duration is None or not chunk_seconds:
+        return [(start_from_seconds, None, 1)]
+
+    samples = max(1, math.ceil((duration - start_from_seconds) / interval))
+    per_chunk = max(1, math.ceil(chunk_seconds / interval))
+    chunks = []
+    for first in range(0, samples, per_chunk):
+        last = first + per_chunk
+        end = round(start_from_seconds + last * interval, 6) if last < samples else None
+        chunks.append((round(start_from_seconds + first * interval, 6), end, first + 1))
+    return chunks
+
+
+if __name__ == '__main__':
+    # Imported here: batch_scheduler imports this module.
+    from batch_scheduler import extract_directory
+
+    fire.Fire(functools.partial(extract_directory, processes=True))
@@ -1,24 +1,77 @@
 # in-built modules
+import logging
+import math
 from pathlib import Path
 import time
-from concurrent.futures import ThreadPoolExecutor
 
 # dependencies packages
 import cv2
+import fire
 import imutils
 
 # Internal module
 import settings
+from decode_backends import get_backend
+from extraction_manifest import ExtractionManifest
+from frame_buffers import FrameBufferPool, ResizeBuffers, peak_rss_bytes
+from frame_archive import get_archive
+from frame_pipeline import FramePipeline
+from frame_pyramid import get_pyramid
+from frame_sampler import TIMESTAMP_TOLERANCE_MS, sample_slot
+from metrics import REGISTRY, StageTimers
+
+logger = logging.getLogger(__name__)
+
+# Frames buffered before they are inserted into the frame index in one transaction.
+INDEX_BATCH_SIZE = 100
 
 
 class FrameExtractor:
-    def __init__(self, out_dir, img_frmt='jpg', required_frame_rate=None, start_from_seconds=None, img_width=720, verbose=True):
+    def __init__(self, out_dir, img_frmt='jpg', required_frame_rate=None, start_from_seconds=None, img_width=720, verbose=True,
+                 sampling_strategy=settings.SAMPLING_STRATEGY, keyframe_interval=settings.KEYFRAME_INTERVAL_SECONDS,
+                 encoders=settings.PIPELINE_ENCODERS, decode_queue_size=settings.DECODE_QUEUE_SIZE,
+                 write_queue_size=settings.WRITE_QUEUE_SIZE, write_original=settings.WRITE_ORIGINAL_FRAMES,
+                 analyzer=None, backend=None, resume=settings.RESUME_EXTRACTION, frame_index=None,
+                 eager_resize=settings.EAGER_RESIZE, sprites=None, archive=None, dedup=None,
+                 memory_budget=settings.FRAME_MEMORY_BUDGET_BYTES, buffer_pool=None, sizes=settings.OUTPUT_SIZES):
         self.out_dir = out_dir
         self.img_frmt = img_frmt
         self.required_frame_rate = required_frame_rate or 1
         self.start_from_seconds = start_from_seconds or 0
         self.img_width = img_width
         self.verbose = verbose
+        self.sampling_strategy = sampling_strategy
+        self.keyframe_interval = keyframe_interval
+        self.encoders = encoders
+        self.decode_queue_size = decode_queue_size
+        self.write_queue_size = write_queue_size
+        self.write_original = write_original
+        # Optional StreamingFrameAnalyzer run on every decoded frame.
+        self.analyzer = analyzer
+        # Decoder used to read the videos, see decode_backends.py.
+        self.backend = backend or get_backend(settings.DECODE_BACKEND, **settings.DECODE_BACKEND_OPTIONS)
+        # Record written frames in the output directory's manifest and skip/resume finished work.
+        self.resume = resume
+        # Optional FrameIndex catalog that gets a row for every written frame.
+        self.frame_index = frame_index
+        # Write 're_size_frames' during extraction; when False the web app renders thumbnails on demand.
+        self.eager_resize = eager_resize
+        # Optional SpriteSheetWriter packing a thumbnail of every frame into tiled sheets.
+        self.sprites = sprites
+        # Optional TarShardWriter/NpyShardWriter replacing the per-file images, see frame_archive.py.
+        self.archive = archive or get_archive(settings.FRAME_ARCHIVE, **settings.FRAME_ARCHIVE_OPTIONS)
+        # Optional FrameDeduplicator dropping frames that look like the last written one.
+        self.dedup = dedup
+        # Optional FrameBufferPool bounding the decoded frames in flight; pass one pool to
+        # several extractors (or share the extractor between threads) to split one budget.
+        self.buffer_pool = buffer_pool or (FrameBufferPool(memory_budget) if memory_budget else None)
+        # Optional FramePyramid writing every frame at several sizes and formats, replacing
+        # 'orig_size_frames' and 're_size_frames'; 'sizes' is a list of levels, see frame_pyramid.py.
+        self.pyramid = get_pyramid(sizes)
+        if self.archive is not None and self.pyramid is not None:
+            raise ValueError("Use either a frame archive or output sizes, not both")
+        if self.archive is None and self.pyramid is None and not (write_original or eager_resize):
+            raise ValueError("Nothing to write: enable 'write_original' or 'eager_resize'")
 
     def create_dir_if_not_exists(self, dirname: str):
         """Create a directory with the specified name inside the 'out_dir' 
@@ -34,82 +87,392 @@ class FrameExtractor:
             return target_dir
         return target_dir
 
-    def extract_frames(self, vid):
-        """Extract frames from a video."""
-        count = 1
+    def encode_image(self, img):
+        """Encode an image into 'img_frmt' bytes.
+
+        :param img: BGR image.
+        :return: encoded image buffer.
+        """
+        success, buffer = cv2.imencode(f".{self.img_frmt}", img)
+        if not success:
+            raise ValueError(f"Unable to encode frame as {self.img_frmt}")
+        return buffer
+
+    def manifest_params(self):
+        """Parameters that change the extracted frames; a manifest only resumes runs with the same ones."""
+        return {
+            'img_frmt': self.img_frmt,
+            'interval': self.required_frame_rate,
+            'start_from_seconds': int(self.start_from_seconds),
+            'img_width': self.img_width,
+            'write_original': self.write_original,
+            'eager_resize': self.eager_resize,
+            'archive': self.archive.params() if self.archive is not None else None,
+            'pyramid': self.pyramid.params() if self.pyramid is not None else None,
+            'dedup': self.dedup.params() if self.dedup is not None else None,
+            'backend': self.backend.name,
+            'backend_options': vars(self.backend),
+        }
+
+    @staticmethod
+    def probe_reader(reader):
+        """Frame count, integer fps and duration (seconds) of an opened video.
 
-        vid_cap = cv2.VideoCapture(str(Path(vid)))
-        frames = int(vid_cap.get(cv2.CAP_PROP_FRAME_COUNT)) - 1
-        fps = int(vid_cap.get(cv2.CAP_PROP_FPS))
+        :return: (frames, fps, duration); duration is None when the container
+            doesn't report a frame rate.
+        """
+        frames = reader.frame_count - 1
+        fps = int(reader.fps)
         try:
-            seconds = int(frames/fps)
-            target_frames = int(seconds * self.required_frame_rate)
-        except ZeroDivisionError as ex:
-            print("Unable to detect seconds")
-            seconds = 1
-            target_frames = 1
+            duration = frames / fps
+        except ZeroDivisionError:
+            duration = None
+        return frames, fps, duration
 
-        if self.verbose:
-            print("======================================")
-            print(f"[OUT FILE DIRECTORY] - {self.out_dir}")
-            print(f"[TOTAL SOURCE FRAMES] - {frames}")
-            print(f"[SOURCE FPS] - {fps}")
-            print(f"[VIDEO LENGTH] - {seconds} seconds")
-            print(f"[TARGET EXTRACTION RATE] - {self.required_frame_rate} frames/sec")
-            print(f"[EXPECTED OUTPUT FRAMES] - {target_frames}")
-        # start from 1 if 'start_from_seconds' is not passed.
-        sec = int(self.start_from_seconds)
-        vid_cap.set(cv2.CAP_PROP_POS_MSEC, sec * 1000)
-        vidname = vid.stem
-
-        orig_file_dir = self.create_dir_if_not_exists('orig_size_frames')
-        resize_file_dir = self.create_dir_if_not_exists('re_size_frames')
-        while (vid_cap.isOpened()):
-            success, image = vid_cap.read()
-            if success:
+    def probe(self, vid):
+        """Open a video with the decode backend and read its frame count, fps and duration.
+
+        :return: dict with 'frames', 'fps' and 'duration', or None if the file
+            can't be decoded or reports no frames.
+        """
+        try:
+            reader = self.backend.open(vid)
+        except Exception:
+            return None
+        try:
+            frames, fps, duration = self.probe_reader(reader)
+        finally:
+            reader.close()
+        if frames <= 0 or not duration:
+            return None
+        return {'frames': frames, 'fps': fps, 'duration': duration}
+
+    def frame_filename(self, timestamp_ms, count, vidname):
+        """File name of a frame, shared by every output directory."""
+        # Format timestamp with padded numbers for proper sorting
+        timestamp = time.strftime('%H_%M_%S', time.gmtime(timestamp_ms/1000))
+        frame_num = str(count).zfill(5)  # Pad with zeros for proper sorting
+        return f"{timestamp}_{frame_num}_{vidname}.{self.img_frmt}"
+
+    @staticmethod
+    def write_file(path, data):
+        """Write an encoded image buffer to 'path'."""
+        with open(path, 'wb') as file:
+            file.write(data)
+
+    def extract_frames(self, vid, start_seconds=None, end_seconds=None, start_count=1, progress=None):
+        """Extract frames from a video.
+
+        With 'resume', a range recorded as done in the output directory's manifest
+        is skipped, and a partial one continues after its last recorded frame.
+
+        :param vid: Path of the video file.
+        :param start_seconds: Start of the time range to extract. Defaults to 'start_from_seconds'.
+        :param end_seconds: End (exclusive) of the time range to extract. Defaults to the end of the video.
+        :param start_count: Frame number of the sample at 'start_seconds'. Frames are numbered by
+            their slot on the sampling grid, so chunks of one video extracted separately keep
+            the same file names as a single run.
+        :param progress: Optional callable, called as progress(frames_written, expected_frames)
+            before the first frame and after every written frame.
+        :return: dict with the video path, the sampling strategy used, the number of frames written
+            and failed, the wall time and per-stage latency summaries ('timings').
+        """
+        wall_start = time.perf_counter()
+        buffers = self.buffer_pool.job() if self.buffer_pool is not None else None
+        reuse_buffers = self.backend.decodes_into_buffers
+        # Per-run stage latencies, also recorded in the process-wide metrics registry.
+        timers = StageTimers(parent=REGISTRY.stages)
+        reader = self.backend.open(vid)
+        archive = None
+        buffer_stats = None
+        try:
+            frames, fps, duration = self.probe_reader(reader)
+            if duration is None:
+                logger.warning("Unable to detect seconds")
+                duration = 1
+            seconds = int(duration)
+
+            # start from 1 if 'start_from_seconds' is not passed.
+            if start_seconds is None:
+                start_seconds = int(self.start_from_seconds)
+            vidname = vid.stem
+            interval = self.required_frame_rate
+
+            analyzer = self.analyzer.copy() if self.analyzer is not None else None
+            dedup = self.dedup.copy() if self.dedup is not None else None
+
+            manifest = ExtractionManifest(self.out_dir) if self.resume else None
+            range_start_count = start_count
+            # Frames numbered below 'resume_count' (or not later than 'resume_ms') were
+            # written by the run being resumed and are decoded again only to seed the analyzer.
+            resume_count = resume_ms = seed_count = None
+            if manifest is not None:
+                run_key = manifest.run_key(vid, self.manifest_params())
+                state = manifest.load(run_key)
+                if start_count in state.done:
+                    logger.info("Skipping %s, already extracted to %s", vid, self.out_dir)
+                    return {'video': str(vid), 'strategy': None, 'frames': 0, 'skipped': True}
+                end_count = (start_count + math.ceil(round((end_seconds - start_seconds) / interval, 6))
+                             if end_seconds is not None else None)
+                last = state.last(start_count, end_count)
+                if last is not None:
+                    # Continue one interval after the last recorded frame, on the same sampling
+                    # grid, with the frame numbers taken from the manifest.
+                    resume_slot = last['n'] + 1 - start_count
+                    if 'ms' in last:
+                        resume_ms = last['ms']
+                        resume_slot = max(resume_slot, sample_slot(resume_ms + interval * 1000, start_seconds, interval))
+                    resume_count = start_count + resume_slot
+                    kept = state.last(start_count, end_count, kept=True)
+                    if analyzer is not None:
+                        analyzer.action_frames.extend(state.action_files(start_count, resume_count))
+                    if dedup is not None and kept is not None:
+                        dedup.seed(kept.get('h'))
+                    # The analyzer compares every frame with the last kept one, so start from that frame.
+                    if analyzer is not None and kept is not None:
+                        seed_count = kept['n']
+                    first_slot = seed_count - start_count if seed_count is not None else resume_slot
+                    logger.info("Resuming %s from frame %s", vid, resume_count)
+                    start_seconds = round(start_seconds + first_slot * interval, 6)
+                    start_count += first_slot
+                manifest.begin(run_key, vid, self.manifest_params(), resume_count or start_count)
+
+            # 'required_frame_rate' is the number of seconds between two frames.
+            range_end = min(end_seconds, duration) if end_seconds is not None else duration
+            target_frames = max(1, math.ceil((range_end - start_seconds) / interval))
+            sampler = reader.sampler(
+                interval=interval,
+                start_from_seconds=start_seconds,
+                end_at_seconds=end_seconds,
+                strategy=self.sampling_strategy,
+                keyframe_interval=self.keyframe_interval,
+                # Some containers don't report a frame count; the sampler then runs to the end of the stream.
+                max_samples=reader.frame_count or None,
+                timers=timers,
+                buffers=buffers,
+            )
+            strategy = sampler.choose_strategy()
+
+            if self.verbose:
+                logger.info("======================================")
+                logger.info(f"[OUT FILE DIRECTORY] - {self.out_dir}")
+                logger.info(f"[TOTAL SOURCE FRAMES] - {frames}")
+                logger.info(f"[SOURCE FPS] - {fps}")
+                logger.info(f"[VIDEO LENGTH] - {seconds} seconds")
+                logger.info(f"[TARGET EXTRACTION RATE] - {interval} frames/sec")
+                logger.info(f"[EXPECTED OUTPUT FRAMES] - {target_frames}")
+                logger.info(f"[DECODE BACKEND] - {self.backend.name}")
+                logger.info(f"[SAMPLING STRATEGY] - {strategy}")
+                if end_seconds is not None or start_count != 1:
+                    logger.info(f"[TIME RANGE] - {start_seconds}s to {end_seconds if end_seconds is not None else 'end'}")
+
+            # Archive shards and sprite sheets of a resumed run get names of their own.
+            run_name = f"{vidname}_{str(resume_count or start_count).zfill(5)}"
+            archive = self.archive.copy(self.out_dir, run_name) if self.archive is not None else None
+            pyramid = self.pyramid
+            # Archives and pyramids replace the 'orig_size_frames' and 're_size_frames' files.
+            per_file = archive is None and pyramid is None
+            orig_file_dir = self.create_dir_if_not_exists('orig_size_frames') if self.write_original and per_file else None
+            resize_file_dir = self.create_dir_if_not_exists('re_size_frames') if self.eager_resize and per_file else None
+            level_dirs = {level.dirname: self.create_dir_if_not_exists(level.dirname)
+                          for level in pyramid.levels} if pyramid is not None else None
+
+            sprites = self.sprites.copy(self.out_dir, run_name) if self.sprites else None
+            # Resized frames are encoded right away, so every encoder thread resizes into the same array.
+            resize_buffers = ResizeBuffers()
+
+            def timed_resize(image, size):
+                with timers.time('resize'):
+                    return resize_buffers.resize(image, size)
+
+            def encode(frame):
+                position, count, timestamp_ms, filename, image, frame_hash, action = frame
+                if image is None:
+                    # A dropped duplicate: nothing to write, but its manifest record keeps its place in order.
+                    return (count, timestamp_ms, frame_hash, action, None), []
                 try:
-                    timestamp_ms = vid_cap.get(cv2.CAP_PROP_POS_MSEC)
-                    # Format timestamp with padded numbers for proper sorting
-                    timestamp = time.strftime('%H_%M_%S', time.gmtime(timestamp_ms/1000))
-                    frame_num = str(count).zfill(5)  # Pad with zeros for proper sorting
-                    orig_file_location = f"{orig_file_dir}/{timestamp}_{frame_num}_{vidname}.{self.img_frmt}"
-                    resize_file_location = f"{resize_file_dir}/{timestamp}_{frame_num}_{vidname}.{self.img_frmt}"
-
-                    # Calculate original aspect ratio
-                    height, width = image.shape[:2]
-                    aspect_ratio = width / height
-
-                    # Keep original resolution but fix aspect ratio if needed
-                    if width != int(height * aspect_ratio):
-                        new_height = height
-                        new_width = int(height * aspect_ratio)
-                        orig_img = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                    else:
-                        orig_img = image
-                    cv2.imwrite(orig_file_location, orig_img)
+                    frame_info, files = encode_frame(position, count, timestamp_ms, filename, image, frame_hash)
+                finally:
+                    # The decoded frame isn't referenced past this point; hand its array back for reuse.
+                    if buffers is not None:
+                        buffers.release(image, reuse=reuse_buffers)
+                return (count, timestamp_ms, frame_hash, action, frame_info), files
+
+            def encode_frame(position, count, timestamp_ms, filename, image, frame_hash):
+                if sprites is not None:
+                    with timers.time('resize'):
+                        sprites.add(position, filename, image)
 
+                height, width = image.shape[:2]
+                aspect_ratio = width / height
+
+                files = []
+                if archive is not None:
+                    with timers.time('encode'):
+                        files.append((filename, archive.prepare(position, count, timestamp_ms, filename, image)))
+                elif pyramid is not None:
+                    for level, level_image in pyramid.render(image, timed_resize):
+                        with timers.time('encode'):
+                            files.append((f"{level_dirs[level.dirname]}/{level.filename(filename)}",
+                                          level.encode(level_image)))
+                elif self.write_original:
+                    orig_file_location = f"{orig_file_dir}/{filename}"
+                    with timers.time('encode'):
+                        files.append((orig_file_location, self.encode_image(image)))
+
+                if self.eager_resize and per_file:
+                    resize_file_location = f"{resize_file_dir}/{filename}"
                     # Create resized version while maintaining aspect ratio
-                    new_width = settings.REQUIRED_IMAGE_WIDTH
+                    new_width = self.img_width
                     new_height = int(new_width / aspect_ratio)
-                    resized_img = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                    cv2.imwrite(resize_file_location, resized_img)
-
-                    print(f"Done: {count}")
-                except Exception as ex:
-                    print("[ERROR CODE 1001]")
-                    print(ex)
-            else:
-                print(f"Done Extracting for video {vid}")
-                print(
-                    f"Frames: {count - 1} orig & Frames: {count - 1} resized.")
-                break
-
-            count += 1
-            if count > frames:  # Stop if we've processed all frames
-                print(f"Reached end of video at frame {count-1}")
-                break
-            sec += self.required_frame_rate
-            vid_cap.set(cv2.CAP_PROP_POS_MSEC, sec * 1000)
+                    with timers.time('resize'):
+                        resized_img = resize_buffers.resize(image, (new_width, new_height))
+                    with timers.time('encode'):
+                        files.append((resize_file_location, self.encode_image(resized_img)))
+                frame_info = {
+                    'frame_num': count,
+                    'timestamp_ms': timestamp_ms,
+                    'file': filename,
+                    'width': width,
+                    'height': height,
+                    'file_size': sum(len(data) for _, data in files) if archive is None else None,
+                    'phash': frame_hash,
+                }
+                return frame_info, files
+
+            written_frames = 0
+            if progress is not None:
+                progress(written_frames, target_frames)
+
+            index_rows = []
+
+            def flush_index():
+                self.frame_index.add_frames(index_rows)
+                index_rows.clear()
+
+            # Manifest records are delivered in sampling order; after a failed frame nothing
+            # more is recorded, so a resumed run restarts at the failed frame.
+            recording = manifest is not None
+
+            def on_failed():
+                nonlocal recording
+                recording = False
+
+            def on_written(written):
+                nonlocal written_frames
+                count, timestamp_ms, frame_hash, action, frame_info = written
+                if frame_info is None:
+                    # Dropped frames count as done, so a resumed run doesn't start over at them.
+                    if recording:
+                        manifest.record_duplicate(run_key, count, timestamp_ms, frame_hash)
+                    return
+                written_frames += 1
+                if recording:
+                    manifest.record_frame(run_key, count, frame_info['file'], timestamp_ms, frame_hash, action)
+                if self.frame_index is not None and per_file:
+                    index_rows.append({**frame_info, 'extraction': Path(self.out_dir).name, 'video': vidname,
+                                       'has_original': int(self.write_original)})
+                    if len(index_rows) >= INDEX_BATCH_SIZE:
+                        flush_index()
+                REGISTRY.record_frames()
+                if progress is not None:
+                    progress(written_frames, target_frames)
+                logger.debug("Done: %s", count)
+
+            def sample_frames():
+                # Runs on the decoder thread, so the analyzer and the deduplicator see frames in order.
+                position = 0
+                for index, timestamp_ms, image in sampler.samples():
+                    # Numbered by sample slot, so chunks and resumed runs agree with a single run.
+                    count = start_count + index
+                    if resume_count is not None and (
+                            count < resume_count
+                            or resume_ms is not None and timestamp_ms <= resume_ms + TIMESTAMP_TOLERANCE_MS):
+                        # Already written by the resumed run; the last kept frame seeds the analyzer.
+                        if seed_count is not None and count <= seed_count:
+                            analyzer.seed(image)
+                        if buffers is not None:
+                            buffers.release(image, reuse=reuse_buffers)
+                        continue
+                    frame_hash = None
+                    if dedup is not None:
+                        with timers.time('analyze'):
+                            duplicate, frame_hash = dedup.check(image)
+                        if duplicate:
+                            if buffers is not None:
+                                buffers.release(image, reuse=reuse_buffers)
+                            yield position, count, timestamp_ms, None, None, frame_hash, False
+                            continue
+                    filename = self.frame_filename(timestamp_ms, count, vidname)
+                    action = False
+                    if analyzer is not None:
+                        with timers.time('analyze'):
+                            action = analyzer.observe(filename, image)
+                    yield position, count, timestamp_ms, filename, image, frame_hash, action
+                    position += 1
+
+            pipeline = FramePipeline(
+                encoders=self.encoders,
+                decode_queue_size=self.decode_queue_size,
+                write_queue_size=self.write_queue_size,
+            )
+            write = archive.write if archive is not None else self.write_file
+
+            def timed_write(path, data):
+                with timers.time('write'):
+                    write(path, data)
+
+            pipeline.run(sample_frames(), encode, timed_write, on_written, on_failed)
+            written = written_frames
+            if self.frame_index is not None:
+                flush_index()
+            if sprites is not None:
+                sprites.save()
+            if analyzer is not None:
+                # Named after the range, so a resumed run replaces the sidecar instead of adding a partial one.
+                analyzer.save(self.out_dir, f"{vidname}_{str(range_start_count).zfill(5)}")
+            if manifest is not None:
+                if pipeline.failed:
+                    logger.warning(f"[FAILED FRAMES] - {pipeline.failed}, {vid} will resume from the first one")
+                else:
+                    manifest.record_done(run_key, range_start_count, written)
+        finally:
+            reader.close()
+            if archive is not None:
+                # Finish the shards written so far, also when the run raised.
+                archive.close()
+            if buffers is not None:
+                buffer_stats = buffers.finish()
+
+        REGISTRY.record_video()
+        wall_seconds = time.perf_counter() - wall_start
+        timings = timers.summary()
+        memory = {'peak_rss_bytes': peak_rss_bytes(), 'resize_buffer_bytes': resize_buffers.nbytes}
+        if buffer_stats is not None:
+            memory.update(budget_bytes=self.buffer_pool.budget_bytes, peak_frame_bytes=buffer_stats['peak_bytes'],
+                          reused_buffers=buffer_stats['reused'])
+        logger.info(f"Done Extracting for video {vid}")
+        if dedup is not None:
+            logger.info(f"[DUPLICATES DROPPED] - {dedup.dropped}")
+        if archive is not None:
+            logger.info(f"Frames: {written} written to {len(archive.shards)} {archive.name} shards.")
+        elif pyramid is not None:
+            logger.info(f"Frames: {written} written to {', '.join(level_dirs)}.")
+        else:
+            logger.info(
+                f"Frames: {written if self.write_original else 0} orig & Frames: {written if self.eager_resize else 0} resized.")
+        if self.verbose:
+            logger.info(f"[WALL TIME] - {wall_seconds:.2f} seconds")
+            for stage, timing in timings.items():
+                logger.info(f"[{stage.upper()} TIME] - {timing['total_seconds']:.2f}s over {timing['count']} calls, "
+                            f"p50 {timing['p50'] * 1000:.2f}ms, p99 {timing['p99'] * 1000:.2f}ms")
+            if buffer_stats is not None:
+                logger.info(f"[PEAK FRAME MEMORY] - {memory['peak_frame_bytes'] / 2**20:.1f} MB of a "
+                            f"{memory['budget_bytes'] / 2**20:.1f} MB budget, {memory['reused_buffers']} buffers reused")
+            if memory['peak_rss_bytes'] is not None:
+                logger.info(f"[PEAK RSS] - {memory['peak_rss_bytes'] / 2**20:.1f} MB")
+        return {'video': str(vid), 'strategy': strategy, 'frames': written, 'failed': pipeline.failed,
+                'wall_seconds': round(wall_seconds, 3), 'timings': timings, 'memory': memory}
 
     """Extract frames from videos and save them as images.
 
@@ -125,27 +488,7 @@ class FrameExtractor:
 
 
 if __name__ == '__main__':
-    vid_dir = settings.VIDEO_DIRPATH
-    out_dir = settings.OUTDIR
-    required_frame_rate = settings.REQUIRED_FRAME_RATE
-    start_from_seconds = settings.START_FROM_SECOND
-    img_frmt = settings.REQUIRED_IMAGE_FORMAT
-    img_width = settings.REQUIRED_IMAGE_WIDTH
-    verbose = True
-
-    vid_dir_path = Path(vid_dir)
-    out_dir = Path(out_dir)
-    if vid_dir_path.exists():
-        # Get start time
-        time_start = time.time()
-        vids = [vid for vid in vid_dir_path.iterdir()]
-        frame_extractor = FrameExtractor(
-            out_dir, img_frmt, required_frame_rate, start_from_seconds, img_width, verbose)
-        with ThreadPoolExecutor() as executor:
-            list(executor.map(frame_extractor.extract_frames, vids))
-        time_end = time.time()
-        if verbose:
-            print(
-                f"It took {time_end-time_start:.2f} seconds for conversion.")
-    else:
-        print(f"The specified path ({vid_dir}) does not exist!")
\ No newline at end of file
+    # Imported here: batch_scheduler imports this module.
+    from batch_scheduler import extract_directory
+
+    fire.Fire(extract_directory)
@@ -0,0 +1,197 @@
+# in-built modules
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+# Internal module
+from extraction_manifest import ExtractionManifest
+
+SORT_COLUMNS = {
+    'frame': 'frame_num',
+    'time': 'timestamp_ms',
+    'name': 'file',
+    'size': 'file_size',
+}
+
+# HH_MM_SS_NNNNN_name.ext, as written by FrameExtractor.frame_filename.
+FRAME_FILENAME_RE = re.compile(r'^(\d{2})_(\d{2})_(\d{2})_(\d+)_')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS frames (
+    extraction TEXT NOT NULL,
+    file TEXT NOT NULL,
+    video TEXT,
+    frame_num INTEGER,
+    timestamp_ms REAL,
+    width INTEGER,
+    height INTEGER,
+    file_size INTEGER,
+    has_original INTEGER NOT NULL DEFAULT 1,
+    phash TEXT,
+    PRIMARY KEY (extraction, file)
+);
+CREATE INDEX IF NOT EXISTS frames_by_num ON frames (extraction, frame_num);
+CREATE INDEX IF NOT EXISTS frames_by_time ON frames (extraction, timestamp_ms);
+'''
+
+# Columns added after the first release, created on databases that predate them.
+MIGRATIONS = {
+    'phash': 'ALTER TABLE frames ADD COLUMN phash TEXT',
+}
+
+
+class FrameIndex:
+    """SQLite catalog of extracted frames, so galleries don't scan directories.
+
+    FrameExtractor adds rows as frames are written. One connection is opened
+    per thread; WAL mode lets worker processes write while the web app reads.
+
+    Args:
+        db_path: Path of the SQLite database file.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(frames)')}
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(statement)
+
+    def __getstate__(self):
+        # Connections stay in the process that opened them.
+        return {'db_path': self.db_path}
+
+    def __setstate__(self, state):
+        self.db_path = state['db_path']
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def add_frames(self, rows):
+        """Insert or replace frames.
+
+        :param rows: dicts with extraction, file, video, frame_num, timestamp_ms,
+            width, height, file_size, has_original and optionally phash.
+        """
+        if not rows:
+            return
+        rows = [{'phash': None, **row} for row in rows]
+        with self._connect() as conn:
+            conn.executemany(
+                '''INSERT OR REPLACE INTO frames
+                   (extraction, file, video, frame_num, timestamp_ms, width, height, file_size, has_original,
+                    phash)
+                   VALUES (:extraction, :file, :video, :frame_num, :timestamp_ms, :width, :height,
+                           :file_size, :has_original, :phash)''',
+                rows)
+
+    def list_extractions(self):
+        """Return {extraction: frame count} for every indexed extraction."""
+        rows = self._connect().execute(
+            'SELECT extraction, COUNT(*) AS frames FROM frames GROUP BY extraction')
+        return {row['extraction']: row['frames'] for row in rows}
+
+    def count(self, extraction):
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM frames WHERE extraction = ?', (extraction,)).fetchone()[0]
+
+    def query_frames(self, extraction, page=1, per_page=200, sort='frame', descending=False):
+        """Return one page of an extraction's frames as dicts, plus the total frame count."""
+        column = SORT_COLUMNS.get(sort, SORT_COLUMNS['frame'])
+        direction = 'DESC' if descending else 'ASC'
+        page = max(1, page)
+        rows = self._connect().execute(
+            f'''SELECT * FROM frames WHERE extraction = ?
+                ORDER BY {column} {direction}, file {direction} LIMIT ? OFFSET ?''',
+            (extraction, per_page, (page - 1) * per_page))
+        return [dict(row) for row in rows], self.count(extraction)
+
+    def get_frame(self, extraction, file):
+        """Return one frame's row as a dict, or None if it isn't indexed."""
+        row = self._connect().execute(
+            'SELECT * FROM frames WHERE extraction = ? AND file = ?', (extraction, file)).fetchone()
+        return dict(row) if row is not None else None
+
+    def remove_frames(self, extraction, files):
+        """Delete the rows of frames removed from disk."""
+        with self._connect() as conn:
+            conn.executemany('DELETE FROM frames WHERE extraction = ? AND file = ?',
+                             [(extraction, file) for file in files])
+
+    def existing_originals(self, extraction, files):
+        """Subset of 'files' indexed for 'extraction' with a full-size copy on disk."""
+        found = set()
+        files = list(files)
+        conn = self._connect()
+        # Stay below SQLite's limit on bound parameters.
+        for i in range(0, len(files), 500):
+            batch = files[i:i + 500]
+            placeholders = ','.join('?' * len(batch))
+            rows = conn.execute(
+                f'SELECT file FROM frames WHERE extraction = ? AND has_original = 1 AND file IN ({placeholders})',
+                (extraction, *batch))
+            found.update(row['file'] for row in rows)
+        return found
+
+    def backfill(self, extraction_dir, img_frmt):
+        """Index an extraction written before the index existed.
+
+        Uses the extraction's manifest when there is one and falls back to
+        listing 're_size_frames' (or 'orig_size_frames' when resized frames
+        weren't written) once. Dimensions aren't known for these rows.
+
+        :return: number of frames indexed.
+        """
+        extraction_dir = Path(extraction_dir)
+        extraction = extraction_dir.name
+        orig_dir = extraction_dir / 'orig_size_frames'
+        resize_dir = extraction_dir / 're_size_frames'
+        if not resize_dir.exists():
+            resize_dir = orig_dir
+
+        manifest = ExtractionManifest(extraction_dir)
+        if manifest.exists():
+            entries = {record['file']: (record['n'], record['ms'], record.get('h'))
+                       for record in manifest.frame_records()}
+        elif resize_dir.exists():
+            entries = {}
+            for file in (f.name for f in resize_dir.iterdir() if f.name.endswith(img_frmt)):
+                match = FRAME_FILENAME_RE.match(file)
+                if match:
+                    hours, minutes, seconds, frame_num = map(int, match.groups())
+                    entries[file] = (frame_num, ((hours * 60 + minutes) * 60 + seconds) * 1000.0, None)
+                else:
+                    entries[file] = (None, None, None)
+        else:
+            return 0
+
+        rows = []
+        for file, (frame_num, timestamp_ms, frame_hash) in entries.items():
+            resized = resize_dir / file
+            rows.append({
+                'extraction': extraction,
+                'file': file,
+                'video': None,
+                'frame_num': frame_num,
+                'timestamp_ms': timestamp_ms,
+                'width': None,
+                'height': None,
+                'file_size': resized.stat().st_size if resized.exists() else None,
+                'has_original': int((orig_dir / file).exists()),
+                'phash': frame_hash,
+            })
+        self.add_frames(rows)
+        return len(rows)
@@ -0,0 +1,147 @@
+# in-built modules
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stream in the pipeline queues.
+_STOP = object()
+# Outcomes of an item that failed to encode or write, and of one 'encode' dropped.
+_FAILED = object()
+_DROPPED = object()
+
+
+class FramePipeline:
+    """Run decode, encode and write stages concurrently.
+
+    A decoder thread pulls frames from an iterator, a pool of encoder threads
+    turns each frame into encoded files, and a writer thread puts the bytes on
+    disk. The stages are connected by bounded queues so a slow disk or slow
+    encoders throttle the decoder instead of letting frames pile up in memory.
+    OpenCV releases the GIL in resize and imencode, so encoder threads run in
+    parallel. Files are written as soon as they are encoded, but the
+    'on_written' and 'on_failed' callbacks are delivered in the order the
+    items were decoded. A pipeline instance runs once.
+
+    Args:
+        encoders: Number of encoder threads.
+        decode_queue_size: Decoded frames waiting to be encoded.
+        write_queue_size: Encoded frames waiting to be written.
+    """
+
+    def __init__(self, encoders=2, decode_queue_size=8, write_queue_size=32):
+        self.encoders = max(1, encoders)
+        self.decode_queue = queue.Queue(maxsize=max(1, decode_queue_size))
+        self.write_queue = queue.Queue(maxsize=max(1, write_queue_size))
+        self.decoded = 0
+        self.written = 0
+        self.failed = 0
+        self._errors = []
+
+    def run(self, frames, encode, write, on_written=None, on_failed=None):
+        """Push every item of 'frames' through the pipeline and wait for it to drain.
+
+        Args:
+            frames: Iterable of decoded items, consumed on the decoder thread.
+            encode: Called on an encoder thread with one item. Returns a
+                (key, files) pair where 'files' is a list of (path, data) to
+                write, or None to drop the item.
+            write: Called on the writer thread with (path, data).
+            on_written: Called on the writer thread with 'key' once all of the
+                item's files are written.
+            on_failed: Called on the writer thread, without arguments, for an
+                item that failed to encode or write.
+
+        Returns:
+            Number of items whose files were all written. Items that failed to
+            encode or write are logged and counted in 'failed'; 'decoded' has
+            the number of items pulled from 'frames'.
+        """
+        threads = [threading.Thread(target=self._decode, args=(frames,), name='frame-decoder')]
+        threads += [
+            threading.Thread(target=self._encode, args=(encode,), name=f'frame-encoder-{i}')
+            for i in range(self.encoders)
+        ]
+        threads.append(threading.Thread(target=self._write, args=(write, on_written, on_failed),
+                                        name='frame-writer'))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+        return self.written
+
+    def _decode(self, frames):
+        try:
+            for item in frames:
+                self.decode_queue.put((self.decoded, item))
+                self.decoded += 1
+        except Exception as ex:
+            self._errors.append(ex)
+        finally:
+            for _ in range(self.encoders):
+                self.decode_queue.put(_STOP)
+
+    def _encode(self, encode):
+        while True:
+            item = self.decode_queue.get()
+            if item is _STOP:
+                self.write_queue.put(_STOP)
+                return
+            seq, item = item
+            try:
+                outputs = encode(item)
+            except Exception:
+                logger.exception("[ERROR CODE 1001]")
+                # Counted on the writer thread, which owns the counters.
+                outputs = _FAILED
+            # Dropped items still take their turn, so later items aren't held back.
+            self.write_queue.put((seq, outputs))
+
+    def _write(self, write, on_written, on_failed):
+        stopped = 0
+        # Outcomes waiting for an earlier item to finish: {seq: key, _DROPPED or _FAILED}.
+        pending = {}
+        next_seq = 0
+        while stopped < self.encoders:
+            outputs = self.write_queue.get()
+            if outputs is _STOP:
+                stopped += 1
+                continue
+            seq, outputs = outputs
+            if outputs is None:
+                pending[seq] = _DROPPED
+            elif outputs is _FAILED:
+                pending[seq] = _FAILED
+            else:
+                key, files = outputs
+                try:
+                    for path, data in files:
+                        write(path, data)
+                except Exception:
+                    logger.exception("[ERROR CODE 1002]")
+                    pending[seq] = _FAILED
+                else:
+                    pending[seq] = key
+            while next_seq in pending:
+                self._finish(pending.pop(next_seq), on_written, on_failed)
+                next_seq += 1
+
+    def _finish(self, outcome, on_written, on_failed):
+        if outcome is _DROPPED:
+            return
+        if outcome is not _FAILED:
+            try:
+                if on_written is not None:
+                    on_written(outcome)
+            except Exception:
+                logger.exception("[ERROR CODE 1002]")
+            else:
+                self.written += 1
+                return
+        self.failed += 1
+        if on_failed is not None:
+            on_failed()
@@ -0,0 +1,135 @@
+# in-built modules
+from pathlib import Path
+
+# dependencies packages
+import cv2
+
+ENCODE_PARAMS = {
+    'jpg': cv2.IMWRITE_JPEG_QUALITY,
+    'jpeg': cv2.IMWRITE_JPEG_QUALITY,
+    'webp': cv2.IMWRITE_WEBP_QUALITY,
+    'png': cv2.IMWRITE_PNG_COMPRESSION,
+}
+
+DEFAULT_QUALITY = {
+    'jpg': 95,
+    'jpeg': 95,
+    'webp': 90,
+    'png': 3,
+}
+
+
+def encode_image(image, img_frmt, quality=None):
+    """cv2.imencode 'image' as 'img_frmt' with the format's own quality flag.
+
+    :param quality: JPEG/WebP quality (0-100), or PNG compression level (0-9). None uses DEFAULT_QUALITY.
+    :return: the encoded buffer.
+    """
+    if img_frmt not in ENCODE_PARAMS:
+        raise ValueError(f"Unknown image format '{img_frmt}', expected one of {sorted(ENCODE_PARAMS)}")
+    quality = DEFAULT_QUALITY[img_frmt] if quality is None else quality
+    success, buffer = cv2.imencode(f".{img_frmt}", image, [ENCODE_PARAMS[img_frmt], quality])
+    if not success:
+        raise ValueError(f"Unable to encode frame as {img_frmt}")
+    return buffer
+
+
+def resize_area(image, size):
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+class PyramidLevel:
+    """One output size of a FramePyramid.
+
+    Args:
+        width: Width of the frames. None keeps the decoded size.
+        img_frmt: 'jpg', 'webp' or 'png'.
+        quality: JPEG/WebP quality (0-100), or PNG compression level (0-9).
+            None uses DEFAULT_QUALITY.
+        dirname: Output subdirectory. Defaults to 'frames_<width>' or 'frames_full'.
+    """
+
+    def __init__(self, width=None, img_frmt='jpg', quality=None, dirname=None):
+        if img_frmt not in ENCODE_PARAMS:
+            raise ValueError(f"Unknown pyramid format '{img_frmt}', expected one of {sorted(ENCODE_PARAMS)}")
+        if width is not None and (not isinstance(width, int) or width <= 0):
+            raise ValueError(f"Pyramid width must be a positive integer or None, got {width!r}")
+        self.width = width
+        self.img_frmt = img_frmt
+        self.quality = DEFAULT_QUALITY[img_frmt] if quality is None else quality
+        self.dirname = dirname or f"frames_{width or 'full'}"
+
+    def params(self):
+        return {'width': self.width, 'img_frmt': self.img_frmt, 'quality': self.quality, 'dirname': self.dirname}
+
+    def filename(self, filename):
+        """File name of a frame in this level: the frame's name with the level's extension."""
+        return Path(filename).with_suffix(f".{self.img_frmt}").name
+
+    def encode(self, image):
+        return encode_image(image, self.img_frmt, self.quality)
+
+
+class FramePyramid:
+    """Write every decoded frame at several sizes, each into its own subdirectory.
+
+    Levels are produced largest first and each one is downscaled from the
+    previous level rather than from the decoded frame, so a 224px level
+    costs a resize of the 720px level instead of another pass over a 4K
+    frame. A level wider than the previous one is resized from the decoded
+    frame.
+
+    Args:
+        levels: PyramidLevel objects, dicts of PyramidLevel arguments, or
+            plain widths (None for full size).
+    """
+
+    def __init__(self, levels):
+        levels = [self._level(level) for level in levels]
+        if not levels:
+            raise ValueError("A frame pyramid needs at least one level")
+        # Full size first, then by decreasing width.
+        self.levels = sorted(levels, key=lambda level: -level.width if level.width else float('-inf'))
+        dirnames = [level.dirname for level in self.levels]
+        if len(set(dirnames)) != len(dirnames):
+            raise ValueError(f"Pyramid levels need distinct 'dirname's, got {dirnames}")
+
+    @staticmethod
+    def _level(level):
+        if isinstance(level, PyramidLevel):
+            return level
+        if isinstance(level, dict):
+            return PyramidLevel(**level)
+        return PyramidLevel(width=level)
+
+    def params(self):
+        return [level.params() for level in self.levels]
+
+    def render(self, image, resize=resize_area):
+        """Yield (level, image) for every level, largest first.
+
+        :param image: Decoded BGR frame.
+        :param resize: Called as resize(image, (width, height)); the returned
+            array must stay valid until the next level has been rendered.
+        """
+        height, width = image.shape[:2]
+        aspect_ratio = width / height
+        previous = image
+        for level in self.levels:
+            if level.width is None:
+                yield level, image
+                continue
+            source = previous if previous.shape[1] >= level.width else image
+            if source.shape[1] != level.width:
+                source = resize(source, (level.width, max(1, int(level.width / aspect_ratio))))
+            previous = source
+            yield level, source
+
+
+def get_pyramid(levels):
+    """Build a FramePyramid from a list of levels; None (or an empty list) means no pyramid."""
+    if not levels:
+        return None
+    if isinstance(levels, FramePyramid):
+        return levels
+    return FramePyramid(levels)
@@ -0,0 +1,302 @@
+# in-built modules
+import math
+from contextlib import nullcontext
+
+# dependencies packages
+import cv2
+
+# Internal module
+from frame_buffers import decode_into
+
+
+SEEK = 'seek'
+SEQUENTIAL = 'sequential'
+AUTO = 'auto'
+STRATEGIES = (AUTO, SEEK, SEQUENTIAL)
+
+# x264's default keyint; used when the container does not report frame types.
+DEFAULT_KEYFRAME_INTERVAL_FRAMES = 250
+# How many frames to grab while probing for keyframe spacing.
+KEYFRAME_PROBE_FRAMES = 300
+# Picture type reported by CAP_PROP_FRAME_TYPE for intra frames (ord('I')).
+INTRA_FRAME_TYPE = 73
+# Slack for float noise when comparing timestamps in milliseconds.
+TIMESTAMP_TOLERANCE_MS = 0.01
+
+
+def sample_slot(timestamp_ms, start_from_seconds, interval):
+    """Index of the last sampling target at or before 'timestamp_ms' on the grid
+    ``start_from_seconds + index * interval``; negative before the first one."""
+    return math.floor((timestamp_ms + TIMESTAMP_TOLERANCE_MS - start_from_seconds * 1000) / (interval * 1000))
+
+
+class GridSampler:
+    """Yield frames at a fixed interval; the sampling grid shared by every decode backend.
+
+    Two strategies are available:
+
+    - ``seek``: seek to every sampling target. Each seek lands on the
+      preceding keyframe and re-decodes the GOP up to the target, which is
+      cheap only when samples are further apart than keyframes.
+    - ``sequential``: decode forward, pick frames by their presentation
+      timestamp and only convert the ones that are kept.
+
+    ``auto`` picks ``sequential`` when the sampling interval is shorter than
+    the keyframe spacing (every seek would re-decode frames we already passed)
+    and ``seek`` otherwise.
+
+    Subclasses provide the decoder primitives: ``_seek_frame``, ``_seek_start``,
+    ``_frames``, ``_retrieve`` and ``probe_keyframe_interval``, and set ``fps``.
+
+    Args:
+        interval: Seconds between two sampled frames.
+        start_from_seconds: Timestamp of the first sample.
+        end_at_seconds: Stop before this timestamp. ``None`` runs to the end.
+        strategy: One of ``auto``, ``seek`` or ``sequential``.
+        keyframe_interval: Keyframe spacing in seconds. Probed from the stream
+            when ``None``.
+        max_samples: Upper bound on yielded frames, guards against containers
+            that keep returning the last frame when seeking past the end.
+        timers: Optional ``metrics.StageTimers`` recording seek and decode latency.
+        buffers: Optional ``frame_buffers.FrameBuffers``; decoding then waits
+            while the run's memory budget is used up.
+    """
+
+    strategies = STRATEGIES
+    fps = 0
+
+    def __init__(self, interval, start_from_seconds=0, end_at_seconds=None, strategy=AUTO,
+                 keyframe_interval=None, max_samples=None, timers=None, buffers=None):
+        if strategy not in self.strategies:
+            raise ValueError(f"Unknown sampling strategy '{strategy}', expected one of {self.strategies}")
+        if not interval or interval <= 0:
+            raise ValueError("Sampling interval must be a positive number of seconds")
+        self.interval = interval
+        self.start_from_seconds = start_from_seconds or 0
+        self.end_at_seconds = end_at_seconds
+        self.strategy = strategy
+        self.keyframe_interval = keyframe_interval
+        self.max_samples = max_samples
+        self.timers = timers
+        self.buffers = buffers
+        self._resolved = None
+
+    def _timed(self, stage):
+        return self.timers.time(stage) if self.timers is not None else nullcontext()
+
+    def probe_keyframe_interval(self):
+        """Estimate keyframe spacing in seconds, or return ``None`` if it can't be detected."""
+        return None
+
+    def choose_strategy(self):
+        """Resolve ``auto`` to a concrete strategy.
+
+        :return: ``seek`` or ``sequential``.
+        """
+        if self._resolved is not None:
+            return self._resolved
+        if self.strategy != AUTO:
+            self._resolved = self.strategy
+            return self._resolved
+
+        keyframe_interval = self.keyframe_interval or self.probe_keyframe_interval()
+        if keyframe_interval is None:
+            keyframe_interval = DEFAULT_KEYFRAME_INTERVAL_FRAMES / self.fps if self.fps else math.inf
+        self.keyframe_interval = keyframe_interval
+        self._resolved = SEQUENTIAL if self.interval < keyframe_interval else SEEK
+        return self._resolved
+
+    def __iter__(self):
+        """Yield ``(timestamp_ms, image)`` tuples for every sampled frame."""
+        for _, timestamp_ms, image in self.samples():
+            yield timestamp_ms, image
+
+    def samples(self):
+        """Yield ``(index, timestamp_ms, image)`` tuples for every sampled frame.
+
+        'index' is the slot of the frame on the sampling grid
+        ``start_from_seconds + index * interval``. A frame is never yielded
+        twice: when the interval is shorter than the frame period, slots that
+        would repeat the previous frame are skipped, so indices increase but
+        may have gaps. Numbering frames by slot keeps the numbers of separately
+        extracted time ranges consistent with a single run.
+        """
+        if self.choose_strategy() == SEEK:
+            return self._iter_seek()
+        return self._iter_sequential()
+
+    def _past_end(self, timestamp_ms):
+        return (self.end_at_seconds is not None
+                and timestamp_ms + TIMESTAMP_TOLERANCE_MS >= self.end_at_seconds * 1000)
+
+    def _target_ms(self, index):
+        # Targets are computed from the sample index rather than accumulated so
+        # that time-range chunks of the same video agree on where samples fall.
+        return (self.start_from_seconds + index * self.interval) * 1000
+
+    def _seek_frame(self, target_ms):
+        """Seek to 'target_ms' and decode the frame the seek lands on.
+
+        :return: (timestamp_ms, frame) of the decoded frame, or None at the end of the stream.
+        """
+        raise NotImplementedError
+
+    def _seek_start(self):
+        """Position the decoder for sequential decoding from 'start_from_seconds'."""
+        raise NotImplementedError
+
+    def _frames(self):
+        """Decode forward; yield (timestamp_ms, frame) for every frame without converting it."""
+        raise NotImplementedError
+
+    def _retrieve(self, frame):
+        """Convert a decoded frame to a BGR image; return (success, image)."""
+        raise NotImplementedError
+
+    def _iter_seek(self):
+        samples = 0
+        yielded = 0
+        last_ms = None
+        while self.max_samples is None or yielded < self.max_samples:
+            target_ms = self._target_ms(samples)
+            if self._past_end(target_ms):
+                break
+            decoded = self._seek_frame(target_ms)
+            if decoded is None:
+                break
+            timestamp_ms, frame = decoded
+            if self._past_end(timestamp_ms):
+                break
+            # Seeks snap to the nearest frame, so close targets can land on the previous sample's frame.
+            if last_ms is not None and timestamp_ms <= last_ms + TIMESTAMP_TOLERANCE_MS:
+                samples += 1
+                continue
+            success, image = self._retrieve(frame)
+            if not success:
+                break
+            # A frame past later targets stands for the last of them, like in sequential sampling.
+            index = max(samples, sample_slot(timestamp_ms, self.start_from_seconds, self.interval))
+            yield index, timestamp_ms, image
+            yielded += 1
+            last_ms = timestamp_ms
+            samples = index + 1
+
+    def _iter_sequential(self):
+        # Keep the first frame at or after each target, like a seek would.
+        index = 0
+        next_ms = self._target_ms(index)
+        samples = 0
+        with self._timed('seek'):
+            self._seek_start()
+
+        frames = self._frames()
+        while self.max_samples is None or samples < self.max_samples:
+            decoded = next(frames, None)
+            if decoded is None:
+                break
+            timestamp_ms, frame = decoded
+            if self._past_end(timestamp_ms):
+                break
+            if timestamp_ms + TIMESTAMP_TOLERANCE_MS < next_ms:
+                continue
+            success, image = self._retrieve(frame)
+            if not success:
+                break
+            # The frame stands for the last target it reaches; intervals shorter
+            # than a frame would otherwise pick the same frame twice.
+            while next_ms <= timestamp_ms + TIMESTAMP_TOLERANCE_MS:
+                index += 1
+                next_ms = self._target_ms(index)
+            yield index - 1, timestamp_ms, image
+            samples += 1
+
+
+class FrameSampler(GridSampler):
+    """GridSampler over an opened ``cv2.VideoCapture``.
+
+    Seeks use ``set(CAP_PROP_POS_MSEC)``, sequential sampling ``grab()``s
+    every frame and only ``retrieve()``s the ones that are kept.
+
+    Args:
+        vid_cap: An opened ``cv2.VideoCapture``.
+        buffers: Optional ``frame_buffers.FrameBuffers``; frames are then decoded
+            into recycled arrays, and decoding waits while the run's memory
+            budget is used up.
+
+    The other arguments are GridSampler's.
+    """
+
+    def __init__(self, vid_cap, interval, start_from_seconds=0, end_at_seconds=None,
+                 strategy=AUTO, keyframe_interval=None, max_samples=None, timers=None, buffers=None):
+        super().__init__(interval, start_from_seconds, end_at_seconds, strategy, keyframe_interval, max_samples,
+                         timers, buffers)
+        self.vid_cap = vid_cap
+        self.frame_shape = (int(vid_cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(vid_cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        self.fps = vid_cap.get(cv2.CAP_PROP_FPS) or 0
+
+    def _read(self, read):
+        """Call read(dst), ``VideoCapture.read`` or ``retrieve``, into a recycled array when buffers are set."""
+        def decode(dst):
+            with self._timed('decode'):
+                return read(dst)
+
+        if self.buffers is None:
+            return decode(None)
+        success, image = decode_into(self.buffers, self.frame_shape, decode)
+        if success:
+            self.frame_shape = image.shape
+        return success, image
+
+    def probe_keyframe_interval(self):
+        """Estimate keyframe spacing in seconds from the first frames of the stream.
+
+        The capture is rewound to the start position afterwards.
+
+        :return: keyframe spacing in seconds, or ``None`` if it can't be detected.
+        """
+        keyframes = []
+        for index in range(KEYFRAME_PROBE_FRAMES):
+            if not self.vid_cap.grab():
+                break
+            if int(self.vid_cap.get(cv2.CAP_PROP_FRAME_TYPE)) == INTRA_FRAME_TYPE:
+                keyframes.append(index)
+        self.vid_cap.set(cv2.CAP_PROP_POS_MSEC, self.start_from_seconds * 1000)
+
+        if len(keyframes) < 2 or not self.fps:
+            return None
+        gaps = [b - a for a, b in zip(keyframes, keyframes[1:])]
+        return (sum(gaps) / len(gaps)) / self.fps
+
+    def _grab(self):
+        if not self.vid_cap.isOpened():
+            return None
+        with self._timed('decode'):
+            grabbed = self.vid_cap.grab()
+        if not grabbed:
+            return None
+        # grab() decodes into the capture; retrieve() converts the current frame.
+        return self.vid_cap.get(cv2.CAP_PROP_POS_MSEC), None
+
+    def _seek_frame(self, target_ms):
+        if not self.vid_cap.isOpened():
+            return None
+        with self._timed('seek'):
+            self.vid_cap.set(cv2.CAP_PROP_POS_MSEC, target_ms)
+        return self._grab()
+
+    def _seek_start(self):
+        start_ms = self._target_ms(0)
+        if start_ms > 0:
+            self.vid_cap.set(cv2.CAP_PROP_POS_MSEC, start_ms)
+        else:
+            self.vid_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _frames(self):
+        while True:
+            decoded = self._grab()
+            if decoded is None:
+                return
+            yield decoded
+
+    def _retrieve(self, frame):
+        return self._read(self.vid_cap.retrieve)
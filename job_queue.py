@@ -0,0 +1,138 @@
+# in-built modules
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """State of one background extraction, updated from the worker thread."""
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.state = QUEUED
+        self.frames_written = 0
+        self.expected_frames = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def report_progress(self, frames_written, expected_frames):
+        self.frames_written = frames_written
+        self.expected_frames = expected_frames
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'state': self.state,
+            'frames_written': self.frames_written,
+            'expected_frames': self.expected_frames,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobQueue:
+    """Bounded, app-wide pool that runs jobs in the background.
+
+    At most 'max_concurrent' jobs run at once and at most 'max_queued' more
+    wait for a free worker; 'submit' raises QueueFullError beyond that.
+
+    Args:
+        max_concurrent: Jobs running at the same time.
+        max_queued: Jobs waiting for a worker.
+        max_history: Finished jobs kept for status queries.
+    """
+
+    def __init__(self, max_concurrent=2, max_queued=8, max_history=1000):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _count(self, state):
+        return sum(1 for job in self._jobs.values() if job.state == state)
+
+    def reserve(self, name=None):
+        """Claim a place in the queue for a job whose input isn't ready yet.
+
+        The job counts against the queue from now on; pass it to 'start' once
+        its input is ready, or to 'cancel' to give the place back.
+
+        :return: the reserved Job.
+        :raises QueueFullError: if the queue is at capacity.
+        """
+        job = Job(name)
+        with self._lock:
+            if self._count(QUEUED) + self._count(RUNNING) >= self.max_concurrent + self.max_queued:
+                raise QueueFullError(
+                    f"{self.max_concurrent} jobs running and {self.max_queued} queued, try again later")
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def start(self, job, func, *args, **kwargs):
+        """Run 'func(*args, **kwargs, progress=job.report_progress)' for a reserved job."""
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def cancel(self, job):
+        """Give back the place of a reserved job that was never started."""
+        with self._lock:
+            self._jobs.pop(job.id, None)
+
+    def submit(self, name, func, *args, **kwargs):
+        """Queue 'func(*args, **kwargs, progress=job.report_progress)'.
+
+        :return: the queued Job.
+        :raises QueueFullError: if the queue is at capacity.
+        """
+        return self.start(self.reserve(name), func, *args, **kwargs)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {state: self._count(state) for state in (QUEUED, RUNNING, DONE, FAILED)}
+
+    def _run(self, job, func, args, kwargs):
+        job.state = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = func(*args, progress=job.report_progress, **kwargs)
+            job.state = DONE
+        except Exception as ex:
+            logger.exception(f"Error in job {job.id}: {str(ex)}")
+            job.error = str(ex)
+            job.state = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.state in (DONE, FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
@@ -1,4 +1,5 @@
 
+import logging
 from pathlib import Path
 import fire
 import frame_extractor_multithread as frame_extractor
@@ -6,4 +7,5 @@ import settings
 from web_app import app
 
 if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format='%(message)s')
     app.run(host='0.0.0.0', port=3000, threaded=True)
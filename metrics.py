@@ -0,0 +1,181 @@
+# in-built modules
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Pipeline stages timed during extraction.
+STAGES = ('seek', 'decode', 'analyze', 'resize', 'encode', 'write')
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Seconds of history behind the frames/sec gauge.
+RATE_WINDOW_SECONDS = 60
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are interpolated within a bucket."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def quantile(self, q):
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                # Observations above the last bound are reported as the last bound.
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def summary(self):
+        """Count, total and quantiles (seconds) as a JSON-friendly dict."""
+        return {
+            'count': self.count,
+            'total_seconds': round(self.sum, 6),
+            **{f"p{int(q * 100)}": round(self.quantile(q), 6) for q in QUANTILES},
+        }
+
+
+class StageTimers:
+    """Latency histograms per pipeline stage.
+
+    Args:
+        parent: Optional StageTimers every observation is also recorded in, e.g.
+            the process-wide registry, so it updates while a job runs.
+    """
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+        if self.parent is not None:
+            self.parent.observe(stage, seconds)
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def summary(self):
+        """{stage: histogram summary} for the stages that were observed."""
+        return {stage: histogram.summary() for stage, histogram in self.histograms.items() if histogram.count}
+
+
+class RateWindow:
+    """Events per second over the last 'seconds' seconds, bucketed per second."""
+
+    def __init__(self, seconds=RATE_WINDOW_SECONDS):
+        self.seconds = seconds
+        self._buckets = deque()
+        self._lock = threading.Lock()
+
+    def add(self, count=1, now=None):
+        second = int(now if now is not None else time.time())
+        with self._lock:
+            if self._buckets and self._buckets[-1][0] == second:
+                self._buckets[-1][1] += count
+            else:
+                self._buckets.append([second, count])
+            self._trim(second)
+
+    def _trim(self, second):
+        while self._buckets and self._buckets[0][0] <= second - self.seconds:
+            self._buckets.popleft()
+
+    def rate(self, now=None):
+        second = int(now if now is not None else time.time())
+        with self._lock:
+            self._trim(second)
+            return sum(count for _, count in self._buckets) / self.seconds
+
+
+class MetricsRegistry:
+    """Process-wide extraction metrics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.stages = StageTimers()
+        self.frame_rate = RateWindow()
+        self.frames_total = 0
+        self.videos_total = 0
+        self._lock = threading.Lock()
+
+    def record_frames(self, count=1):
+        with self._lock:
+            self.frames_total += count
+        self.frame_rate.add(count)
+
+    def record_video(self):
+        with self._lock:
+            self.videos_total += 1
+
+    def render(self, gauges=None, counters=None):
+        """Prometheus exposition text.
+
+        :param gauges: Extra {name: (help, value or {labels tuple: value})} gauges.
+        :param counters: Extra counters in the same shape.
+        """
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if not isinstance(samples, dict):
+                samples = {(): samples}
+            for labels, value in samples.items():
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        metric('frames_extracted_total', 'counter', 'Frames written by extractions.', self.frames_total)
+        metric('videos_extracted_total', 'counter', 'Videos (or chunks) whose extraction finished.', self.videos_total)
+        metric('frames_per_second', 'gauge', f"Frames written per second over the last {self.frame_rate.seconds}s.",
+               round(self.frame_rate.rate(), 3))
+
+        name = 'extraction_stage_seconds'
+        lines.append(f"# HELP {name} Latency of each extraction stage, per frame.")
+        lines.append(f"# TYPE {name} summary")
+        for stage, histogram in self.stages.histograms.items():
+            for q in QUANTILES:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {histogram.quantile(q):.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+
+        for kind, extra in (('gauge', gauges or {}), ('counter', counters or {})):
+            for metric_name, (help_text, samples) in extra.items():
+                metric(metric_name, kind, help_text, samples)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
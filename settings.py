@@ -34,4 +34,116 @@ REQUIRED_IMAGE_WIDTH = 720                  # EDIT: 5
 # Output frames dirpath
 OUTDIR = BASE_ROOT/'skyscraper'             # EDIT: 6 (Required)
 
+SAMPLING_STRATEGY = 'auto'                  # EDIT: 7
+# 'seek' seeks before every frame, 'sequential' decodes forward and keeps frames by timestamp,
+# 'auto' picks sequential when frames are sampled more often than the video has keyframes.
+
+KEYFRAME_INTERVAL_SECONDS = None            # EDIT: 8
+# Keyframe spacing used by 'auto'. None probes it from the video.
+
+WORKERS = None                              # EDIT: 9
+# Worker processes for frame_extractor_multiprocess.py. None uses one per CPU core.
+
+CV2_THREADS_PER_WORKER = 1                  # EDIT: 10
+# OpenCV threads inside each worker process (cv2.setNumThreads).
+
+PIPELINE_ENCODERS = 2                       # EDIT: 11
+# Encoder threads per video. Decoding, encoding and disk writes run concurrently.
+
+DECODE_QUEUE_SIZE = 8                       # EDIT: 12
+WRITE_QUEUE_SIZE = 32                       # EDIT: 13
+# Bounded queues between the decode -> encode -> write stages (in frames).
+
+WRITE_ORIGINAL_FRAMES = True                # EDIT: 14
+# False skips 'orig_size_frames' and only writes 're_size_frames'.
+
+ACTION_THRESHOLD = 25                       # EDIT: 15
+ACTION_MIN_AREA = 300                       # EDIT: 16
+# Motion detection for the "action frames" view (pixel difference and minimum changed area).
+
+INLINE_ANALYSIS = True                      # EDIT: 17
+# Detect action frames while extracting uploads, so the web view doesn't re-read the frames.
+
+ANALYSIS_CACHE_DIR = BASE_ROOT/'cache'/'analysis'   # EDIT: 18
+ANALYSIS_CACHE_ENTRIES = 128                # EDIT: 19
+ANALYSIS_CACHE_MAX_BYTES = 64 * 1024 * 1024 # EDIT: 20
+# Action frame results are cached in memory and on disk until the frames directory changes.
+
+MAX_CONCURRENT_JOBS = 2                     # EDIT: 21
+MAX_QUEUED_JOBS = 8                         # EDIT: 22
+# Uploads are extracted in the background; more than this returns 429 Too Many Requests.
+
+MAX_UPLOAD_BYTES = 8 * 1024 ** 3            # EDIT: 23
+# Larger uploads are rejected with 413 while they stream in. None disables the limit.
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024             # EDIT: 24
+UPLOAD_PROBE_BYTES = 4 * 1024 * 1024        # EDIT: 25
+# Uploads are written to 'videos/' in chunks; the header is probed once this much has arrived.
+
+DECODE_BACKEND = 'opencv'                   # EDIT: 26
+DECODE_BACKEND_OPTIONS = {}                 # EDIT: 27
+# 'opencv' (cv2.VideoCapture) or 'pyav' (FFmpeg through PyAV, needs 'pip install av').
+# pyav options: {'threads': 0, 'keyframes_only': False, 'scale_width': None}
+# keyframes_only snaps samples to keyframes; scale_width decodes straight to a smaller width
+# (orig_size_frames then holds frames at that width).
+
+RESUME_EXTRACTION = True                    # EDIT: 28
+# Keep a manifest.jsonl in every output directory; re-runs skip finished videos and resume partial ones.
+
+FRAME_INDEX_PATH = BASE_ROOT/'cache'/'frame_index.sqlite3'   # EDIT: 29
+GALLERY_PAGE_SIZE = 200                     # EDIT: 30
+# SQLite catalog of extracted frames used by the web gallery, and frames shown per page.
+
+EAGER_RESIZE = True                         # EDIT: 31
+# False skips 're_size_frames' during extraction; the gallery renders thumbnails from
+# 'orig_size_frames' on demand instead (needs WRITE_ORIGINAL_FRAMES = True).
+
+THUMBNAIL_WIDTHS = (240, 480, 720)          # EDIT: 32
+THUMBNAIL_CACHE_DIR = BASE_ROOT/'cache'/'thumbnails'   # EDIT: 33
+THUMBNAIL_CACHE_MAX_BYTES = 256 * 1024 * 1024          # EDIT: 34
+THUMBNAIL_MAX_AGE = 24 * 60 * 60            # EDIT: 35
+# Widths served by /thumb (requests snap to the nearest one), where rendered thumbnails are kept
+# and how long browsers and proxies may reuse them (seconds) before revalidating.
+
+SPRITE_SHEETS = False                       # EDIT: 36
+SPRITE_TILE_WIDTH = 160                     # EDIT: 37
+SPRITE_GRID = (10, 10)                      # EDIT: 38
+SPRITE_FORMAT = 'jpg'                       # EDIT: 39
+# Also pack a thumbnail of every frame into 'sprites/' sheets of SPRITE_GRID (columns, rows) tiles,
+# 'jpg' or 'webp', with a JSON index; the gallery then loads a few sheets instead of one file per frame.
+
+FRAME_ARCHIVE = None                        # EDIT: 40
+FRAME_ARCHIVE_OPTIONS = {}                  # EDIT: 41
+# None writes one image file per frame. 'tar' writes WebDataset-style tar shards and 'npy' writes
+# memory-mappable arrays of fixed-size frames, both under 'shards/' (see frame_archive.py).
+# tar options: {'shard_frames': 1000, 'img_frmt': 'jpg', 'width': None, 'quality': 95}
+# npy options: {'shard_frames': 1000, 'width': 224, 'height': None}
+
+DEDUP_FRAMES = False                        # EDIT: 42
+DEDUP_MAX_DISTANCE = 4                      # EDIT: 43
+# Skip frames whose 64-bit dHash is within DEDUP_MAX_DISTANCE bits of the last written frame
+# (useful for static cameras). For existing extractions:
+# python frame_dedup.py <extraction_dir> --remove --index_path=cache/frame_index.sqlite3
+
+LOG_LEVEL = 'INFO'                          # EDIT: 44
+# Log level of the extractor and the web app; 'DEBUG' also logs every written frame.
+
+FRAME_MEMORY_BUDGET_BYTES = None            # EDIT: 45
+CONCURRENT_VIDEOS = 2                       # EDIT: 46
+# Upper bound on decoded frames held at once (e.g. 512 * 1024 * 1024), shared by the videos extracted
+# concurrently in one process; decoding waits for room and frame arrays are reused. None disables it.
+# For 4K/8K sources with write_original off, also consider DECODE_BACKEND = 'pyav' with 'scale_width'.
+# CONCURRENT_VIDEOS is how many videos 'python frame_extractor_multithread.py' extracts at once.
+
+OUTPUT_SIZES = None                         # EDIT: 47
+# Write every frame at several sizes from one decode, each level into its own subdirectory, instead of
+# 'orig_size_frames' and 're_size_frames'. A list of widths (None for full size) or of dicts like
+# [{'width': 224, 'img_frmt': 'webp', 'quality': 80}, {'width': 720}, {'width': None, 'img_frmt': 'png', 'quality': 3}]
+# quality is the JPEG/WebP quality or the PNG compression level; levels go to 'frames_<width>' / 'frames_full'.
+
+ACTION_DOWNSCALE = 2                        # EDIT: 48
+ACTION_EXACT = False                        # EDIT: 49
+# Action frames are compared at 1/ACTION_DOWNSCALE resolution (1, 2, 4 or 8) with ACTION_MIN_AREA scaled
+# to match. ACTION_EXACT = True uses the original full-resolution contour check instead (slower).
+
 ### END EDIT ###
@@ -0,0 +1,162 @@
+# in-built modules
+import json
+import threading
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import numpy as np
+
+SPRITES_DIRNAME = 'sprites'
+
+ENCODE_PARAMS = {
+    'jpg': cv2.IMWRITE_JPEG_QUALITY,
+    'webp': cv2.IMWRITE_WEBP_QUALITY,
+}
+
+
+class SpriteSheetWriter:
+    """Pack frame thumbnails into tiled sprite sheets while frames are extracted.
+
+    A frame's cell is fixed by its position in the run (frame number minus
+    the run's first frame number), so frames may be added from several
+    encoder threads in any order. A sheet is encoded and written as soon as
+    its last cell is filled, which keeps at most a few sheets in memory.
+    'save' writes the remaining partial sheets and a JSON index mapping every
+    frame file name to its sheet and pixel offset.
+
+    Args:
+        tile_width: Width of a thumbnail in the sheet; the height follows the frame's aspect ratio.
+        columns: Tiles per sheet row.
+        rows: Tile rows per sheet.
+        img_frmt: 'jpg' or 'webp'.
+        quality: Encoder quality, 0-100.
+    """
+
+    def __init__(self, tile_width=160, columns=10, rows=10, img_frmt='jpg', quality=80):
+        if img_frmt not in ENCODE_PARAMS:
+            raise ValueError(f"Sprite sheet format must be one of {sorted(ENCODE_PARAMS)}")
+        self.tile_width = tile_width
+        self.columns = columns
+        self.rows = rows
+        self.img_frmt = img_frmt
+        self.quality = quality
+        self.out_dir = None
+        self.name = None
+        self.tile_height = None
+        self._sheets = {}
+        self._filled = {}
+        self._frames = {}
+        self._written = set()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Sent to worker processes as a template; the lock can't be pickled.
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def tiles_per_sheet(self):
+        return self.columns * self.rows
+
+    def copy(self, out_dir, name):
+        """Return a new writer with the same parameters for one run, writing
+        '<out_dir>/sprites/<name>_NNN.<img_frmt>'."""
+        writer = SpriteSheetWriter(self.tile_width, self.columns, self.rows, self.img_frmt, self.quality)
+        writer.out_dir = Path(out_dir) / SPRITES_DIRNAME
+        writer.name = name
+        writer.out_dir.mkdir(parents=True, exist_ok=True)
+        return writer
+
+    def sheet_filename(self, sheet):
+        return f"{self.name}_{sheet:03d}.{self.img_frmt}"
+
+    def make_tile(self, image):
+        """Resize a BGR frame to the tile size."""
+        height, width = image.shape[:2]
+        tile_height = self.tile_height or max(1, round(height * self.tile_width / width))
+        return cv2.resize(image, (self.tile_width, tile_height), interpolation=cv2.INTER_AREA)
+
+    def add(self, position, filename, image):
+        """Place a frame in its cell.
+
+        :param position: Zero-based position of the frame in this run.
+        :param filename: File name the frame is saved under.
+        :param image: Decoded BGR frame.
+        """
+        tile = self.make_tile(image)
+        sheet, cell = divmod(position, self.tiles_per_sheet)
+        row, column = divmod(cell, self.columns)
+        with self._lock:
+            if self.tile_height is None:
+                self.tile_height = tile.shape[0]
+            tile_height = self.tile_height
+            canvas = self._sheets.get(sheet)
+            if canvas is None:
+                canvas = np.zeros((tile_height * self.rows, self.tile_width * self.columns, 3), dtype=np.uint8)
+                self._sheets[sheet] = canvas
+            x, y = column * self.tile_width, row * tile_height
+            # Frames of one video share a size, so every tile has 'tile_height' rows.
+            canvas[y:y + tile_height, x:x + self.tile_width] = tile[:tile_height]
+            self._frames[filename] = (sheet, x, y)
+            self._filled[sheet] = self._filled.get(sheet, 0) + 1
+            full = self._filled[sheet] == self.tiles_per_sheet
+            if full:
+                del self._sheets[sheet]
+        # Encoding happens outside the lock, on whichever encoder thread filled the sheet.
+        if full:
+            self._write_sheet(sheet, canvas)
+
+    def _write_sheet(self, sheet, canvas):
+        success, buffer = cv2.imencode(f".{self.img_frmt}", canvas, [ENCODE_PARAMS[self.img_frmt], self.quality])
+        if not success:
+            raise ValueError(f"Unable to encode sprite sheet as {self.img_frmt}")
+        with open(self.out_dir / self.sheet_filename(sheet), 'wb') as file:
+            file.write(buffer)
+        with self._lock:
+            self._written.add(sheet)
+
+    def save(self):
+        """Write the partial sheets and '<out_dir>/sprites/<name>.json'.
+
+        :return: path of the JSON index, or None if no frame was added.
+        """
+        for sheet, canvas in sorted(self._sheets.items()):
+            self._write_sheet(sheet, canvas)
+        self._sheets.clear()
+        if not self._frames:
+            return None
+        index = {
+            'tile_width': self.tile_width,
+            'tile_height': self.tile_height,
+            'columns': self.columns,
+            'rows': self.rows,
+            'sheets': [self.sheet_filename(sheet) for sheet in sorted(self._written)],
+            'frames': {filename: [self.sheet_filename(sheet), x, y]
+                       for filename, (sheet, x, y) in sorted(self._frames.items())},
+        }
+        index_path = self.out_dir / f"{self.name}.json"
+        with open(index_path, 'w') as file:
+            json.dump(index, file)
+        return index_path
+
+
+def load_sprite_index(extraction_dir):
+    """Merge the sprite sheet indexes of an extraction.
+
+    :return: {frame file name: dict(sheet, x, y, tile_width, tile_height, columns, rows)},
+        empty if the extraction has no sprite sheets.
+    """
+    frames = {}
+    for index_path in sorted((Path(extraction_dir) / SPRITES_DIRNAME).glob('*.json')):
+        with open(index_path) as file:
+            index = json.load(file)
+        layout = {key: index[key] for key in ('tile_width', 'tile_height', 'columns', 'rows')}
+        for filename, (sheet, x, y) in index['frames'].items():
+            frames[filename] = {'sheet': sheet, 'x': x, 'y': y, **layout}
+    return frames
@@ -0,0 +1,38 @@
+"""Shared fixtures: small synthetic videos written with cv2.VideoWriter.
+
+Run from the repository root (settings.py resolves paths from the working
+directory):
+
+    python -m pytest -q
+"""
+# in-built modules
+import sys
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def write_video(path, seconds=4, fps=25, width=160, height=120, hold=1):
+    """Write a video of a white block sliding across a grey background.
+
+    The block moves every 'hold' frames, so with the default no two frames are alike.
+    """
+    frames = int(seconds * fps)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    for index in range(frames):
+        frame = np.full((height, width, 3), 60, dtype=np.uint8)
+        x = (index - index % hold) * (width - 24) // max(1, frames - 1)
+        cv2.rectangle(frame, (x, height // 3), (x + 24, height // 3 + 32), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return Path(path)
+
+
+@pytest.fixture
+def video(tmp_path):
+    return write_video(tmp_path / 'clip.mp4')
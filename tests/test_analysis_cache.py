@@ -0,0 +1,57 @@
+# in-built modules
+import threading
+import time
+
+# dependencies packages
+import pytest
+
+# Internal module
+from analysis_cache import AnalysisCache
+
+
+@pytest.fixture
+def frames_dir(tmp_path):
+    frames_dir = tmp_path / 'frames'
+    frames_dir.mkdir()
+    (frames_dir / 'clip_00000.jpg').write_bytes(b'')
+    return frames_dir
+
+
+def test_concurrent_misses_compute_once(frames_dir, tmp_path):
+    cache = AnalysisCache(cache_dir=tmp_path / 'cache')
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return ['clip_00000.jpg']
+
+    def lookup(results):
+        barrier.wait()
+        results.append(cache.get_or_compute(frames_dir, {'threshold': 25}, compute))
+
+    results = []
+    threads = [threading.Thread(target=lookup, args=(results,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [['clip_00000.jpg']] * 8
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 7
+
+
+def test_failed_compute_is_retried_by_next_caller(frames_dir):
+    cache = AnalysisCache()
+
+    def fail():
+        raise RuntimeError('analyzer failed')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute(frames_dir, {}, fail)
+    assert cache.get_or_compute(frames_dir, {}, lambda: []) == []
+    assert cache.stats()['misses'] == 1
@@ -0,0 +1,26 @@
+# dependencies packages
+import cv2
+
+# Internal module
+from batch_scheduler import BatchScheduler, extract_directory
+from conftest import write_video
+from frame_extractor_multithread import FrameExtractor
+
+
+def test_img_width_sets_the_resized_frame_width(video, tmp_path):
+    extract_directory(video.parent, tmp_path / 'out', required_frame_rate=1, start_from_seconds=0, img_width=96,
+                      workers=1, verbose=False)
+    resized = sorted((tmp_path / 'out' / 're_size_frames').iterdir())
+    assert len(resized) == 4
+    assert {cv2.imread(str(path)).shape[1] for path in resized} == {96}
+
+
+def test_longest_video_is_planned_first(tmp_path):
+    short = write_video(tmp_path / 'a_short.mp4', seconds=2)
+    long = write_video(tmp_path / 'b_long.mp4', seconds=5)
+    (tmp_path / 'notes.txt').write_text('not a video')
+    scheduler = BatchScheduler(FrameExtractor(tmp_path / 'out', required_frame_rate=1, start_from_seconds=0,
+                                              resume=False, verbose=False), workers=1, chunk_seconds=0)
+    videos, skipped = scheduler.probe([short, long, tmp_path / 'notes.txt'])
+    assert list(skipped) == [tmp_path / 'notes.txt']
+    assert [job['video'] for job in scheduler.plan(videos)] == [long, short]
@@ -0,0 +1,45 @@
+# in-built modules
+from pathlib import Path
+
+# dependencies packages
+import pytest
+
+# Internal module
+from decode_backends import get_backend
+from frame_extractor_multiprocess import plan_chunks
+from frame_extractor_multithread import FrameExtractor
+
+
+def extract(video, out_dir, interval, strategy, backend='opencv', chunk_seconds=None):
+    frame_extractor = FrameExtractor(Path(out_dir), required_frame_rate=interval, start_from_seconds=0,
+                                     verbose=False, sampling_strategy=strategy, backend=get_backend(backend),
+                                     resume=False)
+    for start_seconds, end_seconds, start_count in plan_chunks(video, interval, 0, chunk_seconds):
+        frame_extractor.extract_frames(video, start_seconds=start_seconds, end_seconds=end_seconds,
+                                       start_count=start_count)
+    return sorted(path.name for path in (Path(out_dir) / 'orig_size_frames').iterdir())
+
+
+def test_plan_chunks_numbers_chunks_by_sample_slot():
+    assert plan_chunks('clip.mp4', 0.5, 1, 2, duration=6) == [(1, 3.0, 1), (3.0, 5.0, 5), (5.0, None, 9)]
+    assert plan_chunks('clip.mp4', 0.5, 1, None, duration=6) == [(1, None, 1)]
+
+
+# 0.02s is shorter than the 25fps frame period, so some sample slots get no frame of their own.
+@pytest.mark.parametrize('interval', [0.02, 0.07, 0.5])
+@pytest.mark.parametrize('strategy', ['seek', 'sequential'])
+@pytest.mark.parametrize('backend', ['opencv', 'pyav'])
+def test_chunks_name_frames_like_a_single_run(video, tmp_path, interval, strategy, backend):
+    if backend == 'pyav':
+        pytest.importorskip('av')
+    single = extract(video, tmp_path / 'single', interval, strategy, backend)
+    chunked = extract(video, tmp_path / 'chunked', interval, strategy, backend, chunk_seconds=1.3)
+    assert chunked == single
+
+
+def test_frames_are_never_repeated_under_new_numbers(video, tmp_path):
+    names = extract(video, tmp_path / 'out', 0.02, 'sequential')
+    # 4 seconds at 25fps: one file per decoded frame, numbered by its 20ms slot.
+    assert len(names) == 100
+    assert [int(name.split('_')[3]) for name in names] == list(range(1, 200, 2))
+    assert extract(video, tmp_path / 'seek', 0.02, 'seek') == names
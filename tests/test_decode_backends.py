@@ -0,0 +1,50 @@
+# in-built modules
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import numpy as np
+import pytest
+
+# Internal module
+from decode_backends import OpenCVReader, get_backend
+from frame_extractor_multithread import FrameExtractor
+
+
+def write_webm(path, seconds=4, fps=25, width=160, height=120):
+    """Write a VP8 WebM with PyAV; its stream reports neither a frame count nor a duration."""
+    av = pytest.importorskip('av')
+    with av.open(str(path), 'w') as container:
+        stream = container.add_stream('libvpx', rate=fps)
+        stream.width, stream.height, stream.pix_fmt = width, height, 'yuv420p'
+        for index in range(seconds * fps):
+            image = np.full((height, width, 3), 60, dtype=np.uint8)
+            cv2.rectangle(image, (index, height // 3), (index + 24, height // 3 + 32), (255, 255, 255), -1)
+            container.mux(stream.encode(av.VideoFrame.from_ndarray(image, format='bgr24')))
+        container.mux(stream.encode())
+    return Path(path)
+
+
+def extract(video, out_dir, backend):
+    frame_extractor = FrameExtractor(Path(out_dir), required_frame_rate=0.5, start_from_seconds=0, verbose=False,
+                                     backend=get_backend(backend), resume=False)
+    return frame_extractor.probe(video), frame_extractor.extract_frames(video)['frames']
+
+
+def test_pyav_reads_webm_without_stream_duration(tmp_path):
+    video = write_webm(tmp_path / 'clip.webm')
+    probe, frames = extract(video, tmp_path / 'pyav', 'pyav')
+    assert probe is not None and probe['duration'] == pytest.approx(4, abs=0.1)
+    assert frames == extract(video, tmp_path / 'opencv', 'opencv')[1] == 8
+
+
+def test_unknown_frame_count_does_not_cap_sampling(video, tmp_path, monkeypatch):
+    expected = extract(video, tmp_path / 'counted', 'opencv')[1]
+    open_reader = OpenCVReader.__init__
+
+    def without_frame_count(self, vid):
+        open_reader(self, vid)
+        self.frame_count = 0
+
+    monkeypatch.setattr(OpenCVReader, '__init__', without_frame_count)
+    assert extract(video, tmp_path / 'uncounted', 'opencv')[1] == expected
@@ -0,0 +1,73 @@
+# in-built modules
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import numpy as np
+import pytest
+
+# Internal module
+from conftest import write_video
+from frame_analyzer import FrameAnalyzer, StreamingFrameAnalyzer, load_action_frames
+from frame_extractor_multithread import FrameExtractor
+
+
+def baseline_detect_changes(frames_dir, threshold, min_area):
+    """Full-resolution contour check the analyzer's results are compared with."""
+    frames = sorted(Path(frames_dir).glob('*.jpg'))
+    action_frames = []
+    for prev_path, path in zip(frames, frames[1:]):
+        gray1 = cv2.cvtColor(cv2.imread(str(prev_path)), cv2.COLOR_BGR2GRAY)
+        gray2 = cv2.cvtColor(cv2.imread(str(path)), cv2.COLOR_BGR2GRAY)
+        _, thresh = cv2.threshold(cv2.absdiff(gray1, gray2), threshold, 255, cv2.THRESH_BINARY)
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if any(cv2.contourArea(contour) > min_area for contour in contours):
+            action_frames.append(path)
+    return action_frames
+
+
+def write_frames(frames_dir, sides, width=320, height=240):
+    """One frame per side length, each with a white square of that side at a new position."""
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (21, 21), 0)
+    for i, side in enumerate(sides):
+        frame = background.copy()
+        x, y = int(rng.integers(0, width - side)), int(rng.integers(0, height - side))
+        cv2.rectangle(frame, (x, y), (x + side - 1, y + side - 1), (255, 255, 255), -1)
+        cv2.imwrite(str(frames_dir / f"frame_{i:05}.jpg"), frame)
+
+
+def test_exact_matches_baseline(tmp_path):
+    write_frames(tmp_path, [4, 12, 20, 22, 23, 24, 26, 30, 8, 40, 21, 25])
+    for min_area in (100, 300, 450, 500):
+        expected = baseline_detect_changes(tmp_path, 25, min_area)
+        assert FrameAnalyzer(tmp_path, threshold=25, min_area=min_area, exact=True).detect_changes() == expected
+
+
+@pytest.mark.parametrize('downscale', [1, 2, 4])
+def test_downscale_scales_min_area(tmp_path, downscale):
+    # A 40x40 square moving between two corners: every changed region is 1600 pixels at full resolution.
+    for i in range(6):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        x, y = (40, 40) if i % 2 else (240, 160)
+        cv2.rectangle(frame, (x, y), (x + 39, y + 39), (255, 255, 255), -1)
+        cv2.imwrite(str(tmp_path / f"frame_{i:05}.jpg"), frame)
+    frames = sorted(tmp_path.glob('*.jpg'))[1:]
+    assert FrameAnalyzer(tmp_path, threshold=25, min_area=1000, downscale=downscale).detect_changes() == frames
+    assert FrameAnalyzer(tmp_path, threshold=25, min_area=2000, downscale=downscale).detect_changes() == []
+
+
+def test_fallback_matches_inline_analysis_of_full_size_frames(tmp_path):
+    video = write_video(tmp_path / 'wide.mp4', width=320, height=240)
+    out_dir = tmp_path / 'out'
+    analyzer = StreamingFrameAnalyzer(threshold=25, min_area=150, width=160)
+    FrameExtractor(out_dir, required_frame_rate=0.2, start_from_seconds=0, img_width=160, verbose=False,
+                   eager_resize=False, analyzer=analyzer).extract_frames(video)
+
+    fallback = FrameAnalyzer(out_dir / 'orig_size_frames', threshold=25, min_area=150, width=160)
+    inline = load_action_frames(out_dir, fallback.params())
+    assert inline
+    assert [path.name for path in fallback.detect_changes()] == inline
+    # Sidecars measured at another width are not served.
+    full_size = FrameAnalyzer(out_dir / 'orig_size_frames', threshold=25, min_area=150)
+    assert load_action_frames(out_dir, full_size.params()) is None
@@ -0,0 +1,102 @@
+# in-built modules
+from pathlib import Path
+
+# dependencies packages
+import cv2
+import numpy as np
+import pytest
+
+# Internal module
+from frame_archive import NpyShardWriter, TarShardWriter, get_archive, list_shards, open_shard
+from frame_extractor_multithread import FrameExtractor
+from thumbnail_cache import ThumbnailCache
+
+
+def noise(width=96, height=64, seed=0):
+    """Blurred noise: detailed enough for lossy quality and compressible enough for PNG levels to matter."""
+    image = np.random.default_rng(seed).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(image, (5, 5), 0)
+
+
+@pytest.mark.parametrize('img_frmt, low, high', [('jpg', 10, 95), ('webp', 10, 95), ('png', 9, 0)])
+def test_tar_shards_encode_with_the_format_quality(img_frmt, low, high):
+    def encoded_size(quality):
+        data, _ = TarShardWriter(img_frmt=img_frmt, quality=quality).prepare(0, 1, 0.0, 'frame.jpg', noise())
+        return len(data)
+
+    # Lower quality (or higher PNG compression) gives a smaller file.
+    assert encoded_size(low) < encoded_size(high)
+
+
+@pytest.mark.parametrize('img_frmt, low, high', [('webp', 10, 95), ('png', 9, 0)])
+def test_thumbnails_encode_with_the_format_quality(tmp_path, img_frmt, low, high):
+    source = tmp_path / 'frame.png'
+    cv2.imwrite(str(source), noise(width=320, height=240))
+
+    def rendered_size(quality):
+        cache = ThumbnailCache(tmp_path / f"cache_{quality}", img_frmt=img_frmt, quality=quality)
+        path, _ = cache.get(source, 160)
+        assert cv2.imread(str(path)).shape == (120, 160, 3)
+        return Path(path).stat().st_size
+
+    assert rendered_size(low) < rendered_size(high)
+
+
+def write_frames(writer, positions):
+    """Prepare and write the frames at 'positions' in the given order; frame i is noise(seed=i)."""
+    for position in positions:
+        filename = f"frame_{position:05}.jpg"
+        writer.write(filename, writer.prepare(position, position + 1, position * 40.0, filename, noise(seed=position)))
+    return writer.close()
+
+
+def test_npy_shards_fill_slots_out_of_order_and_trim_the_last_shard(tmp_path):
+    writer = NpyShardWriter(shard_frames=4, width=48).copy(tmp_path, 'clip')
+    # Frames arrive from several encoder threads in any order.
+    positions = [1, 0, 3, 5, 2, 4, 9, 6, 8, 7]
+    shards = write_frames(writer, positions)
+    assert [path.name for path in shards] == ['clip-000000.npy', 'clip-000001.npy', 'clip-000002.npy']
+    assert list_shards(tmp_path) == shards
+    assert not list((tmp_path / 'shards').glob('*.part'))
+
+    readers = [open_shard(path) for path in shards]
+    assert [len(reader) for reader in readers] == [4, 4, 2]
+    frames, index = zip(*(batch for reader in readers for batch in reader.batches(batch_size=3)))
+    frames, index = np.concatenate(frames), np.concatenate(index)
+    assert frames.shape == (10, 32, 48, 3)
+    assert index['frame_num'].tolist() == list(range(1, 11))
+    assert index['timestamp_ms'].tolist() == [position * 40.0 for position in range(10)]
+    for position, frame in enumerate(frames):
+        expected = cv2.resize(noise(seed=position), (48, 32), interpolation=cv2.INTER_AREA)
+        assert np.array_equal(frame, expected)
+
+
+def test_tar_shards_roll_over_and_read_back(tmp_path):
+    writer = TarShardWriter(shard_frames=4, img_frmt='png').copy(tmp_path, 'clip')
+    shards = write_frames(writer, range(10))
+    assert [path.name for path in shards] == ['clip-000000.tar', 'clip-000001.tar', 'clip-000002.tar']
+    assert list_shards(tmp_path) == shards
+    assert not list((tmp_path / 'shards').glob('*.part'))
+
+    metadata, images = [], []
+    for path in shards:
+        reader = open_shard(path)
+        for frames, batch in reader.batches(batch_size=3):
+            metadata.extend(batch)
+            images.extend(cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_COLOR) for frame in frames)
+        del frames
+        reader.close()
+    assert [len(open_shard(path)) for path in shards] == [4, 4, 2]
+    assert [meta['frame_num'] for meta in metadata] == list(range(1, 11))
+    assert [meta['file'] for meta in metadata] == [f"frame_{position:05}.jpg" for position in range(10)]
+    # PNG is lossless, so the frames come back exactly.
+    assert all(np.array_equal(image, noise(seed=position)) for position, image in enumerate(images))
+
+
+@pytest.mark.parametrize('name, options', [('tar', {'shard_frames': 3}), ('npy', {'shard_frames': 3, 'width': 64})])
+def test_extraction_writes_every_frame_to_shards(video, tmp_path, name, options):
+    result = FrameExtractor(tmp_path / 'out', required_frame_rate=0.5, start_from_seconds=0, verbose=False,
+                            resume=False, archive=get_archive(name, **options)).extract_frames(video)
+    readers = [open_shard(path) for path in list_shards(tmp_path / 'out')]
+    assert sum(len(reader) for reader in readers) == result['frames'] == 8
+    assert not list((tmp_path / 'out').glob('*/*.jpg'))
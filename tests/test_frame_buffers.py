@@ -0,0 +1,75 @@
+# in-built modules
+import pickle
+import threading
+
+# dependencies packages
+import numpy as np
+
+# Internal module
+from batch_scheduler import BatchScheduler
+from frame_buffers import FrameBufferPool, frame_nbytes
+from frame_extractor_multithread import FrameExtractor
+
+SHAPE = (120, 160, 3)
+
+
+def test_acquire_waits_for_room_in_the_budget():
+    pool = FrameBufferPool(budget_bytes=2 * frame_nbytes(SHAPE))
+    buffers = pool.job()
+    frames = [np.zeros(SHAPE, np.uint8) for _ in range(2)]
+    for _ in frames:
+        buffers.acquire(SHAPE)
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (buffers.acquire(SHAPE), acquired.set()), daemon=True)
+    waiter.start()
+    assert not acquired.wait(0.2)
+    assert pool.in_flight_bytes == 2 * frame_nbytes(SHAPE)
+
+    buffers.release(frames[0], reuse=False)
+    assert acquired.wait(5)
+    waiter.join()
+    assert pool.peak_bytes == 2 * frame_nbytes(SHAPE)
+
+
+def test_a_frame_is_admitted_alone_even_over_budget():
+    pool = FrameBufferPool(budget_bytes=frame_nbytes(SHAPE) // 2)
+    assert pool.job().acquire(SHAPE) is None
+    assert pool.in_flight_bytes == frame_nbytes(SHAPE)
+
+
+def test_released_arrays_are_reused_for_the_same_shape():
+    pool = FrameBufferPool(budget_bytes=4 * frame_nbytes(SHAPE))
+    buffers = pool.job()
+    assert buffers.acquire(SHAPE) is None
+    frame = np.zeros(SHAPE, np.uint8)
+    buffers.release(frame)
+    assert pool.in_flight_bytes == 0 and pool.free_bytes == frame.nbytes
+
+    assert buffers.acquire(SHAPE) is frame
+    # Views don't own their memory and are not kept.
+    buffers.release(np.zeros((240, 160, 3), np.uint8)[:120], nbytes=frame.nbytes)
+    assert buffers.acquire(SHAPE) is None
+    assert buffers.finish() == {'frames': 3, 'reused': 1, 'peak_bytes': frame.nbytes}
+
+
+def test_pool_pickles_as_an_empty_pool_with_the_same_budget():
+    pool = FrameBufferPool(budget_bytes=3 * frame_nbytes(SHAPE))
+    pool.job().release(np.zeros(SHAPE, np.uint8), nbytes=0)
+    copy = pickle.loads(pickle.dumps(pool))
+    assert copy.budget_bytes == pool.budget_bytes
+    assert (copy.in_flight_bytes, copy.free_bytes, copy.peak_bytes) == (0, 0, 0)
+    assert copy.job().acquire(SHAPE) is None
+
+
+def test_budgeted_process_pool_run_writes_the_same_frames(video, tmp_path):
+    def extract(out_dir, buffer_pool):
+        frame_extractor = FrameExtractor(out_dir, required_frame_rate=0.2, start_from_seconds=0, verbose=False,
+                                         resume=False, buffer_pool=buffer_pool)
+        result = BatchScheduler(frame_extractor, workers=2, processes=True, chunk_seconds=1).run([video])
+        assert result['videos'][0]['chunks'] == 4
+        return {path.relative_to(out_dir): path.read_bytes() for path in sorted(out_dir.rglob('*.jpg'))}
+
+    unbounded = extract(tmp_path / 'unbounded', None)
+    # Room for a single decoded frame per worker process.
+    budgeted = extract(tmp_path / 'budgeted', FrameBufferPool(budget_bytes=frame_nbytes(SHAPE)))
+    assert budgeted and budgeted == unbounded
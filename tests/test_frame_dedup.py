@@ -0,0 +1,30 @@
+# Internal module
+from conftest import write_video
+from extraction_manifest import ExtractionManifest
+from frame_dedup import dedup_extraction
+from frame_extractor_multithread import FrameExtractor
+from frame_index import FrameIndex
+
+
+def test_removed_duplicates_stay_removed(tmp_path):
+    video = write_video(tmp_path / 'steps.mp4', hold=10)
+    out_dir = tmp_path / 'out'
+
+    def extract():
+        return FrameExtractor(out_dir, required_frame_rate=0.2, start_from_seconds=0, verbose=False,
+                              resume=True).extract_frames(video)
+
+    extract()
+    frames = sorted(path.name for path in (out_dir / 'orig_size_frames').iterdir())
+    duplicates = dedup_extraction(out_dir, max_distance=0, remove=True)
+    assert duplicates and len(duplicates) < len(frames)
+    kept = sorted(set(frames) - set(duplicates))
+    assert sorted(path.name for path in (out_dir / 'orig_size_frames').iterdir()) == kept
+
+    manifest = ExtractionManifest(out_dir)
+    assert manifest.frame_files() == kept
+    assert extract()['skipped']
+    assert sorted(path.name for path in (out_dir / 'orig_size_frames').iterdir()) == kept
+
+    frame_index = FrameIndex(tmp_path / 'index.sqlite3')
+    assert frame_index.backfill(out_dir, 'jpg') == len(kept)
@@ -0,0 +1,33 @@
+# Internal module
+from frame_pipeline import FramePipeline
+
+
+def run_pipeline(items, encode, write):
+    written = []
+    pipeline = FramePipeline(encoders=3, decode_queue_size=2, write_queue_size=2)
+    count = pipeline.run(items, encode, write, written.append)
+    return pipeline, count, written
+
+
+def test_counts_written_items():
+    pipeline, count, written = run_pipeline(range(20), lambda item: (item, [(item, b'')]), lambda path, data: None)
+    assert count == pipeline.written == pipeline.decoded == 20
+    assert pipeline.failed == 0
+    assert sorted(written) == list(range(20))
+
+
+def test_failed_items_are_not_counted_as_written():
+    def encode(item):
+        if item == 3:
+            raise ValueError("encode failed")
+        return item, [(item, b'')]
+
+    def write(path, data):
+        if path == 7:
+            raise OSError("disk full")
+
+    pipeline, count, written = run_pipeline(range(10), encode, write)
+    assert pipeline.decoded == 10
+    assert count == pipeline.written == 8
+    assert pipeline.failed == 2
+    assert 3 not in written and 7 not in written
@@ -0,0 +1,43 @@
+# dependencies packages
+import cv2
+import numpy as np
+
+# Internal module
+from frame_extractor_multithread import FrameExtractor
+from frame_pyramid import FramePyramid, resize_area
+
+
+def test_levels_are_resized_from_the_previous_level():
+    pyramid = FramePyramid([40, None, 120, 80])
+    sources = []
+
+    def resize(image, size):
+        sources.append((image.shape[1], size))
+        return resize_area(image, size)
+
+    frame = np.zeros((120, 160, 3), np.uint8)
+    rendered = [(level.width, image.shape[:2]) for level, image in pyramid.render(frame, resize)]
+    assert rendered == [(None, (120, 160)), (120, (90, 120)), (80, (60, 80)), (40, (30, 40))]
+    assert sources == [(160, (120, 90)), (120, (80, 60)), (80, (40, 30))]
+
+
+def test_extraction_writes_every_level_with_its_own_format_and_quality(video, tmp_path):
+    sizes = [None,
+             {'width': 80, 'img_frmt': 'webp', 'quality': 10, 'dirname': 'low'},
+             {'width': 80, 'img_frmt': 'webp', 'quality': 95, 'dirname': 'high'},
+             {'width': 40, 'img_frmt': 'png'}]
+    result = FrameExtractor(tmp_path / 'out', required_frame_rate=0.5, start_from_seconds=0, verbose=False,
+                            resume=False, sizes=sizes).extract_frames(video)
+    assert result['frames'] == 8
+
+    levels = {'frames_full': ('jpg', (120, 160)), 'low': ('webp', (60, 80)), 'high': ('webp', (60, 80)),
+              'frames_40': ('png', (30, 40))}
+    for dirname, (img_frmt, shape) in levels.items():
+        files = sorted((tmp_path / 'out' / dirname).iterdir())
+        assert len(files) == 8 and all(path.suffix == f".{img_frmt}" for path in files)
+        assert all(cv2.imread(str(path)).shape[:2] == shape for path in files)
+    assert not (tmp_path / 'out' / 'orig_size_frames').exists()
+
+    def total_bytes(dirname):
+        return sum(path.stat().st_size for path in (tmp_path / 'out' / dirname).iterdir())
+    assert total_bytes('low') < total_bytes('high')
@@ -0,0 +1,177 @@
+# in-built modules
+import json
+from pathlib import Path
+
+# dependencies packages
+import pytest
+
+# Internal module
+from conftest import write_video
+from decode_backends import get_backend
+from extraction_manifest import MANIFEST_FILENAME
+from frame_analyzer import ANALYSIS_DIRNAME, StreamingFrameAnalyzer
+from frame_buffers import FrameBufferPool
+from frame_dedup import FrameDeduplicator
+from frame_extractor_multithread import FrameExtractor
+
+
+def make_extractor(out_dir, interval=0.5, strategy='sequential', backend=None, **options):
+    return FrameExtractor(Path(out_dir), required_frame_rate=interval, start_from_seconds=0, verbose=False,
+                          sampling_strategy=strategy, backend=backend or get_backend('opencv'), resume=True,
+                          **options)
+
+
+def frame_names(out_dir):
+    return sorted(path.name for path in (Path(out_dir) / 'orig_size_frames').iterdir())
+
+
+def manifest_records(out_dir):
+    with open(Path(out_dir) / MANIFEST_FILENAME) as file:
+        return [json.loads(line) for line in file]
+
+
+def interrupt_after(out_dir, frames):
+    """Make the manifest look like the run stopped after 'frames' frames, and drop the files written after them."""
+    records = manifest_records(out_dir)
+    kept, seen = [], 0
+    for record in records:
+        if record['t'] == 'done':
+            continue
+        if record['t'] in ('frame', 'dup'):
+            seen += 1
+            if seen > frames:
+                if record['t'] == 'frame':
+                    (Path(out_dir) / 'orig_size_frames' / record['file']).unlink()
+                continue
+        kept.append(record)
+    with open(Path(out_dir) / MANIFEST_FILENAME, 'w') as file:
+        file.writelines(json.dumps(record) + '\n' for record in kept)
+
+
+@pytest.mark.parametrize('interval, strategy', [(0.5, 'seek'), (0.5, 'sequential'), (0.02, 'seek'),
+                                                (0.02, 'sequential')])
+def test_resume_writes_the_frames_of_a_single_run(video, tmp_path, interval, strategy):
+    make_extractor(tmp_path / 'single', interval, strategy).extract_frames(video)
+    expected = frame_names(tmp_path / 'single')
+
+    out_dir = tmp_path / 'resumed'
+    make_extractor(out_dir, interval, strategy).extract_frames(video)
+    interrupt_after(out_dir, 3)
+    result = make_extractor(out_dir, interval, strategy).extract_frames(video)
+
+    assert frame_names(out_dir) == expected
+    assert result['frames'] == len(expected) - 3
+    records = manifest_records(out_dir)
+    assert sorted(record['file'] for record in records if record['t'] == 'frame') == expected
+    assert records[-1]['t'] == 'done'
+    assert make_extractor(out_dir, interval, strategy).extract_frames(video)['skipped']
+
+
+def test_resume_with_keyframes_only(video, tmp_path):
+    pytest.importorskip('av')
+    backend = get_backend('pyav', keyframes_only=True)
+    make_extractor(tmp_path / 'single', 0.1, backend=backend).extract_frames(video)
+    expected = frame_names(tmp_path / 'single')
+
+    out_dir = tmp_path / 'resumed'
+    make_extractor(out_dir, 0.1, backend=backend).extract_frames(video)
+    interrupt_after(out_dir, 2)
+    make_extractor(out_dir, 0.1, backend=backend).extract_frames(video)
+    assert frame_names(out_dir) == expected
+
+
+def test_resume_keeps_dropping_duplicates(tmp_path):
+    video = write_video(tmp_path / 'steps.mp4', hold=10)
+
+    def run(out_dir):
+        result = make_extractor(out_dir, 0.04, dedup=FrameDeduplicator(max_distance=0)).extract_frames(video)
+        return result, [(record['t'], record['n']) for record in manifest_records(out_dir)
+                        if record['t'] in ('frame', 'dup')]
+
+    _, expected = run(tmp_path / 'single')
+    assert ('dup', 2) in expected
+
+    out_dir = tmp_path / 'resumed'
+    run(out_dir)
+    interrupt_after(out_dir, 15)
+    _, records = run(out_dir)
+    assert sorted(records) == sorted(expected)
+    assert frame_names(out_dir) == frame_names(tmp_path / 'single')
+
+
+def test_resumed_analysis_sidecar_covers_the_whole_range(video, tmp_path):
+    def analyzed(out_dir):
+        extractor = make_extractor(out_dir, 0.2, analyzer=StreamingFrameAnalyzer(threshold=25, min_area=50))
+        extractor.extract_frames(video)
+        sidecars = list((Path(out_dir) / ANALYSIS_DIRNAME).glob('*.json'))
+        assert len(sidecars) == 1
+        with open(sidecars[0]) as file:
+            return json.load(file)['action_frames']
+
+    expected = analyzed(tmp_path / 'single')
+    assert expected
+
+    out_dir = tmp_path / 'resumed'
+    analyzed(out_dir)
+    interrupt_after(out_dir, 7)
+    (Path(out_dir) / ANALYSIS_DIRNAME).joinpath('clip_00001.json').unlink()
+    assert analyzed(out_dir) == expected
+
+
+def test_failed_frames_keep_the_range_open(video, tmp_path, monkeypatch):
+    failing = '00_00_01_00004_clip.jpg'
+
+    def write_file(path, data):
+        if Path(path).name == failing:
+            raise OSError("disk full")
+        with open(path, 'wb') as file:
+            file.write(data)
+
+    monkeypatch.setattr(FrameExtractor, 'write_file', staticmethod(write_file))
+    result = make_extractor(tmp_path).extract_frames(video)
+    assert result['failed'] == 1
+    assert result['frames'] == 7
+    records = manifest_records(tmp_path)
+    assert not any(record['t'] == 'done' for record in records)
+    # Nothing after the failed frame is recorded, so the next run restarts there.
+    assert max(record['n'] for record in records if record['t'] == 'frame') == 3
+
+    monkeypatch.undo()
+    result = make_extractor(tmp_path).extract_frames(video)
+    assert result['failed'] == 0
+    assert result['frames'] == 5
+    assert failing in frame_names(tmp_path)
+    assert manifest_records(tmp_path)[-1]['t'] == 'done'
+
+
+def test_reader_and_buffers_are_released_when_extraction_raises(video, tmp_path, monkeypatch):
+    closed = []
+    backend = get_backend('opencv')
+    open_reader = type(backend).open
+
+    def failing_open(self, vid):
+        reader = open_reader(self, vid)
+        sampler = reader.sampler
+        close = reader.close
+
+        def broken_sampler(**options):
+            frames = sampler(**options)
+
+            def samples():
+                yield from list(frames.samples())[:2]
+                raise RuntimeError("decoder crashed")
+
+            frames.samples = samples
+            return frames
+
+        reader.sampler = broken_sampler
+        reader.close = lambda: (closed.append(vid), close())
+        return reader
+
+    monkeypatch.setattr(type(backend), 'open', failing_open)
+    pool = FrameBufferPool(64 * 2 ** 20)
+    with pytest.raises(RuntimeError):
+        make_extractor(tmp_path, backend=backend, buffer_pool=pool).extract_frames(video)
+    assert closed == [video]
+    assert pool.in_flight_bytes == 0
+    assert not pool._jobs
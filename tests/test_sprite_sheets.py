@@ -0,0 +1,29 @@
+# dependencies packages
+import cv2
+import numpy as np
+
+# Internal module
+from sprite_sheets import SpriteSheetWriter, load_sprite_index
+
+
+def test_index_points_every_frame_at_its_tile(tmp_path):
+    writer = SpriteSheetWriter(tile_width=40, columns=3, rows=2, img_frmt='jpg', quality=95).copy(tmp_path, 'clip')
+    frames = {f"frame_{position}.jpg": np.full((60, 80, 3), 20 * position, np.uint8) for position in range(8)}
+    # Encoder threads finish frames in any order.
+    for position in (5, 0, 7, 2, 1, 4, 3, 6):
+        writer.add(position, f"frame_{position}.jpg", frames[f"frame_{position}.jpg"])
+    writer.save()
+
+    sprites = load_sprite_index(tmp_path)
+    assert sorted(sprites) == sorted(frames)
+    for position in range(8):
+        sprite = sprites[f"frame_{position}.jpg"]
+        sheet, cell = divmod(position, 6)
+        row, column = divmod(cell, 3)
+        assert (sprite['sheet'], sprite['x'], sprite['y']) == (f"clip_{sheet:03d}.jpg", column * 40, row * 30)
+        assert (sprite['tile_width'], sprite['tile_height'], sprite['columns'], sprite['rows']) == (40, 30, 3, 2)
+
+        image = cv2.imread(str(tmp_path / 'sprites' / sprite['sheet']))
+        assert image.shape == (60, 120, 3)
+        tile = image[sprite['y']:sprite['y'] + 30, sprite['x']:sprite['x'] + 40]
+        assert abs(float(tile.mean()) - 20 * position) < 3
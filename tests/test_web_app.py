@@ -0,0 +1,169 @@
+# in-built modules
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# dependencies packages
+import cv2
+import numpy as np
+import pytest
+
+# Internal module
+import settings
+from conftest import write_video
+import web_app
+from frame_index import FrameIndex
+from job_queue import JobQueue
+from metrics import MetricsRegistry
+from thumbnail_cache import ThumbnailCache
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setitem(web_app.app.config, 'UPLOAD_FOLDER', str(tmp_path / 'videos'))
+    monkeypatch.setitem(web_app.app.config, 'OUTPUT_FOLDER', str(tmp_path / 'frames'))
+    monkeypatch.setattr(web_app, 'frame_index', FrameIndex(tmp_path / 'index.sqlite3'))
+    monkeypatch.setattr(web_app, 'thumbnail_cache', ThumbnailCache(tmp_path / 'thumbnails'))
+    monkeypatch.setattr(settings, 'SPRITE_SHEETS', True)
+    return web_app.app.test_client()
+
+
+def upload(client, video, filename):
+    with open(video, 'rb') as file:
+        response = client.post('/upload', data={'video': (file, filename)}, content_type='multipart/form-data')
+    assert response.status_code == 202, response.data
+    status_url = response.get_json()['status_url']
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        job = client.get(status_url).get_json()
+        if job['state'] in ('done', 'failed'):
+            assert job['state'] == 'done', job['error']
+            return job
+        time.sleep(0.05)
+    pytest.fail("Extraction job did not finish")
+
+
+def test_upload_name_with_spaces_is_served(client, video, tmp_path):
+    job = upload(client, video, 'my clip.mp4')
+    extraction = job['name']
+    assert extraction.endswith('_my_clip')
+    assert (tmp_path / 'videos' / f'{extraction}.mp4').exists()
+
+    frames = sorted((tmp_path / 'frames' / extraction / 'orig_size_frames').iterdir())
+    assert frames and all(frame.name.endswith('_my_clip.jpg') for frame in frames)
+    assert client.get(f'/thumb/{extraction}/{frames[0].name}').status_code == 200
+    sprites = client.get(f'/sprites/{extraction}')
+    assert sprites.status_code == 200
+    assert frames[0].name in sprites.get_json()
+
+
+def test_upload_name_cannot_leave_the_output_folder(client, video, tmp_path):
+    job = upload(client, video, '../../escape.mp4')
+    assert '..' not in job['name'] and '/' not in job['name']
+    assert [path.name for path in (tmp_path / 'frames').iterdir()] == [job['name']]
+    assert [path.name for path in (tmp_path / 'videos').iterdir()] == [f"{job['name']}.mp4"]
+    written = tmp_path.rglob('*escape*')
+    assert all(path.is_relative_to(tmp_path / 'frames') or path.is_relative_to(tmp_path / 'videos')
+               for path in written)
+
+
+def test_uploads_with_the_same_name_keep_their_own_video(client, tmp_path, monkeypatch):
+    long_video = write_video(tmp_path / 'long.mp4', seconds=4)
+    short_video = write_video(tmp_path / 'short.mp4', seconds=2)
+    # Both uploads land in the same second.
+    monkeypatch.setattr(web_app, 'time', SimpleNamespace(strftime=lambda *args: '20260101_000000'))
+    jobs = [upload(client, long_video, 'clip.mp4'), upload(client, short_video, 'clip.mp4')]
+    assert [job['name'] for job in jobs] == ['20260101_000000_clip', '20260101_000000_clip_1']
+    assert sorted(path.name for path in (tmp_path / 'videos').iterdir()) == [f"{job['name']}.mp4" for job in jobs]
+    frames = [len(list((tmp_path / 'frames' / job['name'] / 'orig_size_frames').iterdir())) for job in jobs]
+    assert frames[0] > frames[1] > 0
+
+
+def test_full_queue_rejects_upload_without_writing_it(client, video, tmp_path, monkeypatch):
+    monkeypatch.setattr(web_app, 'job_queue', JobQueue(max_concurrent=1, max_queued=0))
+    web_app.job_queue.reserve('running')
+    with open(video, 'rb') as file:
+        response = client.post('/upload', data={'video': (file, 'clip.mp4')}, content_type='multipart/form-data')
+    assert response.status_code == 429
+    assert not (tmp_path / 'videos').exists() or not any((tmp_path / 'videos').iterdir())
+    assert not (tmp_path / 'frames').exists()
+
+
+def test_rejected_upload_gives_its_queue_place_back(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(web_app, 'job_queue', JobQueue(max_concurrent=1, max_queued=0))
+    (tmp_path / 'notes.mp4').write_bytes(b'not a video')
+    with open(tmp_path / 'notes.mp4', 'rb') as file:
+        response = client.post('/upload', data={'video': (file, 'notes.mp4')}, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert web_app.job_queue.stats()['queued'] == 0
+
+
+def write_frames(tmp_path, extraction, count):
+    frames_dir = tmp_path / 'frames' / extraction / 'orig_size_frames'
+    frames_dir.mkdir(parents=True)
+    image = np.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    for position in range(count):
+        cv2.imwrite(str(frames_dir / f"frame_{position}.jpg"), image)
+    return frames_dir
+
+
+def test_thumbnail_etag_answers_conditional_requests(client, tmp_path):
+    write_frames(tmp_path, 'clip', 1)
+    response = client.get('/thumb/clip/frame_0.jpg')
+    assert response.status_code == 200 and response.headers['ETag']
+    assert 'public' in response.headers['Cache-Control']
+
+    cached = client.get('/thumb/clip/frame_0.jpg', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304 and not cached.data
+    assert web_app.thumbnail_cache.stats()['hits'] == 1
+
+
+def test_thumbnail_cache_evicts_the_least_recently_used(client, tmp_path, monkeypatch):
+    frames_dir = write_frames(tmp_path, 'clip', 3)
+    thumbnails = {name: client.get(f'/thumb/clip/{name}').data for name in ('frame_0.jpg', 'frame_1.jpg')}
+    # Same image, so every thumbnail has the same size; room for two and a half of them.
+    assert len(set(map(len, thumbnails.values()))) == 1
+    cache = ThumbnailCache(tmp_path / 'thumbnails', max_disk_bytes=len(thumbnails['frame_0.jpg']) * 5 // 2)
+    monkeypatch.setattr(web_app, 'thumbnail_cache', cache)
+
+    def cached(name):
+        return (cache.cache_dir / f"{cache.make_key(frames_dir / name, settings.THUMBNAIL_WIDTHS[0])}.jpg").exists()
+
+    # File times are coarse, so leave a tick between uses.
+    time.sleep(0.05)
+    assert client.get('/thumb/clip/frame_0.jpg').status_code == 200
+    time.sleep(0.05)
+    assert client.get('/thumb/clip/frame_2.jpg').status_code == 200
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    assert [cached(name) for name in ('frame_0.jpg', 'frame_1.jpg', 'frame_2.jpg')] == [True, False, True]
+
+
+def test_metrics_are_served_in_the_prometheus_text_format(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(web_app, 'REGISTRY', MetricsRegistry())
+    monkeypatch.setattr(web_app, 'job_queue', JobQueue(max_concurrent=1, max_queued=2))
+    web_app.job_queue.reserve('waiting')
+    web_app.REGISTRY.record_frames(3)
+    web_app.REGISTRY.record_video()
+    for seconds in (0.002, 0.004):
+        web_app.REGISTRY.stages.observe('decode', seconds)
+    write_frames(tmp_path, 'clip', 1)
+    client.get('/thumb/clip/frame_0.jpg')
+    client.get('/thumb/clip/frame_0.jpg')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain' and 'version=0.0.4' in response.content_type
+    lines = response.get_data(as_text=True).splitlines()
+    for line in ('# TYPE frames_extracted_total counter', 'frames_extracted_total 3', 'videos_extracted_total 1',
+                 '# TYPE extraction_stage_seconds summary', 'extraction_stage_seconds_sum{stage="decode"} 0.006000',
+                 'extraction_stage_seconds_count{stage="decode"} 2', 'extraction_stage_seconds_count{stage="seek"} 0',
+                 '# TYPE job_queue_jobs gauge', 'job_queue_jobs{state="queued"} 1', 'job_queue_depth 1',
+                 'thumbnail_cache_hits_total 1', 'thumbnail_cache_misses_total 1', 'thumbnail_cache_hit_ratio 0.5'):
+        assert line in lines
+    # Every sample is 'name{labels} value' under a HELP and TYPE header.
+    names = {line.split()[2] for line in lines if line.startswith('# TYPE')}
+    for line in lines:
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            float(value)
+            assert name.split('{')[0].removesuffix('_sum').removesuffix('_count') in names
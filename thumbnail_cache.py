@@ -0,0 +1,109 @@
+# in-built modules
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+# dependencies packages
+import cv2
+
+# Internal module
+from analysis_cache import evict_oldest
+from frame_pyramid import encode_image
+
+REDUCED_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class ThumbnailCache:
+    """Resize frames on demand and keep the results in a bounded disk cache.
+
+    A thumbnail is keyed by its source file (path, size and mtime) and the
+    requested width, so a re-extracted frame never serves a stale thumbnail.
+    The key doubles as the thumbnail's ETag. When the source width is known,
+    JPEG sources are decoded at 1/2, 1/4 or 1/8 scale straight from the DCT
+    coefficients, which is much cheaper than decoding at full size.
+
+    Args:
+        cache_dir: Directory the thumbnails are written to.
+        max_disk_bytes: Size limit of 'cache_dir'; least recently used files are removed first.
+        img_frmt: Format of the thumbnails.
+        quality: JPEG/WebP quality (0-100), or PNG compression level (0-9), of the thumbnails.
+    """
+
+    def __init__(self, cache_dir, max_disk_bytes=256 * 1024 * 1024, img_frmt='jpg', quality=85):
+        self.cache_dir = Path(cache_dir)
+        self.max_disk_bytes = max_disk_bytes
+        self.img_frmt = img_frmt
+        self.quality = quality
+        self._lock = threading.Lock()
+        # Approximate size of 'cache_dir', so eviction only scans it when over the limit.
+        self._disk_bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, source, width):
+        stat = os.stat(source)
+        payload = f"{Path(source).resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{width}|{self.quality}"
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def get(self, source, width, source_width=None):
+        """Return (thumbnail path, key) for 'source' resized to 'width', rendering it on a miss.
+
+        :param source: Path of the full-size frame.
+        :param width: Width of the thumbnail. Sources narrower than this are not upscaled.
+        :param source_width: Width of the source, if known, to decode it at reduced scale.
+        :raises FileNotFoundError: if 'source' doesn't exist.
+        :raises ValueError: if 'source' can't be decoded.
+        """
+        key = self.make_key(source, width)
+        path = self.cache_dir / f"{key}.{self.img_frmt}"
+        if path.exists():
+            # Touch the entry so eviction is least-recently-used.
+            os.utime(path)
+            with self._lock:
+                self.hits += 1
+            return path, key
+
+        data = self.render(source, width, source_width)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.misses += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data)
+        self._evict()
+        return path, key
+
+    def render(self, source, width, source_width=None):
+        """Decode 'source' and encode it resized to 'width'."""
+        factor = 1
+        if source_width:
+            while factor < 8 and source_width // (factor * 2) >= width:
+                factor *= 2
+        image = cv2.imread(str(source), REDUCED_COLOR_FLAGS[factor])
+        if image is None:
+            raise ValueError(f"Unable to decode {source}")
+        height, image_width = image.shape[:2]
+        if image_width > width:
+            image = cv2.resize(image, (width, max(1, round(height * width / image_width))),
+                               interpolation=cv2.INTER_AREA)
+        return encode_image(image, self.img_frmt, self.quality).tobytes()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'disk_bytes': self._disk_bytes}
+
+    def _evict(self):
+        with self._lock:
+            if self._disk_bytes is not None and self._disk_bytes <= self.max_disk_bytes:
+                return
+            # Evict down to 90% of the limit so the directory isn't rescanned on every miss.
+            self._disk_bytes = evict_oldest(self.cache_dir, f"*.{self.img_frmt}", self.max_disk_bytes * 0.9)
@@ -0,0 +1,189 @@
+# in-built modules
+import itertools
+import os
+import threading
+from pathlib import Path
+
+# dependencies packages
+import cv2
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, File, MultipartDecoder, NeedData
+from werkzeug.utils import secure_filename
+
+
+def probe_video(video_path):
+    """Open a (possibly still growing) video and read its stream properties.
+
+    :return: dict with frames, fps, width and height, or None if the container
+        can't be opened yet.
+    """
+    vid_cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not vid_cap.isOpened():
+            return None
+        fps = vid_cap.get(cv2.CAP_PROP_FPS)
+        if not fps:
+            return None
+        return {
+            'frames': int(vid_cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            'fps': fps,
+            'width': int(vid_cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(vid_cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+    finally:
+        vid_cap.release()
+
+
+class UploadIngest:
+    """Stream a multipart video upload straight to its final directory.
+
+    The request body is parsed incrementally, so the file is never staged in
+    Werkzeug's spooled temp file and copied again. The size limit is checked
+    against Content-Length up front and against the bytes actually received
+    while streaming. Once 'probe_bytes' have been written the container
+    header is probed on a background thread, overlapping the probe with the
+    rest of the copy; streamable containers (MPEG-TS, fragmented MP4) are
+    readable at that point, others are probed again once complete.
+
+    Args:
+        upload_dir: Directory the video is written to.
+        field_name: Name of the multipart file field.
+        chunk_size: Bytes read from the request stream at a time.
+        max_bytes: Maximum request body size. None disables the limit.
+        probe_bytes: Bytes to write before probing the header.
+        name_prefix: Prepended to the saved file name, e.g. a timestamp; must be safe in file names.
+    """
+
+    def __init__(self, upload_dir, field_name='video', chunk_size=1024 * 1024,
+                 max_bytes=None, probe_bytes=4 * 1024 * 1024, name_prefix=''):
+        self.upload_dir = Path(upload_dir)
+        self.name_prefix = name_prefix
+        self.field_name = field_name
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.probe_bytes = probe_bytes
+
+    def ingest(self, stream, content_type, content_length=None):
+        """Read the request body and write the uploaded video.
+
+        :param stream: The raw request stream.
+        :param content_type: The request's Content-Type header.
+        :param content_length: The request's Content-Length, if sent.
+        :return: (name the video was saved under, video path, probe dict or None). The name is the
+            uploaded one made safe with secure_filename and 'name_prefix', numbered if a file of that
+            name already exists, so concurrent uploads of the same file never replace each other.
+        :raises BadRequest: if the body isn't multipart or has no video field.
+        :raises RequestEntityTooLarge: if the body exceeds 'max_bytes'.
+        """
+        if self.max_bytes is not None and content_length is not None and content_length > self.max_bytes:
+            raise RequestEntityTooLarge()
+        mimetype, options = parse_options_header(content_type or '')
+        if mimetype != 'multipart/form-data' or 'boundary' not in options:
+            raise BadRequest('Expected a multipart/form-data upload')
+
+        decoder = MultipartDecoder(options['boundary'].encode())
+        received = 0
+        upload = None
+        try:
+            while True:
+                chunk = stream.read(self.chunk_size)
+                received += len(chunk)
+                if self.max_bytes is not None and received > self.max_bytes:
+                    raise RequestEntityTooLarge()
+                decoder.receive_data(chunk or None)
+
+                event = decoder.next_event()
+                while not isinstance(event, (NeedData, Epilogue)):
+                    if isinstance(event, File) and event.name == self.field_name and upload is None:
+                        upload = _VideoUpload(self.upload_dir, event.filename, self.probe_bytes, self.name_prefix)
+                    elif isinstance(event, Data) and upload is not None and not upload.closed:
+                        upload.write(event.data)
+                        if not event.more_data:
+                            upload.close()
+                    event = decoder.next_event()
+
+                if isinstance(event, Epilogue) or not chunk:
+                    break
+        except Exception:
+            if upload is not None:
+                upload.discard()
+            raise
+
+        if upload is None or not upload.filename:
+            raise BadRequest('No video file uploaded')
+        if not upload.closed:
+            upload.discard()
+            raise BadRequest('Upload ended before the video was complete')
+        return upload.filename, upload.path, upload.probe()
+
+
+class _VideoUpload:
+    """One file being written from the multipart stream."""
+
+    def __init__(self, upload_dir, filename, probe_bytes, name_prefix=''):
+        self.original_filename = filename
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        self.path = upload_dir / f"{name_prefix}{secure_filename(filename or '') or 'upload'}"
+        # Written under a temporary name in the same directory and renamed once
+        # complete, so the rename doesn't copy and half-written files are never picked up.
+        self.part_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.part")
+        self.file = open(self.part_path, 'wb')
+        self.written = 0
+        self.closed = False
+        self.probe_bytes = probe_bytes
+        self._probe_result = None
+        self._probe_thread = None
+
+    @property
+    def filename(self):
+        """Name the upload is saved under, safe for paths and URLs; empty when no file was chosen."""
+        return self.path.name if self.original_filename else ''
+
+    def write(self, data):
+        self.file.write(data)
+        self.written += len(data)
+        if self._probe_thread is None and self.written >= self.probe_bytes:
+            self.file.flush()
+            self._probe_thread = threading.Thread(target=self._probe_partial, name='upload-probe')
+            self._probe_thread.start()
+
+    def _probe_partial(self):
+        self._probe_result = probe_video(self.part_path)
+
+    def close(self):
+        self.file.close()
+        if self._probe_thread is not None:
+            self._probe_thread.join()
+        self._publish()
+        self.closed = True
+
+    def _publish(self):
+        """Rename the complete file to 'path', numbering the name instead of replacing an existing file."""
+        stem, suffix = self.path.stem, self.path.suffix
+        for attempt in itertools.count(1):
+            try:
+                # Claims the name; the rename below then only ever replaces this empty file.
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                self.path = self.path.with_name(f"{stem}_{attempt}{suffix}")
+                continue
+            os.replace(self.part_path, self.path)
+            return
+
+    def discard(self):
+        if not self.file.closed:
+            self.file.close()
+        if self._probe_thread is not None:
+            self._probe_thread.join()
+        self.part_path.unlink(missing_ok=True)
+        if self.closed:
+            self.path.unlink(missing_ok=True)
+
+    def probe(self):
+        """Probe result, re-probing the complete file if the partial probe failed.
+
+        A probe of a partial file is enough to tell the upload is a readable
+        video, but its frame count may be an estimate.
+        """
+        return self._probe_result or probe_video(self.path)
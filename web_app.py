@@ -1,85 +1,210 @@
 
-from flask import Flask, render_template, request, send_from_directory
+from flask import Flask, Response, jsonify, render_template, request, send_file, send_from_directory
+import logging
 from pathlib import Path
 import os
-import traceback
+import time
 from frame_extractor_multithread import FrameExtractor
+from frame_analyzer import StreamingFrameAnalyzer
+from analysis_cache import AnalysisCache
+from job_queue import JobQueue, QueueFullError
+from upload_ingest import UploadIngest
+from frame_buffers import FrameBufferPool
+from frame_index import FrameIndex
+from metrics import REGISTRY
+from thumbnail_cache import ThumbnailCache
+from frame_dedup import FrameDeduplicator
+from sprite_sheets import SPRITES_DIRNAME, SpriteSheetWriter, load_sprite_index
+from werkzeug.exceptions import HTTPException
+from werkzeug.utils import secure_filename
 import settings
 
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__, static_folder=str(settings.OUTDIR), static_url_path='/static')
 app.config['UPLOAD_FOLDER'] = 'videos'
 app.config['OUTPUT_FOLDER'] = str(settings.OUTDIR)
 
+analysis_cache = AnalysisCache(
+    cache_dir=settings.ANALYSIS_CACHE_DIR,
+    max_entries=settings.ANALYSIS_CACHE_ENTRIES,
+    max_disk_bytes=settings.ANALYSIS_CACHE_MAX_BYTES,
+)
+
+frame_index = FrameIndex(settings.FRAME_INDEX_PATH)
+
+thumbnail_cache = ThumbnailCache(
+    settings.THUMBNAIL_CACHE_DIR,
+    max_disk_bytes=settings.THUMBNAIL_CACHE_MAX_BYTES,
+)
+
+# Shared by every upload, so concurrent jobs split one budget for decoded frames.
+frame_buffer_pool = (FrameBufferPool(settings.FRAME_MEMORY_BUDGET_BYTES)
+                     if settings.FRAME_MEMORY_BUDGET_BYTES else None)
+
+job_queue = JobQueue(
+    max_concurrent=settings.MAX_CONCURRENT_JOBS,
+    max_queued=settings.MAX_QUEUED_JOBS,
+)
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
+    # Claim the job's place before reading the upload body, so a full queue is
+    # reported without streaming the video to disk first.
+    try:
+        job = job_queue.reserve()
+    except QueueFullError as e:
+        return str(e), 429
+    started = False
     try:
-        if 'video' not in request.files:
-            return 'No video file uploaded', 400
-        
-        file = request.files['video']
-        if file.filename == '':
-            return 'No selected file', 400
-
-        import time
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        video_name = file.filename.rsplit('.', 1)[0]
-        
-        # Create directories if they don't exist
-        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
         # Create timestamp-based directory for chronological sorting
         timestamp = time.strftime("%Y%m%d_%H%M%S")
-        frame_dir = os.path.join(app.config['OUTPUT_FOLDER'], f"{timestamp}_{video_name}")
+        upload_ingest = UploadIngest(
+            app.config['UPLOAD_FOLDER'],
+            field_name='video',
+            chunk_size=settings.UPLOAD_CHUNK_SIZE,
+            max_bytes=settings.MAX_UPLOAD_BYTES,
+            probe_bytes=settings.UPLOAD_PROBE_BYTES,
+            name_prefix=f"{timestamp}_",
+        )
+        _, video_path, probe = upload_ingest.ingest(
+            request.stream, request.content_type, request.content_length)
+        if probe is None:
+            os.remove(video_path)
+            return 'Uploaded file is not a readable video', 400
+
+        # Saved under a unique, safe name ('<timestamp>_<name>'), so queued jobs never share
+        # a video file and the extraction directory is named after it.
+        extraction = Path(video_path).stem
+        frame_dir = os.path.join(app.config['OUTPUT_FOLDER'], extraction)
         os.makedirs(frame_dir, exist_ok=True)
         os.makedirs(os.path.join(frame_dir, 'orig_size_frames'), exist_ok=True)
-        os.makedirs(os.path.join(frame_dir, 're_size_frames'), exist_ok=True)
-        
-        video_path = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-        file.save(video_path)
+        if settings.EAGER_RESIZE:
+            os.makedirs(os.path.join(frame_dir, 're_size_frames'), exist_ok=True)
         
-        from concurrent.futures import ThreadPoolExecutor
         frame_extractor = FrameExtractor(
             out_dir=Path(frame_dir),
             img_frmt=settings.REQUIRED_IMAGE_FORMAT,
             required_frame_rate=settings.REQUIRED_FRAME_RATE,
             start_from_seconds=settings.START_FROM_SECOND,
             img_width=settings.REQUIRED_IMAGE_WIDTH,
-            verbose=True
+            verbose=True,
+            analyzer=StreamingFrameAnalyzer(
+                threshold=settings.ACTION_THRESHOLD,
+                min_area=settings.ACTION_MIN_AREA,
+                downscale=settings.ACTION_DOWNSCALE,
+                width=settings.REQUIRED_IMAGE_WIDTH,
+                exact=settings.ACTION_EXACT,
+            ) if settings.INLINE_ANALYSIS else None,
+            frame_index=frame_index,
+            eager_resize=settings.EAGER_RESIZE,
+            sprites=SpriteSheetWriter(
+                tile_width=settings.SPRITE_TILE_WIDTH,
+                columns=settings.SPRITE_GRID[0],
+                rows=settings.SPRITE_GRID[1],
+                img_frmt=settings.SPRITE_FORMAT,
+            ) if settings.SPRITE_SHEETS else None,
+            dedup=FrameDeduplicator(max_distance=settings.DEDUP_MAX_DISTANCE) if settings.DEDUP_FRAMES else None,
+            buffer_pool=frame_buffer_pool,
         )
         
-        with ThreadPoolExecutor() as executor:
-            executor.submit(frame_extractor.extract_frames, Path(video_path))
-        return 'Video processed successfully', 200
+        job.name = extraction
+        job_queue.start(job, frame_extractor.extract_frames, Path(video_path))
+        started = True
+        return jsonify({'job_id': job.id, 'status_url': f'/jobs/{job.id}'}), 202
+    except HTTPException as e:
+        return e.description, e.code
     except Exception as e:
-        print(f"Error processing video: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception(f"Error processing video: {str(e)}")
         return f'Error processing video: {str(e)}', 500
+    finally:
+        if not started:
+            job_queue.cancel(job)
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return 'Job not found', 404
+    return jsonify(job.to_dict())
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics: extraction throughput, stage latencies, job queue depth and cache hit rates."""
+    jobs = job_queue.stats()
+    analysis = analysis_cache.stats()
+    thumbnails = thumbnail_cache.stats()
+    thumbnail_lookups = thumbnails['hits'] + thumbnails['misses']
+    gauges = {
+        'job_queue_jobs': ('Extraction jobs by state.', {(('state', state),): count for state, count in jobs.items()}),
+        'job_queue_depth': ('Jobs waiting for a worker.', jobs['queued']),
+        'analysis_cache_hit_ratio': ('Share of action-frame lookups served from the cache.', round(analysis['hit_rate'], 4)),
+        'analysis_cache_entries': ('Action-frame results held in memory.', analysis['entries']),
+        'thumbnail_cache_hit_ratio': ('Share of thumbnail requests served from the disk cache.',
+                                      round(thumbnails['hits'] / thumbnail_lookups, 4) if thumbnail_lookups else 0.0),
+    }
+    counters = {
+        'analysis_cache_hits_total': ('Action-frame lookups served from memory or disk.', analysis['hits']),
+        'analysis_cache_misses_total': ('Action-frame lookups that ran the analyzer.', analysis['misses']),
+        'thumbnail_cache_hits_total': ('Thumbnails served from the disk cache.', thumbnails['hits']),
+        'thumbnail_cache_misses_total': ('Thumbnails rendered on request.', thumbnails['misses']),
+    }
+    return Response(REGISTRY.render(gauges, counters), mimetype='text/plain; version=0.0.4')
 
 @app.route('/frames')
 def view_frames():
     try:
         output_dir = app.config['OUTPUT_FOLDER']
-        extractions = sorted([d for d in os.listdir(output_dir) 
-                            if os.path.isdir(os.path.join(output_dir, d))])
-        return render_template('frames.html', extractions=extractions)
+        # Extractions still being written may not have index rows yet.
+        extractions = set(frame_index.list_extractions())
+        extractions.update(d for d in os.listdir(output_dir) if os.path.isdir(os.path.join(output_dir, d)))
+        return render_template('frames.html', extractions=sorted(extractions))
     except Exception as e:
-        print(f"Error viewing frames: {str(e)}")
+        logger.exception(f"Error viewing frames: {str(e)}")
         return f'Error viewing frames: {str(e)}', 500
 
+def frames_dir(extraction):
+    """Directory to list and analyse an extraction's frames from.
+
+    're_size_frames' when it was written during extraction, else 'orig_size_frames'.
+    """
+    extraction_dir = os.path.join(app.config['OUTPUT_FOLDER'], extraction)
+    resize_frames_dir = os.path.join(extraction_dir, 're_size_frames')
+    if os.path.exists(resize_frames_dir):
+        return resize_frames_dir
+    return os.path.join(extraction_dir, 'orig_size_frames')
+
+def ensure_indexed(extraction):
+    """Index extractions written before the frame index existed, once."""
+    if frame_index.count(extraction) == 0:
+        frame_index.backfill(os.path.join(app.config['OUTPUT_FOLDER'], extraction), settings.REQUIRED_IMAGE_FORMAT)
+
 @app.route('/frames/<extraction>')
 def view_extraction_frames(extraction):
     try:
-        resize_frames_dir = os.path.join(app.config['OUTPUT_FOLDER'], extraction, 're_size_frames')
-        if not os.path.exists(resize_frames_dir):
+        if not os.path.exists(frames_dir(extraction)):
             return 'No frames available', 404
-            
-        frames = [f for f in os.listdir(resize_frames_dir) if f.endswith(settings.REQUIRED_IMAGE_FORMAT)]
-        return render_template('frames.html', frames=frames, current_extraction=extraction)
+
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = min(max(1, request.args.get('per_page', settings.GALLERY_PAGE_SIZE, type=int)), 1000)
+        sort = request.args.get('sort', 'frame')
+        order = request.args.get('order', 'asc')
+
+        ensure_indexed(extraction)
+        rows, total = frame_index.query_frames(
+            extraction, page=page, per_page=per_page, sort=sort, descending=(order == 'desc'))
+        frames = [row['file'] for row in rows]
+        pages = max(1, -(-total // per_page))
+        sprite_index = load_sprite_index(os.path.join(app.config['OUTPUT_FOLDER'], extraction))
+        sprites = {frame: sprite_index[frame] for frame in frames if frame in sprite_index}
+        return render_template('frames.html', frames=frames, current_extraction=extraction,
+                               thumb_widths=settings.THUMBNAIL_WIDTHS, sprites=sprites, page=page, pages=pages, total=total, per_page=per_page, sort=sort, order=order)
     except Exception as e:
-        print(f"Error viewing frames: {str(e)}")
+        logger.exception(f"Error viewing frames: {str(e)}")
         return f'Error viewing frames: {str(e)}', 500
 
 @app.route('/frame/<filename>')
@@ -88,42 +213,97 @@ def frame(filename):
         resize_frames_dir = os.path.join(app.config['OUTPUT_FOLDER'], 're_size_frames')
         return send_from_directory(resize_frames_dir, filename, as_attachment=False)
     except Exception as e:
-        print(f"Error serving frame: {str(e)}")
+        logger.exception(f"Error serving frame: {str(e)}")
         return f'Error serving frame: {str(e)}', 500
 
-import gc
+@app.route('/thumb/<extraction>/<filename>')
+def thumbnail(extraction, filename):
+    """Serve a frame resized to the 'w' query parameter, rendered on first request."""
+    try:
+        width = request.args.get('w', settings.THUMBNAIL_WIDTHS[0], type=int)
+        # Snap to a configured width so arbitrary values can't fill the cache.
+        width = min(settings.THUMBNAIL_WIDTHS, key=lambda w: abs(w - width))
+        extraction_dir = Path(app.config['OUTPUT_FOLDER']) / secure_filename(extraction)
+        filename = secure_filename(filename)
+        source = extraction_dir / 'orig_size_frames' / filename
+        if not source.exists():
+            source = extraction_dir / 're_size_frames' / filename
+        if not source.exists():
+            return 'Frame not found', 404
+
+        indexed = frame_index.get_frame(extraction, filename)
+        source_width = indexed['width'] if indexed and source.parent.name == 'orig_size_frames' else None
+        path, key = thumbnail_cache.get(source, width, source_width=source_width)
+        # The key changes whenever the source frame does, so it is a strong ETag;
+        # conditional requests with a matching If-None-Match get a 304.
+        response = send_file(path, etag=key, last_modified=source.stat().st_mtime,
+                             max_age=settings.THUMBNAIL_MAX_AGE, conditional=True)
+        response.cache_control.public = True
+        return response
+    except Exception as e:
+        logger.exception(f"Error serving thumbnail: {str(e)}")
+        return f'Error serving thumbnail: {str(e)}', 500
+
+@app.route('/sprites/<extraction>')
+def sprite_index(extraction):
+    """JSON map of frame file name to sprite sheet and pixel offset."""
+    extraction_dir = os.path.join(app.config['OUTPUT_FOLDER'], secure_filename(extraction))
+    sprites = load_sprite_index(extraction_dir)
+    if not sprites:
+        return 'No sprite sheets available', 404
+    return jsonify(sprites)
+
+@app.route('/sprites/<extraction>/<sheet>')
+def sprite_sheet(extraction, sheet):
+    try:
+        sprites_dir = os.path.join(app.config['OUTPUT_FOLDER'], secure_filename(extraction), SPRITES_DIRNAME)
+        # Sheets are only rewritten when a video is extracted again, so let browsers revalidate daily.
+        return send_from_directory(sprites_dir, sheet, max_age=settings.THUMBNAIL_MAX_AGE)
+    except HTTPException as e:
+        return e.description, e.code
+    except Exception as e:
+        logger.exception(f"Error serving sprite sheet: {str(e)}")
+        return f'Error serving sprite sheet: {str(e)}', 500
 
 @app.route('/action-frames/<extraction>')
 def view_action_frames(extraction):
     try:
-        from frame_analyzer import FrameAnalyzer
-        analyze_frames_dir = Path(os.path.join(app.config['OUTPUT_FOLDER'], extraction, 're_size_frames'))
+        from frame_analyzer import FrameAnalyzer, load_action_frames
+        extraction_dir = Path(os.path.join(app.config['OUTPUT_FOLDER'], extraction))
+        analyze_frames_dir = Path(frames_dir(extraction))
         
         if not analyze_frames_dir.exists():
             return f'Frames directory not found: {analyze_frames_dir}', 404
-            
-        analyzer = FrameAnalyzer(analyze_frames_dir, threshold=25, min_area=300, batch_size=20)
-        action_frame_names = [f.stem for f in analyzer.detect_changes() if not f.stem.endswith('_analyzed')]
-        gc.collect()
+
+        # Measured at the resized width, like the inline analysis, whichever frames are on disk.
+        analyzer = FrameAnalyzer(analyze_frames_dir, threshold=settings.ACTION_THRESHOLD,
+                                 min_area=settings.ACTION_MIN_AREA, batch_size=20,
+                                 downscale=settings.ACTION_DOWNSCALE, width=settings.REQUIRED_IMAGE_WIDTH,
+                                 exact=settings.ACTION_EXACT)
+        # Results written during extraction avoid decoding the frames again.
+        action_frame_names = load_action_frames(extraction_dir, analyzer.params())
+        if action_frame_names is not None:
+            action_frame_names = [Path(name).stem for name in action_frame_names]
+        else:
+            action_frame_names = analysis_cache.get_or_compute(
+                analyze_frames_dir, analyzer.params(),
+                lambda: [f.stem for f in analyzer.detect_changes() if not f.stem.endswith('_analyzed')])
         
         if not action_frame_names:
             return 'No action frames detected', 404
             
         # Get corresponding original size frames
-        orig_frames_dir = Path(os.path.join(app.config['OUTPUT_FOLDER'], extraction, 'orig_size_frames'))
-        action_frames = []
-        for name in action_frame_names:
-            orig_frame = f"{name}.{settings.REQUIRED_IMAGE_FORMAT}"
-            if os.path.exists(os.path.join(orig_frames_dir, orig_frame)):
-                action_frames.append(orig_frame)
-                
-        action_frames = sorted(action_frames)
-        print(f"Detected {len(action_frames)} action frames")
+        ensure_indexed(extraction)
+        action_frames = sorted(frame_index.existing_originals(
+            extraction, (f"{name}.{settings.REQUIRED_IMAGE_FORMAT}" for name in action_frame_names)))
+        logger.info(f"Detected {len(action_frames)} action frames")
         
-        return render_template('frames.html', frames=action_frames, current_extraction=extraction, frame_type='orig_size_frames')
+        return render_template('frames.html', frames=action_frames, current_extraction=extraction, frame_type='orig_size_frames',
+                               thumb_widths=settings.THUMBNAIL_WIDTHS)
     except Exception as e:
-        print(f"Error detecting action frames: {str(e)}")
+        logger.exception(f"Error detecting action frames: {str(e)}")
         return f'Error detecting action frames: {str(e)}', 500
 
 if __name__ == '__main__':
+    logging.basicConfig(level=settings.LOG_LEVEL, format='%(message)s')
     app.run(host='0.0.0.0', port=3000)